@@ -1,29 +1,29 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from bs4 import BeautifulSoup
 import re
 import calendar
 from datetime import datetime, timedelta
 import time
 import json
-from github import Github
+import hashlib
+import threading
+from collections import Counter
 from io import BytesIO
-import zipfile
-import base64
-import google.generativeai as genai
-import requests
-from prophet import Prophet
-import feedparser
-from fpdf import FPDF
 import shutil
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+from fiyat_motoru import arsivleri_hazirla, arsivleri_isle, atlanan_arsivler, AyristirmaOnbellegi, \
+    VARSAYILAN_ISCI_SAYISI, VARSAYILAN_AYRISTIRICI
+from fiyat_deposu import FIYAT_DIZINI, depo_dosyalari, fiyatlari_oku, fiyatlari_yaz, excelden_tasi, sikistir
+from endeks_motoru import ENDEKS_DIZINI, endeksleri_hesapla, endeksleri_oku, endeksleri_yaz, sepet_ozeti
+from veri_katmani import OnbellekliDepo, YENILEME_SANIYE
+from sepet_katmani import sepet_tablosu
+# Tahmin (Prophet), LLM, haber, PDF, Selenium, grafik ve GitHub istemcisi ilk kullanımda yüklenir
+from tembel_yukleme import modul, yukleme_sureleri
+from tahmin_motoru import Tahmin, TahminMotoru
+from istatistik_motoru import ISTATISTIK_DOSYASI, PENCERE_GUN, durum_oku, istatistikleri_guncelle
+from grafik_katmani import GORUNUMLER, bant_izi, dagilim_modu, gorunume_kirp, zaman_izi
+from disa_aktarim import BICIMLER, SAYFA_BOYLARI, buyuk_mu, disa_aktar, sayfa, sayfa_sayisi
+from piyasa_verileri import PiyasaServisi, piyasa_kaynaklari, resmi_enflasyon_tablosu, yas_metni
 
 # --- 1. AYARLAR VE TEMA YÖNETİMİ ---
 st.set_page_config(
@@ -156,36 +156,29 @@ def apply_theme():
 # Temayı Uygula
 apply_theme()
 
-if "gemini" in st.secrets:
-    genai.configure(api_key=st.secrets["gemini"]["api_key"])
+
+def llm_modeli(ad='gemini-2.5-flash'):
+    genai = modul("llm", "google.generativeai")
+    if "gemini" in st.secrets:
+        genai.configure(api_key=st.secrets["gemini"]["api_key"])
+    return genai.GenerativeModel(ad)
 
 
 # --- KUR ÇEKME FONKSİYONU ---
-@st.cache_data(ttl=1800)
-def get_exchange_rates():
-    rates = {"USD": 0.0, "EUR": 0.0, "GA": 0.0}
-    try:
-        url_tcmb = "https://www.tcmb.gov.tr/kurlar/today.xml"
-        res = requests.get(url_tcmb, timeout=5)
-        soup = BeautifulSoup(res.content, 'xml')
-        rates["USD"] = float(soup.find(attrs={"CurrencyCode": "USD"}).BanknoteSelling.text)
-        rates["EUR"] = float(soup.find(attrs={"CurrencyCode": "EUR"}).BanknoteSelling.text)
-    except:
-        pass
+@st.cache_resource(show_spinner=False)
+def piyasa_servisi():
+    # Tüm oturumlar son iyi değerleri beklemeden alır; TCMB, bigpara ve EVDS arka planda eşzamanlı yenilenir
+    return PiyasaServisi(piyasa_kaynaklari(st.secrets.get("evds", {}).get("api_key"))).baslat()
 
-    try:
-        url_gold = "https://bigpara.hurriyet.com.tr/altin/gram-altin-fiyati/"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        res_gold = requests.get(url_gold, headers=headers, timeout=5)
-        soup_gold = BeautifulSoup(res_gold.content, 'html.parser')
-        fiyat_text = soup_gold.select_one("span.value").text
-        temiz_fiyat = fiyat_text.replace(".", "").replace(",", ".").strip()
-        rates["GA"] = float(temiz_fiyat)
-    except Exception as e:
-        if rates["USD"] > 0:
-            rates["GA"] = (2700 * rates["USD"]) / 31.10
-    return rates
+
+def get_exchange_rates():
+    # -> (rates, en eski değerin yaşı sn)
+    g = piyasa_servisi().hepsi(["kur", "altin"])
+    rates = {"USD": 0.0, "EUR": 0.0, "GA": 0.0, **(g["kur"].deger or {}), **(g["altin"].deger or {})}
+    if not g["altin"].deger and rates["USD"] > 0:
+        rates["GA"] = (2700 * rates["USD"]) / 31.10
+    yaslar = [piyasa_servisi().yas(ad) for ad in ("kur", "altin") if g[ad].deger]
+    return rates, max(yaslar) if yaslar else None
 
 
 # --- 2. GITHUB & VERİ MOTORU ---
@@ -195,26 +188,30 @@ SAYFA_ADI = "Madde_Sepeti"
 
 
 # --- PDF RAPOR MOTORU ---
-class PDFReport(FPDF):
-    def header(self):
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, 'ENFLASYON DURUM RAPORU', 0, 1, 'C')
-        self.set_y(10)
-        self.set_font('Arial', 'B', 8)
-        self.set_text_color(0, 0, 0)
-        self.ln(5)
-        self.line(10, 25, 200, 25)
-        self.ln(10)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, f'Enflasyon Monitoru - Sayfa {self.page_no()}', 0, 0, 'C')
+def pdf_rapor_sinifi():
+    # fpdf yalnızca rapor indirilirken yüklenir
+    class PDFReport(modul("pdf", "fpdf").FPDF):
+        def header(self):
+            self.set_font('Arial', 'B', 16)
+            self.cell(0, 10, 'ENFLASYON DURUM RAPORU', 0, 1, 'C')
+            self.set_y(10)
+            self.set_font('Arial', 'B', 8)
+            self.set_text_color(0, 0, 0)
+            self.ln(5)
+            self.line(10, 25, 200, 25)
+            self.ln(10)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('Arial', 'I', 8)
+            self.set_text_color(128, 128, 128)
+            self.cell(0, 10, f'Enflasyon Monitoru - Sayfa {self.page_no()}', 0, 0, 'C')
+
+    return PDFReport
 
 
 def create_pdf_report(text_content, filename="Rapor.pdf"):
-    pdf = PDFReport()
+    pdf = pdf_rapor_sinifi()()
     pdf.add_page()
 
     def clean_text_for_pdf(text):
@@ -248,7 +245,7 @@ def create_pdf_report(text_content, filename="Rapor.pdf"):
 def get_market_sentiment():
     rss_url = "https://news.google.com/rss?hl=tr&gl=TR&ceid=TR:tr"
     try:
-        feed = feedparser.parse(rss_url)
+        feed = modul("haber", "feedparser").parse(rss_url)
         headlines = [entry.title for entry in feed.entries[:10]]
         news_text = "\n".join([f"- {h}" for h in headlines])
 
@@ -263,7 +260,7 @@ def get_market_sentiment():
         4. En kritik 1 haberi (varsa ekonomiyle ilgili) seç ve yorumla.
         Çıktıyı kısa, net ve madde madde ver.
         """
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = llm_modeli()
         response = model.generate_content(prompt)
         return response.text, headlines
     except Exception as e:
@@ -271,172 +268,264 @@ def get_market_sentiment():
 
 
 # --- GITHUB İŞLEMLERİ ---
+@st.cache_resource(show_spinner=False)
+def veri_katmani():
+    # Tüm oturumlar tek istemciyi ve SHA ile doğrulanan tek önbelleği paylaşır.
+    # Bağlantı hatası yükseltilir ki başarısız sonuç önbelleğe girmesin.
+    Github = modul("github", "github").Github
+    repo = Github(st.secrets["github"]["token"]).get_repo(st.secrets["github"]["repo_name"])
+    return OnbellekliDepo(repo, st.secrets["github"]["branch"],
+                          st.secrets.get("ayarlar", {}).get("onbellek_saniye", YENILEME_SANIYE))
+
+
 def get_github_repo():
     try:
-        return Github(st.secrets["github"]["token"]).get_repo(st.secrets["github"]["repo_name"])
+        return veri_katmani().repo
     except:
         return None
 
 
 def github_json_oku(dosya_adi):
-    repo = get_github_repo()
-    if not repo: return {}
     try:
-        c = repo.get_contents(dosya_adi, ref=st.secrets["github"]["branch"])
-        return json.loads(c.decoded_content.decode("utf-8"))
+        katman = veri_katmani()
+        return katman.turet(("json", dosya_adi), katman.sha(dosya_adi),
+                            lambda: json.loads(katman.oku(dosya_adi).decode("utf-8")))
     except:
         return {}
 
 
 def github_json_yaz(dosya_adi, data, mesaj="Update JSON"):
-    repo = get_github_repo()
-    if not repo: return False
     try:
-        content = json.dumps(data, indent=4)
-        try:
-            c = repo.get_contents(dosya_adi, ref=st.secrets["github"]["branch"])
-            repo.update_file(c.path, mesaj, content, c.sha, branch=st.secrets["github"]["branch"])
-        except:
-            repo.create_file(dosya_adi, mesaj, content, branch=st.secrets["github"]["branch"])
+        veri_katmani().yaz(dosya_adi, json.dumps(data, indent=4), mesaj)
         return True
     except:
         return False
 
 
-# --- HIZLANDIRILMIŞ (CACHED) VERİ OKUMA ---
-@st.cache_data(ttl=60, show_spinner=False)
+# --- PAYLAŞIMLI (SHA DOĞRULAMALI) VERİ OKUMA ---
+# Ayrıştırılmış tablolar kaynak dosyaların git SHA'sı değişene dek paylaşılır; çağıranlar kopya alır.
 def github_excel_oku(dosya_adi, sayfa_adi=None):
-    repo = get_github_repo()
-    if not repo: return pd.DataFrame()
     try:
-        c = repo.get_contents(dosya_adi, ref=st.secrets["github"]["branch"])
-        if sayfa_adi:
-            df = pd.read_excel(BytesIO(c.decoded_content), sheet_name=sayfa_adi, dtype=str)
-        else:
-            df = pd.read_excel(BytesIO(c.decoded_content), dtype=str)
-        return df
+        katman = veri_katmani()
+        return katman.turet(("excel", dosya_adi, sayfa_adi), katman.sha(dosya_adi), lambda: pd.read_excel(
+            BytesIO(katman.oku(dosya_adi)), sheet_name=sayfa_adi or 0, dtype=str)).copy()
     except:
         return pd.DataFrame()
 
 
-def github_excel_guncelle(df_yeni, dosya_adi):
-    repo = get_github_repo()
-    if not repo: return "Repo Yok"
+def sepet_oku():
+    """Tipli sepet (Kod, URL, ad, ağırlık, grup, manuel fiyat) + URL->Kod dizini; Excel SHA'sıyla paylaşılır."""
+    try:
+        katman = veri_katmani()
+        return katman.turet(("sepet",), katman.sha(EXCEL_DOSYASI),
+                            lambda: sepet_tablosu(github_excel_oku(EXCEL_DOSYASI, SAYFA_ADI)))
+    except:
+        return None
+
+
+# --- FİYAT DEPOSU (PARQUET) ---
+def get_fiyat_deposu():
     try:
+        return veri_katmani()
+    except:
+        return None
+
+
+def fiyat_log_oku():
+    depo = get_fiyat_deposu()
+    if not depo: return pd.DataFrame()
+    try:
+        df = depo.turet(("fiyat_log",), depo.surum(FIYAT_DIZINI), lambda: fiyatlari_oku(depo))
+        # Depo henüz taşınmadıysa eski Excel okunur
+        return df.copy() if not df.empty else github_excel_oku(FIYAT_DOSYASI)
+    except:
+        return pd.DataFrame()
+
+
+def fiyat_log_guncelle(df_yeni):
+    depo = get_fiyat_deposu()
+    if not depo: return "Repo Yok"
+    try:
+        if not any(depo_dosyalari(depo)) and depo.sha(FIYAT_DOSYASI) is not None:
+            # Tek seferlik taşıma: ilk yazımdan önce eski Excel geçmişi Parquet'e aktarılır. Başarısızsa
+            # deltalar yazılmaz; yazılsaydı depo dolu görünür, taşıma bir daha denenmez ve Excel geçmişi kaybolurdu.
+            try:
+                excelden_tasi(depo, depo.oku(FIYAT_DOSYASI))
+            except Exception as e:
+                return f"Hata: Excel geçmişi taşınamadı, fiyatlar yazılmadı ({e})"
+        res = fiyatlari_yaz(depo, df_yeni)
         try:
-            c = repo.get_contents(dosya_adi, ref=st.secrets["github"]["branch"])
-            old = pd.read_excel(BytesIO(c.decoded_content), dtype=str)
-            yeni_tarih = str(df_yeni['Tarih'].iloc[0])
-            old = old[~((old['Tarih'].astype(str) == yeni_tarih) & (old['Kod'].isin(df_yeni['Kod'])))]
-            final = pd.concat([old, df_yeni], ignore_index=True)
-        except:
-            c = None;
-            final = df_yeni
-        out = BytesIO()
-        with pd.ExcelWriter(out, engine='openpyxl') as w:
-            final.to_excel(w, index=False, sheet_name='Fiyat_Log')
-        msg = f"Data Update"
-        if c:
-            repo.update_file(c.path, msg, out.getvalue(), c.sha, branch=st.secrets["github"]["branch"])
-        else:
-            repo.create_file(dosya_adi, msg, out.getvalue(), branch=st.secrets["github"]["branch"])
-        return "OK"
+            # Madde istatistikleri yalnızca yeni günün fiyatlarıyla güncellenir
+            durum = istatistikleri_guncelle(depo, df_yeni)
+        except Exception:
+            durum = None
+        try:
+            surum = fiyat_surumu(depo)  # Okumadan önce: arada yazım olursa artefakt bayat sayılsın
+            art = endeks_guncelle(depo, fiyatlari_oku(depo), surum, durum)
+        except Exception:
+            art = None  # Dashboard bayat artefaktı fark edip bellekte hesaplar; sonraki senkronizasyon yazar
+        # Eski günlük deltaların aylık segmentlere birleştirilmesi arka planda yapılır. Süreçte aynı anda tek
+        # birleştirme çalışır; sürerken gelen senkronizasyon yenisini başlatmaz (kalan deltalar sonrakine kalır)
+        kilit = sikistirma_kilidi()
+        if kilit.acquire(blocking=False):
+            threading.Thread(target=_arka_plan_sikistir, args=(depo, art, kilit), daemon=True).start()
+        return res
     except Exception as e:
         return str(e)
 
 
-# --- RESMİ ENFLASYON & PROPHET (CACHED) ---
-def get_official_inflation():
-    api_key = st.secrets.get("evds", {}).get("api_key")
-    if not api_key: return None, "API Key Yok"
-    start_date = (datetime.now() - timedelta(days=365)).strftime("%d-%m-%Y")
-    end_date = datetime.now().strftime("%d-%m-%Y")
-    url = f"https://evds2.tcmb.gov.tr/service/evds/series=TP.FG.J0&startDate={start_date}&endDate={end_date}&type=json&key={api_key}"
-    try:
-        res = requests.get(url)
-        data = res.json()
-        if "items" in data:
-            df_evds = pd.DataFrame(data["items"])
-            df_evds = df_evds[['Tarih', 'TP_FG_J0']]
-            df_evds.columns = ['Tarih', 'Resmi_TUFE']
-            df_evds['Tarih'] = pd.to_datetime(df_evds['Tarih'] + "-01", format="%Y-%m-%d")
-            df_evds['Resmi_TUFE'] = pd.to_numeric(df_evds['Resmi_TUFE'], errors='coerce')
-            return df_evds, "OK"
-        return None, "Veri Yapısı Hatası"
-    except Exception as e:
-        return None, str(e)
+@st.cache_resource(show_spinner=False)
+def sikistirma_kilidi():
+    # Betik her çalıştırmada yeniden yürütüldüğü için modül düzeyi kilit yetmez; tüm oturumlar bunu paylaşır
+    return threading.Lock()
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def predict_inflation_prophet(df_trend):
+def _arka_plan_sikistir(depo, art, kilit):
     try:
-        df_p = df_trend.rename(columns={'Tarih': 'ds', 'TÜFE': 'y'})
-        m = Prophet(daily_seasonality=True, yearly_seasonality=False)
-        m.fit(df_p)
-        future = m.make_future_dataframe(periods=90)
-        forecast = m.predict(future)
-        return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+        # Birleştirme fiyatları değiştirmez; arada başka yazım olmadıysa artefakt yeni depo sürümüyle
+        # damgalanır ki bayat sayılmasın
+        guncel = art is not None and art['meta']['fiyat_surumu'] == fiyat_surumu(depo)
+        if sikistir(depo) and guncel:
+            art['meta']['fiyat_surumu'] = fiyat_surumu(depo)
+            endeksleri_yaz(depo, art, "Index Restamp")
     except Exception as e:
-        st.error(f"Prophet Hatası: {str(e)}")
-        return pd.DataFrame()
+        # Arka plan iş parçacığının arayüzü yok; hata sunucu günlüğüne yazılır
+        print(f"⚠️ Fiyat deposu sıkıştırması başarısız: {type(e).__name__}: {e}", flush=True)
+    finally:
+        kilit.release()
+
 
+# --- ENDEKS ARTEFAKTLARI ---
+def fiyat_surumu(depo):
+    # Fiyat deposunun (delta + segment dosyaları, taşınmadıysa eski Excel) SHA özeti; artefakt buna göre bayatlar
+    dosyalar = [s for s in depo.surum(FIYAT_DIZINI, FIYAT_DOSYASI) if s[0] != ISTATISTIK_DOSYASI]
+    return hashlib.sha1(json.dumps(dosyalar).encode("utf-8")).hexdigest()
 
-# --- SCRAPER (FİYAT ÇEKİCİ) ---
-def temizle_fiyat(t):
-    if not t: return None
-    t = str(t).replace('TL', '').replace('₺', '').strip()
-    t = t.replace('.', '').replace(',', '.') if ',' in t and '.' in t else t.replace(',', '.')
+
+def endeks_hesapla(depo, df_f, surum, durum=None):
+    """Endeksleri bellekte hesaplar (yazmaz); meta'ya df_f'nin okunduğu fiyat deposu sürümü (surum) eklenir."""
+    if durum is None:
+        try:
+            durum = durum_oku(depo)
+        except Exception:
+            pass
+    art = endeksleri_hesapla(df_f, github_excel_oku(EXCEL_DOSYASI, SAYFA_ADI), durum)
+    if art: art['meta']['fiyat_surumu'] = surum
+    return art
+
+
+def endeks_guncelle(depo, df_f, surum, durum=None):
+    """Endeksleri veri güncellemesi başına bir kez hesaplayıp Endeks/ altına yazar."""
+    art = endeks_hesapla(depo, df_f, surum, durum)
+    if art: endeksleri_yaz(depo, art)
+    return art
+
+
+def endeks_verisi_oku():
+    depo = get_fiyat_deposu()
+    if not depo: return None
     try:
-        return float(re.sub(r'[^\d.]', '', t))
-    except:
+        return depo.turet(("endeks",), depo.surum(ENDEKS_DIZINI, FIYAT_DIZINI, FIYAT_DOSYASI, EXCEL_DOSYASI),
+                          lambda: _endeks_verisi_hazirla(depo))
+    except Exception:
         return None
 
 
-def kod_standartlastir(k): return str(k).replace('.0', '').strip().zfill(7)
-
-
-def fiyat_bul_siteye_gore(soup, url):
-    fiyat = 0;
-    kaynak = "";
-    domain = url.lower() if url else ""
-    if "migros" in domain:
-        garbage = ["sm-list-page-item", ".horizontal-list-page-items-container", "app-product-carousel",
-                   ".similar-products", "div.badges-wrapper"]
-        for g in garbage:
-            for x in soup.select(g): x.decompose()
-        main_wrapper = soup.select_one(".name-price-wrapper")
-        if main_wrapper:
-            for sel, k in [(".price.subtitle-1", "Migros(N)"), (".single-price-amount", "Migros(S)"),
-                           ("#sale-price, .sale-price", "Migros(I)")]:
-                if el := main_wrapper.select_one(sel):
-                    if val := temizle_fiyat(el.get_text()): return val, k
-        if fiyat == 0:
-            if el := soup.select_one("fe-product-price .subtitle-1, .single-price-amount"):
-                if val := temizle_fiyat(el.get_text()): fiyat = val; kaynak = "Migros(G)"
-            if fiyat == 0:
-                if el := soup.select_one("#sale-price"):
-                    if val := temizle_fiyat(el.get_text()): fiyat = val; kaynak = "Migros(GI)"
-    elif "cimri" in domain:
-        for sel in ["div.rTdMX", ".offer-price", "div.sS0lR", ".min-price-val"]:
-            if els := soup.select(sel):
-                vals = [v for v in [temizle_fiyat(e.get_text()) for e in els] if v and v > 0]
-                if vals:
-                    if len(vals) > 4: vals.sort(); vals = vals[1:-1]
-                    fiyat = sum(vals) / len(vals);
-                    kaynak = f"Cimri({len(vals)})";
-                    break
-        if fiyat == 0:
-            if m := re.findall(r'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?)\s*(?:TL|₺)', soup.get_text()[:10000]):
-                ff = sorted([temizle_fiyat(x) for x in m if temizle_fiyat(x)])
-                if ff: fiyat = sum(ff[:max(1, len(ff) // 2)]) / max(1, len(ff) // 2); kaynak = "Cimri(Reg)"
-    if fiyat == 0 and "migros" not in domain:
-        for sel in [".product-price", ".price", ".current-price", "span[itemprop='price']"]:
-            if el := soup.select_one(sel):
-                if v := temizle_fiyat(el.get_text()): fiyat = v; kaynak = "Genel(CSS)"; break
-    if fiyat == 0 and "migros" not in domain and "cimri" not in domain:
-        if m := re.search(r'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2})?)\s*(?:TL|₺)', soup.get_text()[:5000]):
-            if v := temizle_fiyat(m.group(1)): fiyat = v; kaynak = "Regex"
-    return fiyat, kaynak
+def _endeks_verisi_hazirla(depo):
+    # Sayfa çizimi yalnızca okur ve bellekte hesaplar; artefaktları fiyat_log_guncelle yazar
+    df_s = github_excel_oku(EXCEL_DOSYASI, SAYFA_ADI)
+    if df_s.empty: return None
+    surum = fiyat_surumu(depo)
+    try:
+        art = endeksleri_oku(depo)
+        # Sepet (ağırlık/grup) ya da fiyat deposu (aynı gün yeniden senkronizasyon dahil) değiştiyse bayattır
+        if art and art['meta']['sepet_ozeti'] == sepet_ozeti(df_s) and art['meta'].get('fiyat_surumu') == surum:
+            return art
+    except Exception:
+        pass
+    df_f = fiyat_log_oku()
+    if df_f.empty: return None
+    try:
+        return endeks_hesapla(depo, df_f, surum)
+    except Exception:
+        return endeksleri_hesapla(df_f, df_s)
+
+
+# --- RESMİ ENFLASYON & PROPHET (CACHED) ---
+def get_official_inflation():
+    # EVDS son alınan seriyle hemen döner; eskidiyse piyasa servisi arka planda yeniler
+    if "evds" not in piyasa_servisi().kaynaklar: return None, "API Key Yok"
+    g = piyasa_servisi().oku("evds")
+    if g.deger is None: return None, g.hata or "Yükleniyor"
+    return resmi_enflasyon_tablosu(g.deger), "OK"
+
+
+@st.cache_resource(show_spinner=False)
+def tahmin_motoru():
+    # Tüm oturumlar tek süreç havuzunu ve tek model deposunu paylaşır
+    return TahminMotoru(isci_sayisi=st.secrets.get("ayarlar", {}).get("tahmin_isci_sayisi"))
+
+
+def grup_serileri(df_endeks):
+    return [c for c in df_endeks.columns if c.startswith("Grup_") and not c.endswith("_Gunluk")]
+
+
+def predict_inflation_prophet(df_endeks, seri_adi="TÜFE"):
+    # Son kaydedilmiş tahmin hemen döner; seri değiştiyse yenisi arka planda (önceki modelden ılık) fit edilir.
+    # ayarlar.grup_tahmini açıksa grup endeksleri de aynı anda kuyruğa girip çekirdeklere dağılır.
+    try:
+        adlar = [seri_adi] + (grup_serileri(df_endeks) if st.secrets.get("ayarlar", {}).get("grup_tahmini") else [])
+        tarih = pd.to_datetime(df_endeks['Tarih'])
+        seriler = {ad: pd.DataFrame({'ds': tarih, 'y': df_endeks[ad]}) for ad in dict.fromkeys(adlar)}
+        return tahmin_motoru().toplu_tahmin(seriler)[seri_adi]
+    except Exception as e:
+        st.error(f"Prophet Hatası: {str(e)}")
+        return Tahmin(pd.DataFrame(), None, False, False, None)
+
+
+# --- GRAFİKLER ---
+def paylasilan(anahtar, surum, kur):
+    # Sonuç veri sürümü değişene dek tüm oturumlarla paylaşılır; yeniden çalıştırmada baştan kurulmaz
+    try:
+        katman = veri_katmani()
+    except Exception:
+        return kur()
+    return katman.turet(anahtar, surum, kur)
+
+
+def onbellekli_sekil(anahtar, surum, kur):
+    return paylasilan(("grafik",) + anahtar, surum, kur)
+
+
+def ana_grafik(df_trend, df_forecast, df_resmi, gorunum, sablon):
+    go = modul("grafik", "plotly.graph_objects")
+    trend = df_trend[gorunume_kirp(df_trend['Tarih'], gorunum)]
+    fig_main = go.Figure()
+    fig_main.add_trace(zaman_izi(trend['Tarih'], trend['TÜFE'], mode='lines+markers',
+                                 name='Enflasyon Monitörü', line=dict(color='#2563eb', width=3)))
+    if not df_forecast.empty:
+        future_only = df_forecast[df_forecast['ds'] > df_trend['Tarih'].max()]
+        fig_main.add_trace(zaman_izi(future_only['ds'], future_only['yhat'], mode='lines', name='AI Tahmini',
+                                     line=dict(color='#f59e0b', dash='dot')))
+        fig_main.add_trace(bant_izi(future_only['ds'], future_only['yhat_lower'], future_only['yhat_upper'],
+                                    fillcolor='rgba(245, 158, 11, 0.2)', line=dict(color='rgba(255,255,255,0)'),
+                                    hoverinfo="skip", showlegend=False))
+    if df_resmi is not None and not df_resmi.empty:
+        # Resmi seri görünüme kırpılmaz; eskiden olduğu gibi tamamı çizilir
+        fig_main.add_trace(zaman_izi(df_resmi['Tarih'], df_resmi['Resmi_TUFE'], mode='lines+markers', name='Resmi TÜİK',
+                                     line=dict(color='#ef4444', width=2), marker=dict(symbol='square')))
+
+    fig_main.update_layout(
+        template=sablon,
+        title="Enflasyon: Geçmiş, Şimdi ve Gelecek",
+        title_font=dict(color='white', size=22),
+        legend=dict(orientation="h", y=1.1, font=dict(color="white")),
+        yaxis=dict(title="TÜFE Endeksi", range=[95, 105]),
+        xaxis=dict(range=[trend['Tarih'].min(), f"{df_trend['Tarih'].dt.year.max()}-12-31"]),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_main
 
 
 def html_isleyici(log_callback):
@@ -444,71 +533,62 @@ def html_isleyici(log_callback):
     if not repo: return "GitHub Bağlantı Hatası"
     log_callback("📂 Konfigürasyon okunuyor...")
     try:
-        df_conf = github_excel_oku(EXCEL_DOSYASI, SAYFA_ADI)
-        df_conf.columns = df_conf.columns.str.strip()
-        kod_col = next((c for c in df_conf.columns if c.lower() == 'kod'), None)
-        url_col = next((c for c in df_conf.columns if c.lower() == 'url'), None)
-        ad_col = next((c for c in df_conf.columns if 'ad' in c.lower()), 'Madde adı')
-        if not kod_col or not url_col: return "Hata: Excel sütunları eksik."
-        df_conf['Kod'] = df_conf[kod_col].astype(str).apply(kod_standartlastir)
-        url_map = {str(row[url_col]).strip(): row for _, row in df_conf.iterrows() if pd.notna(row[url_col])}
+        sepet = sepet_oku()
+        if sepet is None: return "Hata: Excel sütunları eksik."
+        tablo = sepet.tablo
         veriler = [];
         islenen_kodlar = set()
         bugun = datetime.now().strftime("%Y-%m-%d");
         simdi = datetime.now().strftime("%H:%M")
 
         log_callback("✍️ Manuel fiyatlar kontrol ediliyor...")
-        manuel_col = next((c for c in df_conf.columns if 'manuel' in c.lower()), None)
-        ms = 0
-        if manuel_col:
-            for _, row in df_conf.iterrows():
-                if pd.notna(row[manuel_col]) and str(row[manuel_col]).strip() != "":
-                    try:
-                        fiyat_man = float(row[manuel_col])
-                        if fiyat_man > 0:
-                            veriler.append({"Tarih": bugun, "Zaman": simdi, "Kod": row['Kod'], "Madde_Adi": row[ad_col],
-                                            "Fiyat": fiyat_man, "Kaynak": "Manuel", "URL": row[url_col]})
-                            islenen_kodlar.add(row['Kod']);
-                            ms += 1
-                    except:
-                        pass
-        if ms > 0: log_callback(f"✅ {ms} manuel fiyat alındı.")
-
-        log_callback("📦 ZIP dosyaları taranıyor...")
-        contents = repo.get_contents("", ref=st.secrets["github"]["branch"])
-        zip_files = [c for c in contents if c.name.endswith(".zip") and c.name.startswith("Bolum")]
+        manuel = tablo[tablo['Manuel_Fiyat'] > 0]
+        for kod, ad, fiyat_man, url in zip(manuel['Kod'], manuel['Madde_Adi'], manuel['Manuel_Fiyat'], manuel['URL']):
+            veriler.append({"Tarih": bugun, "Zaman": simdi, "Kod": kod, "Madde_Adi": ad,
+                            "Fiyat": float(fiyat_man), "Kaynak": "Manuel", "URL": url})
+            islenen_kodlar.add(kod)
+        if len(manuel) > 0: log_callback(f"✅ {len(manuel)} manuel fiyat alındı.")
+
+        isci_url_map = {u: (k, u) for u, k in sepet.url_kod.items()}
+        bagli = tablo[tablo['URL'].notna()]
+        kod_satir = dict(zip(bagli['Kod'], zip(bagli['Madde_Adi'], bagli['URL'])))
+        ayarlar = st.secrets.get("ayarlar", {})
+        isci_sayisi = int(ayarlar.get("isci_sayisi", VARSAYILAN_ISCI_SAYISI))
+        ayristirici = ayarlar.get("ayristirici", VARSAYILAN_AYRISTIRICI)
+        try:
+            onbellek = AyristirmaOnbellegi()
+        except Exception as e:
+            onbellek = None
+            log_callback(f"⚠️ Ayrıştırma önbelleği açılamadı: {str(e)}")
         hs = 0
-        for zip_file in zip_files:
-            log_callback(f"📂 Arşiv okunuyor: {zip_file.name}")
-            try:
-                blob = repo.get_git_blob(zip_file.sha)
-                zip_data = base64.b64decode(blob.content)
-                with zipfile.ZipFile(BytesIO(zip_data)) as z:
-                    for file_name in z.namelist():
-                        if not file_name.endswith(('.html', '.htm')): continue
-                        with z.open(file_name) as f:
-                            raw = f.read().decode("utf-8", errors="ignore")
-                            soup = BeautifulSoup(raw, 'html.parser')
-                            found_url = None
-                            if c := soup.find("link", rel="canonical"): found_url = c.get("href")
-                            if not found_url and (m := soup.find("meta", property="og:url")): found_url = m.get(
-                                "content")
-                            if found_url and str(found_url).strip() in url_map:
-                                target = url_map[str(found_url).strip()]
-                                if target['Kod'] in islenen_kodlar: continue
-                                fiyat, kaynak = fiyat_bul_siteye_gore(soup, target[url_col])
-                                if fiyat > 0:
-                                    veriler.append({"Tarih": bugun, "Zaman": simdi, "Kod": target['Kod'],
-                                                    "Madde_Adi": target[ad_col], "Fiyat": fiyat, "Kaynak": kaynak,
-                                                    "URL": target[url_col]})
-                                    islenen_kodlar.add(target['Kod']);
-                                    hs += 1
-            except Exception as e:
-                log_callback(f"⚠️ Hata ({zip_file.name}): {str(e)}")
+        atlanan = Counter()
+        try:
+            log_callback("📦 ZIP dosyaları taranıyor...")
+            arsivler = arsivleri_hazirla(repo, st.secrets["github"]["branch"], onbellek, log_callback)
+            log_callback(f"⚙️ HTML dosyaları ayrıştırılıyor ({isci_sayisi} işçi, {ayristirici})...")
+            # Manuel fiyatı olan kodlar ön elemede atlanır, hiç ayrıştırılmaz
+            bulunanlar = arsivleri_isle(arsivler, isci_url_map, isci_sayisi, ayristirici,
+                                        haric_kodlar=islenen_kodlar, sayac=atlanan, onbellek=onbellek)
+        finally:
+            if onbellek: onbellek.kapat()
+        for kod, fiyat, kaynak in bulunanlar:
+            ad, url = kod_satir[kod]
+            veriler.append({"Tarih": bugun, "Zaman": simdi, "Kod": kod, "Madde_Adi": ad,
+                            "Fiyat": fiyat, "Kaynak": kaynak, "URL": url})
+            islenen_kodlar.add(kod);
+            hs += 1
+        if atlanmis := atlanan_arsivler(arsivler):
+            log_callback(f"⏭️ {len(atlanmis)} arşiv değişmediği için indirilmedi "
+                         f"({sum(a.boyut for a in atlanmis) / 1e6:.1f} MB).")
+        log_callback(f"⏭️ Ön eleme: {atlanan['eslesmeyen']} eşleşmeyen, {atlanan['manuel']} manuel, "
+                     f"{atlanan['tekrar']} tekrar dosya atlandı; {atlanan['tam_ayristirma']} dosya tam ayrıştırıldı.")
+        if atlanan['onbellek']: log_callback(f"♻️ {atlanan['onbellek']} değişmemiş sayfa önbellekten alındı.")
+        if atlanan['manifest']: log_callback(f"🗂️ {atlanan['manifest']} sayfa günlük arşiv manifestinden eşlendi.")
+        if hs > 0: log_callback(f"✅ {hs} HTML fiyatı alındı.")
 
         if veriler:
             log_callback(f"💾 {len(veriler)} veri kaydediliyor...")
-            return github_excel_guncelle(pd.DataFrame(veriler), FIYAT_DOSYASI)
+            return fiyat_log_guncelle(pd.DataFrame(veriler))
         else:
             return "Veri bulunamadı."
     except Exception as e:
@@ -518,14 +598,13 @@ def html_isleyici(log_callback):
 # --- DASHBOARD MODU ---
 def dashboard_modu():
     bugun = datetime.now().strftime("%Y-%m-%d")
-    df_f = github_excel_oku(FIYAT_DOSYASI)
-    df_s = github_excel_oku(EXCEL_DOSYASI, SAYFA_ADI)
+    art = endeks_verisi_oku()
 
     # --- SIDEBAR ---
     with st.sidebar:
         # 1. PİYASA GÖSTERGELERİ
         try:
-            rates = get_exchange_rates()
+            rates, rates_yas = get_exchange_rates()
             st.markdown(
                 "<h3 style='color:#1e293b; font-size:14px; margin-bottom:10px; padding-left:5px;'>💱 PİYASA GÖSTERGELERİ</h3>",
                 unsafe_allow_html=True)
@@ -545,7 +624,7 @@ def dashboard_modu():
                     <div style="font-size:10px; color:#64748b; font-weight:700;">GRAM ALTIN </div>
                     <div style="font-size:15px; color:#f59e0b; font-weight:800;">{rates['GA']:.2f} ₺</div>
                 </div>
-                <div style="text-align:right; font-size:9px; color:#94a3b8; margin-top:5px; margin-bottom:20px;">Veriler: TCMB</div>
+                <div style="text-align:right; font-size:9px; color:#94a3b8; margin-top:5px; margin-bottom:20px;">Veriler: TCMB · {yas_metni(rates_yas)}</div>
                 <div style="border-bottom:1px solid #e2e8f0; margin-bottom:20px;"></div>
                 """, unsafe_allow_html=True)
         except:
@@ -627,7 +706,7 @@ def dashboard_modu():
             status.update(label="İşlem Tamamlandı!", state="complete", expanded=False)
 
         if "OK" in res:
-            st.cache_data.clear()
+            # Yazımlar veri katmanını zaten bayat işaretledi; kur/Prophet önbellekleri korunur
             st.toast('Veritabanı Güncellendi!', icon='🎉')
             st.success("✅ Sistem Başarıyla Senkronize Edildi!")
             time.sleep(2)
@@ -639,51 +718,17 @@ def dashboard_modu():
     st.markdown('</div>', unsafe_allow_html=True)
     st.markdown("<br>", unsafe_allow_html=True)
 
-    if not df_f.empty and not df_s.empty:
+    if art:
         try:
-            df_s.columns = df_s.columns.str.strip()
-            kod_col = next((c for c in df_s.columns if c.lower() == 'kod'), 'Kod')
-            ad_col = next((c for c in df_s.columns if 'ad' in c.lower()), 'Madde adı')
-            agirlik_col = next((c for c in df_s.columns if 'agirlik' in c.lower().replace('ğ', 'g').replace('ı', 'i')),
-                               'Agirlik_2025')
-
-            df_f['Kod'] = df_f['Kod'].astype(str).apply(kod_standartlastir)
-            df_s['Kod'] = df_s[kod_col].astype(str).apply(kod_standartlastir)
-            df_f['Tarih_DT'] = pd.to_datetime(df_f['Tarih'], errors='coerce')
-            df_f = df_f.dropna(subset=['Tarih_DT']).sort_values('Tarih_DT')
-            df_f['Tarih_Str'] = df_f['Tarih_DT'].dt.strftime('%Y-%m-%d')
-            df_f['Fiyat'] = pd.to_numeric(df_f['Fiyat'], errors='coerce')
-            df_f = df_f[df_f['Fiyat'] > 0]
-
-            pivot = df_f.pivot_table(index='Kod', columns='Tarih_Str', values='Fiyat', aggfunc='last').ffill(
-                axis=1).bfill(axis=1).reset_index()
-
-            if not pivot.empty:
-                if 'Grup' not in df_s.columns:
-                    grup_map = {"01": "Gıda", "02": "Alkol", "03": "Giyim", "04": "Konut", "05": "Ev", "06": "Sağlık",
-                                "07": "Ulaşım", "08": "İletişim", "09": "Eğlence", "10": "Eğitim", "11": "Lokanta",
-                                "12": "Çeşitli"}
-                    df_s['Grup'] = df_s['Kod'].str[:2].map(grup_map).fillna("Diğer")
-                df_analiz = pd.merge(df_s, pivot, on='Kod', how='left')
-                if agirlik_col in df_analiz.columns:
-                    df_analiz[agirlik_col] = pd.to_numeric(df_analiz[agirlik_col], errors='coerce').fillna(1)
-                else:
-                    df_analiz['Agirlik_2025'] = 1;
-                    agirlik_col = 'Agirlik_2025'
-
-                gunler = [c for c in pivot.columns if c != 'Kod']
-                if len(gunler) < 1: st.warning("Yeterli tarih verisi yok."); return
-                baz, son = gunler[0], gunler[-1]
-
-                endeks_genel = (df_analiz.dropna(subset=[son, baz])[agirlik_col] * (
-                        df_analiz[son] / df_analiz[baz])).sum() / df_analiz.dropna(subset=[son, baz])[
-                                   agirlik_col].sum() * 100
-                enf_genel = (endeks_genel / 100 - 1) * 100
-                df_analiz['Fark'] = (df_analiz[son] / df_analiz[baz]) - 1
+            # Endeksler veri güncellemesinde hesaplanıp saklanır; burada yalnızca okunur
+            df_analiz, df_endeks, meta = art['analiz'], art['endeks'], art['meta']
+            ad_col, agirlik_col = meta['ad_col'], meta['agirlik_col']
+            gunler = meta['gunler']
+            baz, son = meta['baz'], meta['son']
+            enf_genel, enf_gida = meta['enf_genel'], meta['enf_gida']
+
+            if not df_analiz.empty:
                 top = df_analiz.sort_values('Fark', ascending=False).iloc[0]
-                gida = df_analiz[df_analiz['Kod'].str.startswith("01")].copy()
-                enf_gida = ((gida[son] / gida[baz] * gida[agirlik_col]).sum() / gida[
-                    agirlik_col].sum() - 1) * 100 if not gida.empty else 0
 
                 dt_son = datetime.strptime(son, '%Y-%m-%d')
                 dt_baz = datetime.strptime(baz, '%Y-%m-%d')
@@ -692,13 +737,6 @@ def dashboard_modu():
                 gun_farki = (dt_son - dt_baz).days
 
                 # --- KAYAN YAZI (TICKER) ---
-                if len(gunler) >= 2:
-                    dunku_tarih = gunler[-2]
-                    bugunku_tarih = gunler[-1]
-                    df_analiz['Gunluk_Degisim'] = (df_analiz[bugunku_tarih] / df_analiz[dunku_tarih]) - 1
-                else:
-                    df_analiz['Gunluk_Degisim'] = 0
-
                 inc = df_analiz.sort_values('Gunluk_Degisim', ascending=False).head(5)
                 dec = df_analiz.sort_values('Gunluk_Degisim', ascending=True).head(5)
 
@@ -751,6 +789,9 @@ def dashboard_modu():
                              "card-orange", is_long_text=True)
                 st.markdown("<br>", unsafe_allow_html=True)
 
+                px = modul("grafik", "plotly.express")
+                go = modul("grafik", "plotly.graph_objects")
+
                 # --- SEKMELER (Sepet ve Alarm Kaldırıldı) ---
                 t_analiz, t_istatistik, t_harita, t_firsat, t_liste, t_haber, t_rapor = st.tabs(
                     ["📊 ANALİZ", "📈 İSTATİSTİK", "🗺️ HARİTA", "📉 PİYASA VERİLERİ", "📋 LİSTE", "📰 HABERLER",
@@ -758,51 +799,31 @@ def dashboard_modu():
 
                 with t_analiz:
                     st.markdown("### 📈 Enflasyon Momentum Analizi ve Gelecek Tahmini")
-                    trend_data = [{"Tarih": g, "TÜFE": (df_analiz.dropna(subset=[g, baz])[agirlik_col] * (
-                            df_analiz[g] / df_analiz[baz])).sum() / df_analiz.dropna(subset=[g, baz])[
-                                                           agirlik_col].sum() * 100} for g in gunler]
-                    df_trend = pd.DataFrame(trend_data)
+                    seri_adi = "TÜFE"
+                    if st.secrets.get("ayarlar", {}).get("grup_tahmini"):
+                        seri_adi = st.selectbox("Tahmin serisi", ["TÜFE"] + grup_serileri(df_endeks),
+                                                format_func=lambda x: x.replace("Grup_", ""))
+                    df_trend = df_endeks[['Tarih', seri_adi]].rename(columns={seri_adi: 'TÜFE'})
                     df_trend['Tarih'] = pd.to_datetime(df_trend['Tarih'])
                     df_resmi, msg = get_official_inflation()
 
-                    with st.spinner("Gelecek tahmini yapıyor..."):
-                        df_forecast = predict_inflation_prophet(df_trend)
-
-                    current_year = df_trend['Tarih'].dt.year.max()
-                    start_date = df_trend['Tarih'].min()
-                    end_date_fixed = f"{current_year}-12-31"
-
-                    fig_main = go.Figure()
-                    fig_main.add_trace(go.Scatter(x=df_trend['Tarih'], y=df_trend['TÜFE'], mode='lines+markers',
-                                                  name='Enflasyon Monitörü', line=dict(color='#2563eb', width=3)))
-                    if not df_forecast.empty:
-                        future_only = df_forecast[df_forecast['ds'] > df_trend['Tarih'].max()]
-                        fig_main.add_trace(
-                            go.Scatter(x=future_only['ds'], y=future_only['yhat'], mode='lines', name='AI Tahmini',
-                                       line=dict(color='#f59e0b', dash='dot')))
-                        fig_main.add_trace(go.Scatter(x=future_only['ds'].tolist() + future_only['ds'].tolist()[::-1],
-                                                      y=future_only['yhat_upper'].tolist() + future_only[
-                                                                                                 'yhat_lower'].tolist()[
-                                                                                             ::-1], fill='toself',
-                                                      fillcolor='rgba(245, 158, 11, 0.2)',
-                                                      line=dict(color='rgba(255,255,255,0)'), hoverinfo="skip",
-                                                      showlegend=False))
-                    if df_resmi is not None and not df_resmi.empty:
-                        fig_main.add_trace(
-                            go.Scatter(x=df_resmi['Tarih'], y=df_resmi['Resmi_TUFE'], mode='lines+markers',
-                                       name='Resmi TÜİK', line=dict(color='#ef4444', width=2),
-                                       marker=dict(symbol='square')))
-
-                    fig_main.update_layout(
-                        template=st.session_state.plotly_template,
-                        title="Enflasyon: Geçmiş, Şimdi ve Gelecek",
-                        title_font=dict(color='white', size=22),
-                        legend=dict(orientation="h", y=1.1, font=dict(color="white")),
-                        yaxis=dict(title="TÜFE Endeksi", range=[95, 105]),
-                        xaxis=dict(range=[start_date, end_date_fixed]),
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)'
-                    )
+                    tahmin = predict_inflation_prophet(df_endeks, seri_adi)
+                    df_forecast = tahmin.tablo
+                    if tahmin.hata:
+                        st.caption(f"⚠️ Tahmin güncellenemedi, son hesaplanan gösteriliyor: {tahmin.hata}")
+                    elif not tahmin.guncel and df_forecast.empty:
+                        st.caption("⏳ İlk tahmin arka planda hesaplanıyor; sayfa yenilendiğinde görünecek.")
+                    elif not tahmin.guncel:
+                        st.caption("⏳ Tahmin arka planda güncelleniyor; son hesaplanan tahmin gösteriliyor.")
+
+                    gorunum = st.radio("Görünüm", list(GORUNUMLER), horizontal=True)
+                    sablon = st.session_state.plotly_template
+                    # Değerlerin özeti: EVDS geçmiş bir ayı revize ederse de şekil yeniden kurulur
+                    resmi_surum = None if df_resmi is None or df_resmi.empty else \
+                        int(pd.util.hash_pandas_object(df_resmi, index=False).sum())
+                    fig_main = onbellekli_sekil(("ana", seri_adi, gorunum, sablon),
+                                                (meta['olusturma'], meta['son'], tahmin.ozet, resmi_surum),
+                                                lambda: ana_grafik(df_trend, df_forecast, df_resmi, gorunum, sablon))
                     st.plotly_chart(fig_main, use_container_width=True)
 
                 with t_istatistik:
@@ -810,7 +831,6 @@ def dashboard_modu():
                     col_hist, col_vol = st.columns(2)
 
                     # 1. Histogram
-                    df_analiz['Fark_Yuzde'] = df_analiz['Fark'] * 100
                     fig_hist = px.histogram(df_analiz, x="Fark_Yuzde", nbins=40, title="📊 Zam Dağılımı Frekansı",
                                             color_discrete_sequence=['#8b5cf6'])
                     fig_hist.update_layout(
@@ -825,37 +845,41 @@ def dashboard_modu():
 
                     # 2. Volatilite Analizi
                     try:
-                        fiyat_sutunlari = [c for c in pivot.columns if c != 'Kod']
-                        pivot['Std'] = pivot[fiyat_sutunlari].std(axis=1)
-                        pivot['Mean'] = pivot[fiyat_sutunlari].mean(axis=1)
-                        pivot['Volatilite'] = (pivot['Std'] / pivot['Mean']) * 100
-
-                        df_vol = pd.merge(df_analiz, pivot[['Kod', 'Volatilite']], on='Kod', how='left')
-
-                        fig_vol = px.scatter(df_vol, x="Fark_Yuzde", y="Volatilite", color="Grup",
-                                             hover_data=[ad_col],
-                                             title="⚡ Risk Analizi: Fiyat Hareketliliği vs Değişim",
-                                             labels={"Fark_Yuzde": "Fiyat Değişimi (%)",
-                                                     "Volatilite": "Hareketlilik Endeksi (Risk)"})
-
-                        fig_vol.add_vline(x=0, line_dash="dash", line_color="gray", opacity=0.5)
-                        fig_vol.add_hline(y=df_vol['Volatilite'].mean(), line_dash="dash", line_color="red",
-                                          annotation_text="Ortalama Risk")
-
-                        fig_vol.update_layout(
-                            template=st.session_state.plotly_template,
-                            title_font=dict(color='white', size=22),
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            legend=dict(
-                                font=dict(color='white')
+                        # Volatilite artefaktta hazır gelir (istatistik_motoru); burada yeniden hesaplanmaz
+                        df_vol = df_analiz
+                        vol_col = "Volatilite"
+                        if "Volatilite_Pencere" in df_vol.columns and col_vol.radio(
+                                "Dönem", ["Tüm geçmiş", f"Son {PENCERE_GUN} gün"], horizontal=True) != "Tüm geçmiş":
+                            vol_col = "Volatilite_Pencere"
+
+                        def oynaklik_grafigi(sablon=st.session_state.plotly_template):
+                            fig_vol = px.scatter(df_vol, x="Fark_Yuzde", y=vol_col, color="Grup",
+                                                 hover_data=[ad_col], render_mode=dagilim_modu(len(df_vol)),
+                                                 title="⚡ Risk Analizi: Fiyat Hareketliliği vs Değişim",
+                                                 labels={"Fark_Yuzde": "Fiyat Değişimi (%)",
+                                                         vol_col: "Hareketlilik Endeksi (Risk)"})
+
+                            fig_vol.add_vline(x=0, line_dash="dash", line_color="gray", opacity=0.5)
+                            fig_vol.add_hline(y=df_vol[vol_col].mean(), line_dash="dash", line_color="red",
+                                              annotation_text="Ortalama Risk")
+
+                            fig_vol.update_layout(
+                                template=sablon,
+                                title_font=dict(color='white', size=22),
+                                plot_bgcolor='rgba(0,0,0,0)',
+                                paper_bgcolor='rgba(0,0,0,0)',
+                                legend=dict(
+                                    font=dict(color='white')
+                                )
                             )
-                        )
+                            return fig_vol
 
+                        fig_vol = onbellekli_sekil(("oynaklik", vol_col, st.session_state.plotly_template),
+                                                   (meta['olusturma'], meta['son']), oynaklik_grafigi)
                         col_vol.plotly_chart(fig_vol, use_container_width=True)
-                        riskli_urunler = df_vol.sort_values("Volatilite", ascending=False).head(3)
+                        riskli_urunler = df_vol.nlargest(3, vol_col)
                         st.info(f"⚠️ **En Dengesiz Fiyatlar:** " + ", ".join(
-                            [f"{r[ad_col]} (Risk: {r['Volatilite']:.1f})" for _, r in riskli_urunler.iterrows()]))
+                            [f"{ad} (Risk: {v:.1f})" for ad, v in zip(riskli_urunler[ad_col], riskli_urunler[vol_col])]))
                     except Exception as e:
                         col_vol.error(f"Volatilite hesaplanamadı: {e}")
 
@@ -890,6 +914,11 @@ def dashboard_modu():
                         target_url = f"https://www.google.com/search?q={selected_product}&tbm=shop&hl=tr&gl=TR"
                         with st.spinner("Google Taranıyor..."):
                             try:
+                                webdriver = modul("piyasa_tarama", "selenium.webdriver")
+                                Service = modul("piyasa_tarama", "selenium.webdriver.chrome.service").Service
+                                Options = modul("piyasa_tarama", "selenium.webdriver.chrome.options").Options
+                                By = modul("piyasa_tarama", "selenium.webdriver.common.by").By
+                                WebDriverWait = modul("piyasa_tarama", "selenium.webdriver.support.ui").WebDriverWait
                                 chrome_options = Options()
                                 chrome_options.add_argument("--headless")
                                 chrome_options.add_argument("--no-sandbox")
@@ -987,20 +1016,38 @@ def dashboard_modu():
                                 st.error(f"Sistem Hatası: {e}")
 
                 with t_liste:
+                    # Tabloya yalnızca seçili sayfa gönderilir
+                    col_boy, col_sayfa = st.columns([1, 3])
+                    boy = col_boy.selectbox("Satır/sayfa", SAYFA_BOYLARI, index=1)
+                    toplam_sayfa = sayfa_sayisi(len(df_analiz), boy)
+                    no = col_sayfa.number_input(f"Sayfa (toplam {toplam_sayfa})", min_value=1,
+                                                max_value=toplam_sayfa, value=1)
                     st.data_editor(
-                        df_analiz[['Grup', ad_col, 'Fark', baz, son]],
+                        sayfa(df_analiz[['Grup', ad_col, 'Fark', baz, son]], no, boy),
                         column_config={
                             "Fark": st.column_config.ProgressColumn("Değişim Oranı", format="%.2f", min_value=-0.5,
                                                                     max_value=0.5), ad_col: "Ürün Adı",
                             "Grup": "Kategori"},
-                        hide_index=True, use_container_width=True
+                        hide_index=True, use_container_width=True, disabled=True
                     )
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer: df_analiz.to_excel(writer, index=False,
-                                                                                                 sheet_name='Analiz')
-                    st.download_button("📥 Excel Raporunu İndir", data=output.getvalue(),
-                                       file_name=f"Enflasyon_Raporu_{son}.xlsx",
-                                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+                    # Rapor dosyası yalnızca istendiğinde üretilir ve veri sürümü başına bir kez hazırlanır
+                    col_bicim, col_hazirla = st.columns([1, 3])
+                    bicimler = list(BICIMLER)
+                    bicim = col_bicim.selectbox("Biçim", bicimler, index=bicimler.index("csv" if buyuk_mu(
+                        df_analiz) else "xlsx"), format_func=lambda b: BICIMLER[b].ad)
+                    if buyuk_mu(df_analiz) and bicim == "xlsx":
+                        st.caption("ℹ️ Tablo büyük; CSV ya da Parquet çok daha hızlı hazırlanır.")
+                    disa_surum = (bicim, meta['olusturma'], meta['son'])
+                    if col_hazirla.button("📦 Raporu Hazırla"):
+                        st.session_state.disa_aktarim = disa_surum
+                    if st.session_state.get("disa_aktarim") == disa_surum:
+                        with st.spinner("Rapor hazırlanıyor..."):
+                            veri = paylasilan(("disa_aktarim", bicim), disa_surum,
+                                              lambda: disa_aktar(df_analiz, bicim))
+                        st.download_button(f"📥 {BICIMLER[bicim].ad} Raporunu İndir", data=veri,
+                                           file_name=f"Enflasyon_Raporu_{son}.{BICIMLER[bicim].uzanti}",
+                                           mime=BICIMLER[bicim].mime)
 
                 with t_haber:
                     st.markdown("### 🌍 Piyasa Gündemi")
@@ -1028,7 +1075,7 @@ def dashboard_modu():
                                 for kat, oran in sepet_dagilimi.items(): durum = "YÜKSELİŞ" if oran > 0 else "DÜŞÜŞ"; kategori_metni += f"- {kat}: %{oran * 100:.2f} ({durum})\n"
                                 report_summary = f"Tarih: {datetime.now().strftime('%d-%m-%Y')}\nGenel Enflasyon: %{enf_genel:.2f}\nGıda Enflasyonu: %{enf_gida:.2f}\nEn Çok Artan: {top[ad_col]} (%{top['Fark'] * 100:.2f})\nTahmin: %{month_end_forecast:.2f}"
                                 prompt_report = f"Sen kıdemli bir analistsin. Şu verilere göre PROFESYONEL bir rapor yaz:\nVERİLER:\n{report_summary}\nSEKTÖREL:\n{kategori_metni}\nŞABLON: 1.GİRİŞ 2.DETAYLAR 3.ÖNGÖRÜ. İmza: Enflasyon Monitörü Ekibi"
-                                model_rep = genai.GenerativeModel('gemini-2.5-flash')
+                                model_rep = llm_modeli()
                                 st.session_state['report_text'] = model_rep.generate_content(prompt_report).text
                                 st.success("Rapor oluşturuldu!")
                     if st.session_state['report_text']:
@@ -1042,6 +1089,11 @@ def dashboard_modu():
 
         except Exception as e:
             st.error(f"Kritik Hata: {e}")
+    if st.secrets.get("ayarlar", {}).get("acilis_olcumu"):
+        with st.sidebar.expander("⏱️ Alt sistem yükleme süreleri"):
+            for ad, sure in sorted(yukleme_sureleri.items(), key=lambda x: -x[1]):
+                st.caption(f"{ad}: {sure * 1000:.0f} ms")
+            if not yukleme_sureleri: st.caption("Bu süreçte henüz isteğe bağlı alt sistem yüklenmedi.")
     st.markdown(
         '<div style="text-align:center; color:#94a3b8; font-size:11px; margin-top:50px;">DESIGNED BY FATIH ARSLAN © 2025</div>',
         unsafe_allow_html=True)
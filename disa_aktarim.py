@@ -0,0 +1,75 @@
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+# --- AYARLAR ---
+# Rapor dosyaları yalnızca istendiğinde üretilir (sonucu uygulama veri sürümüne göre önbelleğe alır).
+# Excel, xlsxwriter'ın constant_memory kipiyle satır satır yazılır: tablo bellekte ikinci kez kurulmaz.
+# Streamlit'ten bağımsızdır.
+Bicim = namedtuple("Bicim", "ad uzanti mime")
+BICIMLER = {
+    "xlsx": Bicim("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": Bicim("CSV", "csv", "text/csv"),
+    "parquet": Bicim("Parquet", "parquet", "application/vnd.apache.parquet"),
+}
+BUYUK_HUCRE = 1_000_000  # Bu kadar hücreyi aşan tablolarda CSV/Parquet önerilir
+PARCA_SATIR = 5_000  # Excel'e yazarken Python nesnesine çevrilen satır bloğu
+SAYFA_BOYLARI = (50, 100, 250, 500)
+
+
+# --- BİÇİMLER ---
+def _nesne_sutunlari(df):
+    # NaN/NaT -> None (boş hücre); numpy skalerleri Python int/float/Timestamp olur
+    return [s.astype(object).where(s.notna(), None).to_numpy() for _, s in df.items()]
+
+
+def excel_baytlari(df, sayfa_adi="Analiz"):
+    """DataFrame -> xlsx baytları; başlık + değerler, indeks yazılmaz (to_excel(index=False) ile aynı hücreler)."""
+    out = BytesIO()
+    wb = xlsxwriter.Workbook(out, {"constant_memory": True, "strings_to_urls": False,
+                                   "strings_to_formulas": False, "default_date_format": "yyyy-mm-dd"})
+    ws = wb.add_worksheet(sayfa_adi)
+    baslik = wb.add_format({"bold": True})
+    ws.write_row(0, 0, [str(c) for c in df.columns], baslik)
+    satir = 1
+    for bas in range(0, len(df), PARCA_SATIR):
+        for degerler in zip(*_nesne_sutunlari(df.iloc[bas:bas + PARCA_SATIR])):
+            ws.write_row(satir, 0, degerler)
+            satir += 1
+    wb.close()
+    return out.getvalue()
+
+
+def csv_baytlari(df):
+    # utf-8-sig: Excel Türkçe karakterleri doğru açsın
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+
+def parquet_baytlari(df):
+    out = BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), out, compression="zstd")
+    return out.getvalue()
+
+
+def disa_aktar(df, bicim):
+    """BICIMLER anahtarına göre dosya baytları."""
+    return {"xlsx": excel_baytlari, "csv": csv_baytlari, "parquet": parquet_baytlari}[bicim](df)
+
+
+def buyuk_mu(df):
+    return df.shape[0] * max(df.shape[1], 1) > BUYUK_HUCRE
+
+
+# --- SAYFALAMA ---
+def sayfa_sayisi(n, boy):
+    return max(1, -(-n // boy))
+
+
+def sayfa(df, no, boy):
+    """1'den başlayan no'lu sayfa; tarayıcıya yalnızca bu satırlar gönderilir."""
+    no = int(np.clip(no, 1, sayfa_sayisi(len(df), boy)))
+    return df.iloc[(no - 1) * boy: no * boy]
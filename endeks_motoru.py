@@ -0,0 +1,147 @@
+import hashlib
+import json
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from istatistik_motoru import istatistikler
+from sepet_katmani import kodlari_standartlastir, sepeti_hazirla
+
+# --- AYARLAR ---
+# Endeksler her veri güncellemesinde bir kez hesaplanıp Endeks/ altına yazılır; dashboard yalnızca okur.
+#   - analiz.parquet: sepet × gün fiyat matrisi + madde bazlı Fark / Gunluk_Degisim / Volatilite
+#                     (şema metadatasında baz/son günler, sütun adları ve KPI'lar)
+#   - endeks.parquet: günlük TÜFE, Gıda ve grup endeksleri ile günlük değişimleri
+ENDEKS_DIZINI = "Endeks"
+ANALIZ_DOSYASI = f"{ENDEKS_DIZINI}/analiz.parquet"
+ENDEKS_DOSYASI = f"{ENDEKS_DIZINI}/endeks.parquet"
+META_ANAHTARI = b"endeks_meta"
+GIDA_ON_EKI = "01"
+
+
+# --- HAZIRLIK ---
+def sepet_ozeti(df_s):
+    """Sepet tablosunun içerik özeti; ağırlık/grup değişince artefaktların bayatladığını anlamak için."""
+    h = hashlib.sha1("|".join(map(str, df_s.columns)).encode("utf-8"))
+    if not df_s.empty:
+        h.update(pd.util.hash_pandas_object(df_s.astype(str), index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def fiyat_matrisi(df_f):
+    """Kod × gün fiyat matrisi; eksik günler önceki (yoksa sonraki) fiyatla doldurulur."""
+    df_f = df_f.copy()
+    df_f['Kod'] = kodlari_standartlastir(df_f['Kod'])
+    df_f['Tarih_DT'] = pd.to_datetime(df_f['Tarih'], errors='coerce')
+    df_f = df_f.dropna(subset=['Tarih_DT']).sort_values('Tarih_DT')
+    df_f['Tarih_Str'] = df_f['Tarih_DT'].dt.strftime('%Y-%m-%d')
+    df_f['Fiyat'] = pd.to_numeric(df_f['Fiyat'], errors='coerce')
+    df_f = df_f[df_f['Fiyat'] > 0]
+    if df_f.empty: return pd.DataFrame()
+    return df_f.pivot_table(index='Kod', columns='Tarih_Str', values='Fiyat', aggfunc='last').ffill(
+        axis=1).bfill(axis=1)
+
+
+# --- VEKTÖREL ÇEKİRDEK ---
+# Streamlit/pandas'tan bağımsız, yalnızca NumPy dizileriyle çalışır.
+def kume_uyeligi(etiket_kodlari, kume_sayisi):
+    """pd.factorize tarzı tamsayı etiketlerden (küme × madde) bool üyelik matrisi; -1 hiçbir kümeye girmez."""
+    return np.asarray(etiket_kodlari)[None, :] == np.arange(kume_sayisi)[:, None]
+
+
+def laspeyres_endeksleri(fiyatlar, agirliklar, uyelik, gecerli=None, baz=0):
+    """Tüm günler ve tüm kümeler için ağırlıklı Laspeyres endeksi (baz gün = 100).
+
+    fiyatlar: (madde × gün) float64, agirliklar: (madde,), uyelik: (küme × madde) bool,
+    gecerli: (madde × gün) bool, verilmezse NaN olmayan hücreler. Her gün yalnızca o gün ve baz günde
+    geçerli fiyatı olan maddeler sayılır. Sonuç (küme × gün); hiç geçerli maddesi olmayan hücre NaN.
+    """
+    fiyatlar = np.asarray(fiyatlar, dtype=np.float64)
+    if gecerli is None: gecerli = ~np.isnan(fiyatlar)
+    gecerli = gecerli & gecerli[:, [baz]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        oran = np.where(gecerli, fiyatlar / fiyatlar[:, [baz]], 0.0)
+        agirlikli_uyelik = np.asarray(uyelik, dtype=np.float64) * np.asarray(agirliklar, dtype=np.float64)
+        return (agirlikli_uyelik @ oran) / (agirlikli_uyelik @ gecerli) * 100
+
+
+def endeksleri_hesapla(df_f, df_s, durum=None):
+    """Fiyat geçmişi ve sepetten endeks artefaktlarını üretir: {'analiz', 'endeks', 'meta'} ya da None.
+
+    durum (istatistik_motoru) aynı baz/son günlere aitse madde istatistikleri ondan okunur; yoksa matristen
+    hesaplanır (Volatilite_Pencere o zaman eksik kalır).
+    """
+    ozet = sepet_ozeti(df_s)
+    df_s, ad_col, agirlik_col = sepeti_hazirla(df_s)
+    pivot = fiyat_matrisi(df_f)
+    if pivot.empty: return None
+    gunler = list(pivot.columns)
+    baz, son = gunler[0], gunler[-1]
+
+    df_analiz = pd.merge(df_s, pivot.reset_index(), on='Kod', how='left')
+    if agirlik_col in df_analiz.columns:
+        df_analiz[agirlik_col] = pd.to_numeric(df_analiz[agirlik_col], errors='coerce').fillna(1)
+    else:
+        df_analiz['Agirlik_2025'] = 1;
+        agirlik_col = 'Agirlik_2025'
+
+    # Madde bazlı değişimler
+    if durum is not None and (durum.baz, durum.son, durum.gun_sayisi) == (baz, son, len(gunler)):
+        ist = istatistikler(durum)
+        for c in ist.columns:
+            df_analiz[c] = df_analiz['Kod'].map(ist[c])
+    else:
+        df_analiz['Fark'] = (df_analiz[son] / df_analiz[baz]) - 1
+        df_analiz['Fark_Yuzde'] = df_analiz['Fark'] * 100
+        df_analiz['Gunluk_Degisim'] = (df_analiz[gunler[-1]] / df_analiz[gunler[-2]]) - 1 if len(gunler) >= 2 else 0
+        df_analiz['Volatilite'] = df_analiz[gunler].std(axis=1) / df_analiz[gunler].mean(axis=1) * 100
+
+    # Günlük endeksler: genel, gıda ve gruplar tek maskeli matris çarpımıyla
+    fiyatlar = df_analiz[gunler].to_numpy(dtype=np.float64)
+    agirliklar = df_analiz[agirlik_col].to_numpy(dtype=np.float64)
+    gida_mi = df_analiz['Kod'].str.startswith(GIDA_ON_EKI).to_numpy(dtype=bool)
+    grup_kodlari, grup_adlari = pd.factorize(df_analiz['Grup'], sort=True)
+    uyelik = np.vstack([np.ones_like(gida_mi), gida_mi, kume_uyeligi(grup_kodlari, len(grup_adlari))])
+    adlar = ["TÜFE", "Gıda"] + [f"Grup_{ad}" for ad in grup_adlari]
+    df_endeks = pd.DataFrame(laspeyres_endeksleri(fiyatlar, agirliklar, uyelik).T, columns=adlar)
+    gunluk = (df_endeks / df_endeks.shift(1) - 1) * 100
+    df_endeks = pd.concat([pd.DataFrame({"Tarih": gunler}), df_endeks, gunluk.add_suffix("_Gunluk")], axis=1)
+
+    endeks_genel = df_endeks["TÜFE"].iloc[-1]
+    # Gıda KPI'ında paydada fiyatı eksik maddelerin ağırlığı da sayılır (dashboard'un tarihsel tanımı)
+    oran_son = np.nan_to_num(fiyatlar[gida_mi, -1] / fiyatlar[gida_mi, 0])
+    enf_gida = ((oran_son * agirliklar[gida_mi]).sum() / agirliklar[gida_mi].sum() - 1) * 100 if gida_mi.any() else 0
+    meta = {"baz": baz, "son": son, "gunler": gunler, "ad_col": ad_col, "agirlik_col": agirlik_col,
+            "enf_genel": float((endeks_genel / 100 - 1) * 100), "enf_gida": float(enf_gida),
+            "sepet_ozeti": ozet, "olusturma": datetime.now().isoformat(timespec="seconds")}
+    return {"analiz": df_analiz, "endeks": df_endeks, "meta": meta}
+
+
+# --- KALICILIK ---
+def _tablo_yaz(df, meta=None):
+    tablo = pa.Table.from_pandas(df, preserve_index=False)
+    if meta is not None:
+        tablo = tablo.replace_schema_metadata(
+            {**(tablo.schema.metadata or {}), META_ANAHTARI: json.dumps(meta, ensure_ascii=False).encode("utf-8")})
+    out = BytesIO()
+    pq.write_table(tablo, out, compression="zstd")
+    return out.getvalue()
+
+
+def endeksleri_yaz(depo, art, mesaj="Index Update"):
+    # Meta analiz dosyasında taşındığı için o en son yazılır
+    depo.yaz(ENDEKS_DOSYASI, _tablo_yaz(art['endeks']), mesaj)
+    depo.yaz(ANALIZ_DOSYASI, _tablo_yaz(art['analiz'], art['meta']), mesaj)
+
+
+def endeksleri_oku(depo):
+    """Kaydedilmiş artefaktlar ya da (henüz üretilmemişse) None."""
+    if not {"analiz.parquet", "endeks.parquet"} <= set(depo.listele(ENDEKS_DIZINI)): return None
+    tablo = pq.read_table(BytesIO(depo.oku(ANALIZ_DOSYASI)))
+    meta = json.loads(tablo.schema.metadata[META_ANAHTARI].decode("utf-8"))
+    return {"analiz": tablo.to_pandas(), "endeks": pq.read_table(BytesIO(depo.oku(ENDEKS_DOSYASI))).to_pandas(),
+            "meta": meta}
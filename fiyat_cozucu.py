@@ -0,0 +1,51 @@
+import re
+
+# --- AYARLAR ---
+# Türkçe biçimli tutarları ("1.234,56 TL", "₺80,95", "80.95") sayıya çevirir. Bağımlılığı yoktur;
+# fiyat_motoru kuralları ve ölçüm araçları aynı çözücüyü kullanır.
+_SAYI_DISI = re.compile(r"[^\d.,]+")
+PARCA_METIN = 2048  # Sınırlı metin taramasında tek seferde eklenen azami metin parçası
+
+
+def temizle_fiyat(t):
+    """Metindeki tutarı float'a çevirir; sayı yoksa/çözülemiyorsa None.
+
+    Rakam, nokta ve virgül dışındaki her şey (TL, ₺, boşluk, NBSP...) tek geçişte atılır. Hem nokta
+    hem virgül varsa nokta binlik, virgül ondalık ayracıdır; yalnızca virgül varsa o ondalıktır.
+    """
+    if not t: return None
+    s = _SAYI_DISI.sub("", str(t))
+    if "," in s:
+        s = s.replace(".", "").replace(",", ".") if "." in s else s.replace(",", ".")
+    # Sık görülen geçersizler float()'a gitmeden elenir
+    if s.count(".") > 1 or s in ("", "."): return None
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def sinirli_metin(parcalar, sinir):
+    """Metin parçalarını (ör. soup.strings) sırayla birleştirip ilk sinir karakteri döner.
+
+    "".join(parcalar)[:sinir] ile aynıdır; ancak sınıra ulaşınca kalan parçalar hiç okunmaz, büyük
+    sayfalarda tüm metni kurup kesmek gerekmez.
+    """
+    secilen, uzunluk = [], 0
+    for p in parcalar:
+        if len(p) > PARCA_METIN and uzunluk + len(p) > sinir: p = p[:sinir - uzunluk]
+        secilen.append(p)
+        uzunluk += len(p)
+        if uzunluk >= sinir: break
+    return "".join(secilen)[:sinir]
+
+
+def fiyatlari_tara(desen, metin, ilk=False):
+    """Derlenmiş desenin (ilk grubu tutar) metinde bulduğu pozitif tutarlar; her eşleşme bir kez çözülür.
+
+    ilk=True ise yalnızca ilk eşleşmeye bakılır (çözülemezse sonrakilere geçilmez).
+    """
+    if ilk:
+        m = desen.search(metin)
+        return [v] if m and (v := temizle_fiyat(m.group(1))) else []
+    return [v for x in desen.findall(metin) if (v := temizle_fiyat(x)) and v > 0]
@@ -0,0 +1,232 @@
+import argparse
+import os
+import re
+from datetime import date, timedelta
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fiyat_motoru import kod_standartlastir
+from sepet_katmani import kodlari_standartlastir
+
+# --- AYARLAR ---
+# Fiyat geçmişi Fiyat_Log/ altında iki katmanda tutulur:
+#   - Günlük delta dosyaları (Fiyat_Log/2025-12-18.parquet): her senkronizasyon yalnızca o günü yazar.
+#   - Aylık segmentler (Fiyat_Log/2025-12.parquet): sıkıştırma adımı eski deltaları bunlara birleştirir.
+# Okumada aynı (Tarih, Kod) için delta satırı segmenttekini geçersiz kılar.
+# Excel (Fiyat_Veritabani.xlsx) yalnızca dışa aktarım ve tek seferlik taşıma kaynağıdır.
+FIYAT_DIZINI = "Fiyat_Log"
+SIKISTIRMA_GUN = 7  # Bundan eski günlük deltalar aylık segmente birleştirilir
+FIYAT_EXCEL = "Fiyat_Veritabani.xlsx"
+SUTUNLAR = ["Tarih", "Kod", "Madde_Adi", "Fiyat", "Kaynak", "URL", "Zaman"]
+SEMA = pa.schema([("Tarih", pa.date32()), ("Kod", pa.string()), ("Madde_Adi", pa.string()),
+                  ("Fiyat", pa.float64()), ("Kaynak", pa.string()), ("URL", pa.string()), ("Zaman", pa.string())])
+_AY_DOSYASI = re.compile(r"^(\d{4}-\d{2})\.parquet$")
+_GUN_DOSYASI = re.compile(r"^(\d{4}-\d{2}-\d{2})\.parquet$")
+
+
+# --- DEPOLAMA ARKA UÇLARI ---
+class GithubDepo:
+    """PyGithub Repository üzerinde dosya okuma/yazma (github_json_yaz ile aynı güncelle/oluştur akışı)."""
+
+    def __init__(self, repo, branch):
+        self.repo = repo
+        self.branch = branch
+
+    def listele(self, dizin):
+        try:
+            return sorted(c.name for c in self.repo.get_contents(dizin, ref=self.branch) if c.type == "file")
+        except Exception:
+            return []
+
+    def oku(self, yol):
+        return self.repo.get_contents(yol, ref=self.branch).decoded_content
+
+    def yaz(self, yol, veri, mesaj="Data Update"):
+        try:
+            c = self.repo.get_contents(yol, ref=self.branch)
+            self.repo.update_file(c.path, mesaj, veri, c.sha, branch=self.branch)
+        except Exception:
+            self.repo.create_file(yol, mesaj, veri, branch=self.branch)
+
+    def sil(self, yol, mesaj="Data Compaction"):
+        c = self.repo.get_contents(yol, ref=self.branch)
+        self.repo.delete_file(c.path, mesaj, c.sha, branch=self.branch)
+
+
+class YerelDepo:
+    """Aynı arayüzün yerel dosya sistemi karşılığı (taşıma/dışa aktarım komutları için)."""
+
+    def __init__(self, kok="."):
+        self.kok = kok
+
+    def listele(self, dizin):
+        tam = os.path.join(self.kok, dizin)
+        return sorted(f for f in os.listdir(tam) if os.path.isfile(os.path.join(tam, f))) if os.path.isdir(tam) else []
+
+    def oku(self, yol):
+        with open(os.path.join(self.kok, yol), "rb") as f:
+            return f.read()
+
+    def yaz(self, yol, veri, mesaj=None):
+        tam = os.path.join(self.kok, yol)
+        os.makedirs(os.path.dirname(tam), exist_ok=True)
+        with open(tam, "wb") as f:
+            f.write(veri)
+
+    def sil(self, yol, mesaj=None):
+        os.remove(os.path.join(self.kok, yol))
+
+
+# --- TİPLİ TABLO ---
+def tiplendir(df):
+    """Serbest biçimli (ör. Excel'den str okunmuş) fiyat tablosunu SEMA tiplerine çevirir."""
+    df = df.reindex(columns=SUTUNLAR).copy()
+    df['Tarih'] = pd.to_datetime(df['Tarih'], errors='coerce').dt.date
+    df['Kod'] = kodlari_standartlastir(df['Kod'])
+    df['Fiyat'] = pd.to_numeric(df['Fiyat'], errors='coerce')
+    for c in ["Madde_Adi", "Kaynak", "URL", "Zaman"]:
+        df[c] = df[c].astype(object).where(df[c].notna(), None).map(lambda x: None if x is None else str(x))
+    return df.dropna(subset=['Tarih'])
+
+
+def _parquet_yaz(df):
+    out = BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, schema=SEMA, preserve_index=False), out, compression="zstd")
+    return out.getvalue()
+
+
+def _parquet_oku(veri, filtreler=None, sutunlar=None):
+    return pq.read_table(BytesIO(veri), columns=sutunlar, filters=filtreler or None, schema=SEMA)
+
+
+def depo_dosyalari(depo):
+    """({'2025-12': yol}, {'2025-12-18': yol}) -> aylık segmentler ve günlük deltalar."""
+    aylar, gunler = {}, {}
+    for ad in depo.listele(FIYAT_DIZINI):
+        if m := _AY_DOSYASI.match(ad): aylar[m.group(1)] = f"{FIYAT_DIZINI}/{ad}"
+        elif m := _GUN_DOSYASI.match(ad): gunler[m.group(1)] = f"{FIYAT_DIZINI}/{ad}"
+    return aylar, gunler
+
+
+def _ust_uste_bindir(alt, ust):
+    # ust'teki (Tarih, Kod) anahtarları alt'takileri geçersiz kılar (upsert)
+    if alt.empty: return ust
+    if ust.empty: return alt
+    anahtar = set(zip(ust['Tarih'], ust['Kod']))
+    alt = alt[[k not in anahtar for k in zip(alt['Tarih'], alt['Kod'])]]
+    return pd.concat([alt, ust], ignore_index=True)
+
+
+def _segmentlere_yaz(depo, df, aylar, mesaj):
+    for ay, parca in df.groupby(df['Tarih'].map(lambda t: t.strftime("%Y-%m"))):
+        yol = aylar.get(ay, f"{FIYAT_DIZINI}/{ay}.parquet")
+        if ay in aylar:
+            parca = _ust_uste_bindir(_parquet_oku(depo.oku(yol)).to_pandas(), parca)
+        depo.yaz(yol, _parquet_yaz(parca.sort_values(['Tarih', 'Kod'], kind='stable')), mesaj)
+
+
+# --- YAZMA ---
+def fiyatlari_yaz(depo, df_yeni, mesaj="Data Update"):
+    """Yeni fiyatları gün gün delta dosyalarına yazar; aynı (Tarih, Kod) satırları yenileriyle değişir.
+
+    Yalnızca ilgili günün küçük delta dosyası okunup yazılır; maliyet geçmişin uzunluğundan bağımsızdır.
+    """
+    df_yeni = tiplendir(df_yeni)
+    _, gunler = depo_dosyalari(depo)
+    for gun, parca in df_yeni.groupby(df_yeni['Tarih'].map(lambda t: t.isoformat())):
+        yol = gunler.get(gun, f"{FIYAT_DIZINI}/{gun}.parquet")
+        if gun in gunler:
+            parca = _ust_uste_bindir(_parquet_oku(depo.oku(yol)).to_pandas(), parca)
+        depo.yaz(yol, _parquet_yaz(parca.sort_values('Kod', kind='stable')), mesaj)
+    return "OK"
+
+
+def sikistir(depo, esik_gun=SIKISTIRMA_GUN, bugun=None):
+    """esik_gun'den eski günlük deltaları aylık segmentlere birleştirip siler.
+
+    Önce segment yazılır, sonra deltalar silinir; arada okuyan biri en kötü ihtimalle aynı
+    satırı iki katmanda görür ve delta önceliği sayesinde sonuç değişmez.
+    """
+    sinir = ((bugun or date.today()) - timedelta(days=esik_gun)).isoformat()
+    aylar, gunler = depo_dosyalari(depo)
+    eski = {g: yol for g, yol in gunler.items() if g < sinir}
+    if not eski: return 0
+    df = pd.concat([_parquet_oku(depo.oku(yol)).to_pandas() for _, yol in sorted(eski.items())], ignore_index=True)
+    _segmentlere_yaz(depo, df, aylar, "Data Compaction")
+    for yol in eski.values():
+        depo.sil(yol)
+    return len(eski)
+
+
+# --- OKUMA ---
+def fiyatlari_oku(depo, baslangic=None, bitis=None, kodlar=None, sutunlar=None):
+    """Fiyat geçmişini okur. Tarih aralığı dışındaki segment/deltalar hiç indirilmez (bölüm budama);
+    tarih/Kod koşulları Parquet satır gruplarına iletilir (predicate pushdown).
+    """
+    baslangic = pd.Timestamp(baslangic).date() if baslangic is not None else None
+    bitis = pd.Timestamp(bitis).date() if bitis is not None else None
+    filtreler = []
+    if baslangic: filtreler.append(("Tarih", ">=", baslangic))
+    if bitis: filtreler.append(("Tarih", "<=", bitis))
+    if kodlar is not None: filtreler.append(("Kod", "in", [kod_standartlastir(k) for k in kodlar]))
+    # Delta önceliği için anahtar sütunları her zaman okunur
+    okunacak = list(dict.fromkeys(["Tarih", "Kod"] + sutunlar)) if sutunlar else None
+
+    def katman(dosyalar, bas, bit):
+        tablolar = [_parquet_oku(depo.oku(yol), filtreler, okunacak) for anahtar, yol in sorted(dosyalar.items())
+                    if not (bas and anahtar < bas) and not (bit and anahtar > bit)]
+        return pa.concat_tables(tablolar).to_pandas() if tablolar else pd.DataFrame(columns=okunacak or SUTUNLAR)
+
+    aylar, gunler = depo_dosyalari(depo)
+    df = _ust_uste_bindir(
+        katman(aylar, baslangic and baslangic.strftime("%Y-%m"), bitis and bitis.strftime("%Y-%m")),
+        katman(gunler, baslangic and baslangic.isoformat(), bitis and bitis.isoformat()))
+    df = df.sort_values('Tarih', kind='stable').reset_index(drop=True)
+    return df[sutunlar] if sutunlar else df
+
+
+# --- EXCEL: DIŞA AKTARIM VE TEK SEFERLİK TAŞIMA ---
+def excel_disa_aktar(df):
+    out = BytesIO()
+    with pd.ExcelWriter(out, engine='openpyxl') as w:
+        df.to_excel(w, index=False, sheet_name='Fiyat_Log')
+    return out.getvalue()
+
+
+def excelden_tasi(depo, xlsx_verisi, mesaj="Fiyat_Veritabani.xlsx -> Parquet"):
+    """Eski Fiyat_Veritabani.xlsx içeriğini aylık Parquet bölümlerine yazar. Depo doluysa dokunmaz."""
+    if any(depo_dosyalari(depo)): return "Zaten taşınmış"
+    df = pd.read_excel(BytesIO(xlsx_verisi), dtype=str)
+    if df.empty: return "Excel boş"
+    _segmentlere_yaz(depo, tiplendir(df), {}, mesaj)
+    return "OK"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fiyat deposu (Parquet) yerel bakım komutları")
+    alt = parser.add_subparsers(dest="komut", required=True)
+    p = alt.add_parser("tasi", help=f"{FIYAT_EXCEL} dosyasını {FIYAT_DIZINI}/ altına Parquet olarak taşır")
+    p.add_argument("--excel", default=FIYAT_EXCEL)
+    p = alt.add_parser("excel", help=f"{FIYAT_DIZINI}/ içeriğini Excel'e aktarır")
+    p.add_argument("--cikti", default=FIYAT_EXCEL)
+    p = alt.add_parser("sikistir", help="Eski günlük deltaları aylık segmentlere birleştirir")
+    p.add_argument("--esik-gun", type=int, default=SIKISTIRMA_GUN)
+    args = parser.parse_args()
+
+    depo = YerelDepo()
+    if args.komut == "tasi":
+        with open(args.excel, "rb") as f:
+            print(excelden_tasi(depo, f.read()))
+    elif args.komut == "sikistir":
+        print(f"✅ {sikistir(depo, args.esik_gun)} günlük delta birleştirildi.")
+    else:
+        with open(args.cikti, "wb") as f:
+            f.write(excel_disa_aktar(fiyatlari_oku(depo)))
+        print(f"✅ {args.cikti} yazıldı.")
+
+
+if __name__ == "__main__":
+    main()
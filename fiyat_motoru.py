@@ -0,0 +1,731 @@
+import base64
+import copy
+import hashlib
+import html as html_lib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import zipfile
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+from fiyat_cozucu import fiyatlari_tara, sinirli_metin, temizle_fiyat
+
+try:
+    import lxml.html
+    from cssselect import HTMLTranslator
+    from lxml.cssselect import CSSSelector
+except ImportError:  # lxml/cssselect yoksa yalnızca bs4 ayrıştırıcısı kullanılır
+    CSSSelector = None
+
+# --- AYARLAR ---
+# Streamlit'ten bağımsız tutuldu: ProcessPoolExecutor işçileri bu modülü
+# ana uygulamayı (st.set_page_config vb.) çalıştırmadan import edebilmeli.
+VARSAYILAN_ISCI_SAYISI = os.cpu_count() or 1
+ISCI_PARCA_BOYUTU = 4  # Her işçiye tek seferde gönderilen HTML sayısı
+ISCI_PENCERESI = 4  # İşçi başına sırada bekleyen en fazla parça (bellekteki ham HTML sınırı)
+AYRISTIRICILAR = ("bs4", "lxml")
+VARSAYILAN_AYRISTIRICI = "lxml" if CSSSelector else "bs4"
+# Ön eleme için okunacak bayt sayısı. Migros sayfalarında canonical etiketi satır içi
+# stillerden sonra ~96 KB civarında geldiği için birkaç KB yetmiyor.
+KANONIK_TARAMA_BAYT = 128 * 1024
+ONBELLEK_DOSYASI = "ayristirma_onbellegi.sqlite"
+# İndirilen arşiv bu boyutu aşarsa bellekte değil geçici dosyada tutulur.
+BLOB_BELLEK_ESIGI = 1024 * 1024
+B64_PARCA = 64 * 1024  # base64 çözümünde tek seferde işlenen karakter sayısı
+ONBELLEK_AZAMI_KAYIT = 50000
+KURAL_DOSYASI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_kurallari.json")
+# Tarayıcının günlük arşivleriyle birlikte yazdığı manifest (Bolum_<gün>.manifest.json):
+# {"gun": ..., "kodlar": {kod: {"arsiv", "uye", "url", "son_url", "crc", "boyut", "zaman"}}}
+MANIFEST_EKI = ".manifest.json"
+GUNLUK_ARSIV = re.compile(r"^Bolum_(\d{4}-\d{2}-\d{2})_(\d+)\.zip$")  # Bolum_<gün>_<n>.zip
+
+
+# --- SİTE KURALLARI ---
+# Kurallar site_kurallari.json'dan bir kez okunup derlenir (bs4 için soupsieve, lxml için CSSSelector);
+# iki ayrıştırıcı da aynı derlenmiş kuralları kullanır. Site, URL'nin alan adıyla sözlükten bulunur.
+# Yeni bir site için yalnızca JSON'a kural eklemek yeterlidir.
+Secici = namedtuple("Secici", "css sv lx kaynak")
+Adim = namedtuple("Adim", "tur kap seciciler toplama kaynak bayt")
+SiteKurali = namedtuple("SiteKurali", "ad cop cop_ata adimlar bekle")
+Kurallar = namedtuple("Kurallar", "desen siteler varsayilan ozet")
+
+
+def _kirpik_ortalama(v):
+    if len(v) > 4: v = sorted(v)[1:-1]
+    return sum(v) / len(v), len(v)
+
+
+def _alt_yari_ortalama(v):
+    v = sorted(v)[:max(1, len(v) // 2)]
+    return sum(v) / len(v), len(v)
+
+
+# Birden çok değerden tek fiyat: (fiyat, kullanılan değer sayısı)
+TOPLAMALAR = {"ilk": lambda v: (v[0], 1), "ortalama": lambda v: (sum(v) / len(v), len(v)),
+              "kirpik_ortalama": _kirpik_ortalama, "alt_yari_ortalama": _alt_yari_ortalama}
+
+
+def _derle(sel): return CSSSelector(sel, translator="html") if CSSSelector else None
+
+
+def _secici(css, kaynak=""):
+    return Secici(css, soupsieve.compile(css), _derle(css), kaynak)
+
+
+def _ata_testi(css):
+    # Birleştiricisiz seçiciler için "eleman ya da atalarından biri eşleşiyor mu" XPath testi;
+    # çöp kontrolü tüm sayfayı taramak yerine yalnızca aday elemanın atalarına bakar.
+    parcalar = [p.strip() for p in css.split(",")]
+    if not CSSSelector or any(re.search(r"[\s>+~]", p) for p in parcalar): return None
+    ceviri = HTMLTranslator()
+    return lxml.html.etree.XPath("boolean(" + " | ".join(
+        ceviri.css_to_xpath(p, prefix="ancestor-or-self::") for p in parcalar) + ")")
+
+
+def _kurali_derle(ad, k):
+    adimlar = []
+    for a in k.get("adimlar", []):
+        if a["tur"] not in ("ilk", "hepsi", "regex"): raise ValueError(f"{ad}: bilinmeyen adım türü {a['tur']!r}")
+        if a.get("toplama", "ilk") not in TOPLAMALAR: raise ValueError(f"{ad}: bilinmeyen toplama {a['toplama']!r}")
+        adimlar.append(Adim(a["tur"], _secici(a["kap"]) if a.get("kap") else None,
+                            [_secici(*s) if isinstance(s, list) else _secici(s) for s in a.get("seciciler", [])],
+                            a.get("toplama", "ilk"), a.get("kaynak", ""), a.get("bayt", 0)))
+    # Çöp seçicileri tek seçicide birleşir: sayfa bir kez taranır
+    cop = ", ".join(k.get("cop", []))
+    return SiteKurali(ad, _secici(cop) if cop else None, _ata_testi(cop) if cop else None, adimlar, k.get("bekle", ""))
+
+
+def kurallari_yukle(dosya=KURAL_DOSYASI):
+    """Kural dosyasını okuyup derler; hatalı kural yüklemede (ValueError) yakalanır."""
+    with open(dosya, encoding="utf-8") as f:
+        ham = json.load(f)
+    ozet = hashlib.sha1(json.dumps(ham, sort_keys=True).encode("utf-8")).hexdigest()
+    siteler = {ad.lower(): _kurali_derle(ad, k) for ad, k in ham["siteler"].items()}
+    return Kurallar(re.compile(ham["fiyat_regex"]), siteler, _kurali_derle("varsayilan", ham["varsayilan"]), ozet)
+
+
+KURALLAR = kurallari_yukle()
+
+
+def site_kurali(url):
+    """URL'nin alan adının (yoksa üst alan adlarının) kuralı; hiçbiri yoksa varsayılan kural."""
+    host = (urlsplit(str(url)).hostname or "") if url else ""
+    while host:
+        if (k := KURALLAR.siteler.get(host)) is not None: return k
+        host = host.partition(".")[2]
+    return KURALLAR.varsayilan
+
+
+# --- SCRAPER (FİYAT ÇEKİCİ) ---
+def kod_standartlastir(k): return str(k).replace('.0', '').strip().zfill(7)
+
+
+def _adim_bs4(adim, soup):
+    kok = soup
+    if adim.kap is not None and (kok := adim.kap.sv.select_one(soup)) is None: return None
+    if adim.tur == "regex":
+        # Sayfanın tüm metni kurulmaz; metin parçaları sınıra kadar okunur
+        degerler = fiyatlari_tara(KURALLAR.desen, sinirli_metin(soup.strings, adim.bayt), adim.toplama == "ilk")
+    elif adim.tur == "ilk":
+        for s in adim.seciciler:
+            if (el := s.sv.select_one(kok)) is not None:
+                if val := temizle_fiyat(el.get_text()): return val, s.kaynak
+        return None
+    else:
+        degerler = []
+        for s in adim.seciciler:
+            if els := s.sv.select(kok):
+                if degerler := [v for v in [temizle_fiyat(e.get_text()) for e in els] if v and v > 0]: break
+    if not degerler: return None
+    fiyat, n = TOPLAMALAR[adim.toplama](degerler)
+    return fiyat, adim.kaynak.format(n=n)
+
+
+def fiyat_bul_siteye_gore(soup, url):
+    """Sitenin kural adımlarını sırayla uygular: (Fiyat, Kaynak), bulunamazsa (0, "")."""
+    kural = site_kurali(url)
+    if kural.cop is not None:
+        for x in kural.cop.sv.select(soup): x.decompose()
+    for adim in kural.adimlar:
+        if sonuc := _adim_bs4(adim, soup): return sonuc
+    return 0, ""
+
+
+def kanonik_url_bul(soup):
+    found_url = None
+    if c := soup.find("link", rel="canonical"): found_url = c.get("href")
+    if not found_url and (m := soup.find("meta", property="og:url")): found_url = m.get("content")
+    return str(found_url).strip() if found_url else None
+
+
+# --- HIZLI AYRIŞTIRICI (lxml) ---
+# Aynı derlenmiş kuralları soup ağacı kurmadan/değiştirmeden yanıtlar. decompose() yerine
+# çöp alt ağaçlarındaki eşleşmeler atlanır. Tüm sayfa metnini tarayan regex adımına
+# gelindiğinde None döner; çağıran bu nadir durumda bs4 yoluna düşer.
+if CSSSelector:
+    _UTF8_HTML = lxml.html.HTMLParser(encoding="utf-8")
+    _KANONIK = _derle("link[rel~=canonical]")
+    _OG_URL = _derle('meta[property="og:url"]')
+
+
+def _cop_testi(kural, doc):
+    # el -> çöp alt ağacında mı; basit seçicilerde atalar, diğerlerinde önceden toplanmış küme
+    if kural.cop is None: return None
+    if kural.cop_ata is not None: return kural.cop_ata
+    kume = set(kural.cop.lx(doc))
+    return lambda el: el in kume or any(a in kume for a in el.iterancestors())
+
+
+def _copte(el, cop):
+    return cop is not None and cop(el)
+
+
+def _ilk_eslesme(secici, kok, cop=None):
+    for el in secici(kok):
+        if el is kok or _copte(el, cop): continue
+        return el
+    return None
+
+
+def kanonik_url_bul_lxml(doc):
+    found_url = None
+    if (c := _ilk_eslesme(_KANONIK, doc)) is not None: found_url = c.get("href")
+    if not found_url and (m := _ilk_eslesme(_OG_URL, doc)) is not None: found_url = m.get("content")
+    return str(found_url).strip() if found_url else None
+
+
+def _adim_lxml(adim, doc, cop):
+    kok = doc
+    if adim.kap is not None and (kok := _ilk_eslesme(adim.kap.lx, doc, cop)) is None: return None
+    if adim.tur == "ilk":
+        for s in adim.seciciler:
+            if (el := _ilk_eslesme(s.lx, kok, cop)) is not None:
+                if val := temizle_fiyat(el.text_content()): return val, s.kaynak
+        return None
+    for s in adim.seciciler:
+        els = [e for e in s.lx(kok) if e is not kok and not _copte(e, cop)]
+        if degerler := [v for v in [temizle_fiyat(e.text_content()) for e in els] if v and v > 0]:
+            fiyat, n = TOPLAMALAR[adim.toplama](degerler)
+            return fiyat, adim.kaynak.format(n=n)
+    return None
+
+
+def fiyat_bul_lxml(doc, url):
+    kural = site_kurali(url)
+    cop = _cop_testi(kural, doc)
+    for adim in kural.adimlar:
+        if adim.tur == "regex": return None
+        if sonuc := _adim_lxml(adim, doc, cop): return sonuc
+    return 0, ""
+
+
+# --- ÖN ELEME (KANONİK URL KOKLAMA) ---
+# Tam DOM kurmadan, dosyanın ilk KANONIK_TARAMA_BAYT baytında <link rel="canonical"> arar.
+# Yorum/script/style blokları atlanır. Yalnızca canonical bulunduğunda karar verilir;
+# og:url, tam ayrıştırmada canonical'dan sonra geldiği için burada güvenilir değildir.
+_ON_TARAMA = re.compile(rb'<!--|<(script|style)\b|<link\b[^>]*>', re.I)
+_ETIKET_OZELLIK = re.compile(rb'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+
+
+def kanonik_url_kokla(bas):
+    """HTML'in ilk baytlarından canonical URL'yi döner; karar verilemezse None."""
+    i = 0
+    while m := _ON_TARAMA.search(bas, i):
+        if m.group(0) == b'<!--':
+            j = bas.find(b'-->', m.end())
+            if j < 0: return None
+            i = j + 3
+        elif m.group(1):
+            kapanis = re.compile(rb'</' + m.group(1) + rb'\s*>', re.I).search(bas, m.end())
+            if not kapanis: return None
+            i = kapanis.end()
+        else:
+            ozellikler = {}
+            for a in _ETIKET_OZELLIK.finditer(m.group(0), 5):
+                ad = a.group(1).decode("utf-8", errors="ignore").lower()
+                deger = next((d for d in a.group(2, 3, 4) if d is not None), b"")
+                ozellikler.setdefault(ad, html_lib.unescape(deger.decode("utf-8", errors="ignore")))
+            if "canonical" in ozellikler.get("rel", "").split():
+                href = ozellikler.get("href", "").strip()
+                return href or None
+            i = m.end()
+    return None
+
+
+def _html_isle(raw, url_map, ayristirici, found_url=None):
+    # (kanonik URL, Fiyat, Kaynak) döner; URL eşleşmezse Fiyat/Kaynak None olur.
+    # Çözülmüş HTML metni ayrı bir değişkende tutulmaz: ağaç kurulurken yalnızca ham baytlar yaşar.
+    if ayristirici == "lxml":
+        doc = lxml.html.document_fromstring(raw, parser=_UTF8_HTML)
+        found_url = found_url or kanonik_url_bul_lxml(doc)
+        if not found_url or found_url not in url_map: return found_url or "", None, None
+        url = url_map[found_url][1]
+        if (sonuc := fiyat_bul_lxml(doc, url)) is not None:
+            return found_url, sonuc[0], sonuc[1]
+        del doc
+        soup = BeautifulSoup(raw.decode("utf-8", errors="ignore"), 'html.parser')
+    else:
+        soup = BeautifulSoup(raw.decode("utf-8", errors="ignore"), 'html.parser')
+        found_url = found_url or kanonik_url_bul(soup)
+        if not found_url or found_url not in url_map: return found_url or "", None, None
+        url = url_map[found_url][1]
+    fiyat, kaynak = fiyat_bul_siteye_gore(soup, url)
+    return found_url, fiyat, kaynak
+
+
+def html_fiyat_cikar(raw, url_map, ayristirici="bs4", found_url=None):
+    """Tek bir HTML dosyasından (Kod, Fiyat, Kaynak) üretir; eşleşme yoksa None döner.
+
+    url_map: {url: (Kod, Konfigürasyondaki URL)}
+    found_url: Ön elemede bulunduysa kanonik URL; verilirse tekrar aranmaz.
+    """
+    found_url, fiyat, kaynak = _html_isle(raw, url_map, ayristirici, found_url)
+    if fiyat is None: return None
+    return url_map[found_url][0], fiyat, kaynak
+
+
+def sayfada_fiyat_var(raw, url, ayristirici=VARSAYILAN_AYRISTIRICI):
+    """Az önce url'den getirilen sayfadan site kuralıyla fiyat çıkıyor mu (kanonik URL'ye bakılmaz)."""
+    return bool(_html_isle(raw, {url: ("", url)}, ayristirici, found_url=url)[1])
+
+
+# --- KIRPILMIŞ SAYFA (YALNIZCA FİYAT PARÇALARI) ---
+def _fiyat_parcalari(doc, url):
+    # Site kuralının baktığı elemanlar: kanonik/og:url etiketleri ve seçicilerin eşleştiği alt ağaçlar
+    parcalar = [el for sec in (_KANONIK, _OG_URL) if (el := _ilk_eslesme(sec, doc)) is not None]
+    kural = site_kurali(url)
+    cop = _cop_testi(kural, doc)
+    for adim in kural.adimlar:
+        if adim.tur == "regex": break  # Buraya gelen sayfa zaten kırpılmaz
+        if adim.kap is not None:
+            if (el := _ilk_eslesme(adim.kap.lx, doc, cop)) is not None: parcalar.append(el)
+        elif adim.tur == "hepsi":
+            parcalar += [el for s in adim.seciciler for el in s.lx(doc) if not _copte(el, cop)]
+        else:
+            parcalar += [el for s in adim.seciciler if (el := _ilk_eslesme(s.lx, doc, cop)) is not None]
+    return parcalar
+
+
+def _iskelet(doc, parcalar):
+    # Seçilen alt ağaçları belge sırasıyla, ataları yalnızca etiket + class/id olarak kopyalar;
+    # böylece "fe-product-price .subtitle-1" gibi soy seçicileri ve çöp ataları aynen eşleşir.
+    sira = {el: i for i, el in enumerate(doc.iter())}
+    secili = set(parcalar)
+    kok = lxml.html.Element(doc.tag)
+    kopyalar = {doc: kok}
+    for el in sorted(secili, key=sira.get):
+        atalar = list(el.iterancestors())
+        if any(a in secili for a in atalar): continue  # İç içe seçimlerde en dıştaki yeter
+        for a in reversed(atalar[:-1]):
+            if a not in kopyalar:
+                kopyalar[a] = lxml.html.etree.SubElement(kopyalar[a.getparent()], a.tag,
+                                                         {k: v for k, v in a.attrib.items() if k in ("class", "id")})
+        kopya = copy.deepcopy(el)
+        kopya.tail = None
+        kopyalar[el.getparent()].append(kopya)
+    return lxml.html.tostring(kok, encoding="utf-8")
+
+
+def sayfayi_kirp(raw, url):
+    """Sayfanın yalnızca fiyat için gereken kısmını (kanonik etiketler + fiyat alt ağaçları) döner.
+
+    Kırpılmış sayfa hem kanonik URL hem fiyat için tam sayfayla aynı sonucu vermek zorundadır; bu
+    yerinde doğrulanır. Fiyat çıkmıyorsa, tüm metni tarayan regex yedeğine düşülüyorsa ya da sonuç
+    farklıysa None döner ve tam sayfa saklanmalıdır. lxml yoksa her zaman None.
+    """
+    if not CSSSelector: return None
+    doc = lxml.html.document_fromstring(raw, parser=_UTF8_HTML)
+    tam = fiyat_bul_lxml(doc, url)
+    if not tam or not tam[0]: return None
+    kirpik = _iskelet(doc, _fiyat_parcalari(doc, url))
+    kdoc = lxml.html.document_fromstring(kirpik, parser=_UTF8_HTML)
+    kanonik = kanonik_url_bul_lxml(doc)
+    if fiyat_bul_lxml(kdoc, url) != tam or kanonik_url_bul_lxml(kdoc) != kanonik: return None
+    if kanonik_url_kokla(kirpik) not in (kanonik, kanonik_url_kokla(raw[:KANONIK_TARAMA_BAYT])): return None
+    return kirpik
+
+
+# --- AYRIŞTIRMA ÖNBELLEĞİ ---
+def kural_surumu():
+    """Fiyat kurallarının (seçiciler + çıkarım fonksiyonları) özeti; kurallar değişince değişir."""
+    parcalar = [KURALLAR.ozet]
+    for fonk in (temizle_fiyat, sinirli_metin, fiyatlari_tara, _kirpik_ortalama, _alt_yari_ortalama, site_kurali,
+                 _adim_bs4, fiyat_bul_siteye_gore, _adim_lxml, fiyat_bul_lxml, kanonik_url_bul, kanonik_url_bul_lxml,
+                 kanonik_url_kokla, _html_isle):
+        parcalar.append(inspect.getsource(fonk))
+    return hashlib.sha1("\n".join(parcalar).encode("utf-8")).hexdigest()
+
+
+class AyristirmaOnbellegi:
+    """ZIP üyesinin (CRC32, boyut) bilgisine göre (kanonik URL, Fiyat, Kaynak) saklayan SQLite önbelleği.
+
+    Değişmemiş sayfalar açılmadan/ayrıştırılmadan çözülür. Kural sürümü değişirse tablo boşaltılır;
+    kayıt sayısı azami_kayit'ı aşarsa en uzun süredir kullanılmayanlar silinir.
+    """
+
+    def __init__(self, dosya=ONBELLEK_DOSYASI, azami_kayit=ONBELLEK_AZAMI_KAYIT):
+        self.azami_kayit = azami_kayit
+        self.db = sqlite3.connect(dosya, timeout=30)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (anahtar TEXT PRIMARY KEY, deger TEXT)")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS sonuc (
+            crc INTEGER, boyut INTEGER, url TEXT, fiyat REAL, kaynak TEXT, kullanim REAL,
+            PRIMARY KEY (crc, boyut))""")
+        self.db.execute("CREATE TABLE IF NOT EXISTS arsiv (sha TEXT PRIMARY KEY, uyeler TEXT, kullanim REAL)")
+        surum = kural_surumu()
+        kayitli = self.db.execute("SELECT deger FROM meta WHERE anahtar = 'kural_surumu'").fetchone()
+        if not kayitli or kayitli[0] != surum:
+            self.db.execute("DELETE FROM sonuc")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('kural_surumu', ?)", (surum,))
+        self.db.commit()
+
+    def oku(self, info):
+        satir = self.db.execute("SELECT url, fiyat, kaynak FROM sonuc WHERE crc = ? AND boyut = ?",
+                                (info.CRC, info.file_size)).fetchone()
+        if satir:
+            self.db.execute("UPDATE sonuc SET kullanim = ? WHERE crc = ? AND boyut = ?",
+                            (time.time(), info.CRC, info.file_size))
+        return satir
+
+    def yaz(self, info, url, fiyat, kaynak):
+        self.db.execute("INSERT OR REPLACE INTO sonuc VALUES (?, ?, ?, ?, ?, ?)",
+                        (info.CRC, info.file_size, url, fiyat, kaynak, time.time()))
+
+    def arsiv_oku(self, sha):
+        """Daha önce indirilmiş git blob'unun HTML üye listesini (ZipInfo) döner; yoksa None."""
+        satir = self.db.execute("SELECT uyeler FROM arsiv WHERE sha = ?", (sha,)).fetchone()
+        if not satir: return None
+        self.db.execute("UPDATE arsiv SET kullanim = ? WHERE sha = ?", (time.time(), sha))
+        uyeler = []
+        for ad, crc, boyut in json.loads(satir[0]):
+            info = zipfile.ZipInfo(ad)
+            info.CRC, info.file_size = crc, boyut
+            uyeler.append(info)
+        return uyeler
+
+    def arsiv_yaz(self, sha, uyeler):
+        kayit = [[i.filename, i.CRC, i.file_size] for i in uyeler if i.filename.endswith(('.html', '.htm'))]
+        self.db.execute("INSERT OR REPLACE INTO arsiv VALUES (?, ?, ?)", (sha, json.dumps(kayit), time.time()))
+
+    def kaydet(self):
+        fazla = self.db.execute("SELECT COUNT(*) FROM sonuc").fetchone()[0] - self.azami_kayit
+        if fazla > 0:
+            self.db.execute("DELETE FROM sonuc WHERE rowid IN (SELECT rowid FROM sonuc ORDER BY kullanim LIMIT ?)",
+                            (fazla,))
+        # Üye listeleri küçük; yine de son 100 blob dışındakiler tutulmaz
+        self.db.execute("DELETE FROM arsiv WHERE sha NOT IN (SELECT sha FROM arsiv ORDER BY kullanim DESC LIMIT 100)")
+        self.db.commit()
+
+    def kapat(self):
+        self.kaydet()
+        self.db.close()
+
+
+# --- PARALEL ARŞİV İŞLEME ---
+_isci_url_map = {}
+_isci_ayristirici = "bs4"
+
+
+def _isci_hazirla(url_map, ayristirici):
+    # Her işçi süreç başına bir kez çalışır; url_map her görevle tekrar gönderilmez.
+    global _isci_url_map, _isci_ayristirici
+    _isci_url_map = url_map
+    _isci_ayristirici = ayristirici
+
+
+def _isci_uye_isle(gorev):
+    raw, found_url = gorev
+    try:
+        return _html_isle(raw, _isci_url_map, _isci_ayristirici, found_url)
+    except Exception:
+        return None
+
+
+def arsiv_uyeleri(zip_data):
+    """ZIP içindeki HTML dosyalarını arşivdeki sırasıyla (dosya adı, bayt) olarak verir."""
+    with zipfile.ZipFile(BytesIO(zip_data)) as z:
+        for file_name in z.namelist():
+            if not file_name.endswith(('.html', '.htm')): continue
+            yield file_name, z.read(file_name)
+
+
+# --- ARŞİV KAYNAKLARI ---
+class TembelArsiv:
+    """Üye listesi (ZipInfo) önceden bilinen arşiv; içerik yalnızca bir üye okunmak istenirse indirilir.
+
+    SHA'sı değişmemiş bir git blob'u için kullanılır: tüm üyeler önbellekten çözülürse hiç indirilmez.
+    """
+
+    def __init__(self, ad, uyeler, yukleyici, boyut=0, ipuclari=None):
+        self.ad = ad
+        self.uyeler = uyeler
+        self.yukleyici = yukleyici
+        self.boyut = boyut
+        self.ipuclari = ipuclari or {}  # {üye adı: URL}; manifestten, kanonik URL aranmadan kullanılır
+        self._zip = None
+
+    @property
+    def yuklendi(self):
+        return self._zip is not None
+
+    def _z(self):
+        if self._zip is None: self._zip = zipfile.ZipFile(self.yukleyici())
+        return self._zip
+
+    def infolist(self):
+        return self.uyeler
+
+    def open(self, info):
+        return self._z().open(info.filename)
+
+    def read(self, info):
+        return self._z().read(info.filename)
+
+
+def base64_dosyaya_coz(icerik, hedef):
+    """base64 metnini B64_PARCA'lık dilimlerle çözüp hedef dosyaya yazar (satır sonları atlanır)."""
+    artik = ""
+    for i in range(0, len(icerik), B64_PARCA):
+        parca = artik + "".join(icerik[i:i + B64_PARCA].split())
+        kesim = len(parca) - len(parca) % 4
+        hedef.write(base64.b64decode(parca[:kesim]))
+        artik = parca[kesim:]
+    if artik: hedef.write(base64.b64decode(artik + "=" * (-len(artik) % 4)))
+    hedef.seek(0)
+    return hedef
+
+
+def _blob_indir(repo, sha):
+    # Arşiv bir kez bayt dizisi olarak kopyalanmaz; BLOB_BELLEK_ESIGI üstü geçici dosyaya taşar.
+    icerik = repo.get_git_blob(sha).content
+    return base64_dosyaya_coz(icerik, tempfile.SpooledTemporaryFile(max_size=BLOB_BELLEK_ESIGI))
+
+
+def manifest_uyeleri(manifestler):
+    """Manifest içeriklerinden {arşiv adı: ([ZipInfo], {üye: URL})}.
+
+    Her Kod'un tüm günler arasındaki en yeni kaydı ((gün, zaman) sırasıyla) alınır; eski günlerin ve aynı
+    gün tekrar alınan sayfaların eskileri hiç okunmaz. URL ipucu yalnızca yönlendirme olmadıysa verilir;
+    aksi halde kanonik URL her zamanki gibi aranır.
+    """
+    en_yeni = {}
+    for m in manifestler:
+        for kod, kayit in m.get("kodlar", {}).items():
+            anahtar = (m.get("gun", ""), kayit.get("zaman", 0))
+            if kod not in en_yeni or anahtar > en_yeni[kod][0]: en_yeni[kod] = (anahtar, kayit)
+    sonuc = {}
+    for _, kayit in en_yeni.values():
+        info = zipfile.ZipInfo(kayit["uye"])
+        info.CRC, info.file_size = kayit["crc"], kayit["boyut"]
+        uyeler, ipuclari = sonuc.setdefault(kayit["arsiv"], ([], {}))
+        uyeler.append(info)
+        if kayit.get("son_url") in (None, kayit["url"]): ipuclari[info.filename] = kayit["url"]
+    return sonuc
+
+
+def eskiyen_arsivler(manifestler, adlar):
+    """adlar içinden, günü manifestli olup hiçbir Kod'un en yeni kaydını taşımayan (tümüyle eskimiş) parçalar."""
+    gunler = {m.get("gun") for m in manifestler}
+    guncel = manifest_uyeleri(manifestler)
+    return {a for a in adlar if (g := GUNLUK_ARSIV.match(a)) and g.group(1) in gunler and a not in guncel}
+
+
+def arsiv_sirasi(adlar):
+    """Günlük parçalar en yeniden eskiye (gün, parça no), ardından eski Bolum_N.zip'ler kendi sırasıyla.
+
+    Bir Kod için ilk pozitif fiyat geçerli olduğundan yeni günün sayfası eski gün/eski arşivdekini ezer;
+    eski arşivlerdeki tekrarlar yalnızca ertelenmiş yedek olarak kalır.
+    """
+    def anahtar(ad):
+        m = GUNLUK_ARSIV.match(ad)
+        return (m.group(1), int(m.group(2))) if m else ("", 0)
+    gunluk = sorted((a for a in adlar if GUNLUK_ARSIV.match(a)), key=anahtar, reverse=True)
+    return gunluk + [a for a in adlar if not GUNLUK_ARSIV.match(a)]
+
+
+def arsivleri_hazirla(repo, branch, onbellek=None, log_callback=print):
+    """Repo kökündeki Bolum_*.zip arşivlerini işlenmeye hazır hale getirir.
+
+    Manifesti olan (tarayıcının doğrudan yazdığı günlük) arşivlerin üye listesi manifestten gelir;
+    bütün Kod'ları daha yeni bir günde yeniden alınmış parçalar hiç işlenmez. Arşivler arsiv_sirasi ile
+    en yeniden eskiye döner. SHA'sı önbellekte kayıtlı arşivler de indirilmez. İkisi de TembelArsiv olarak
+    döner; diğerleri indirilir ve üye listeleri SHA ile kaydedilir. repo yalnızca get_contents ve get_git_blob
+    sağlamalı (PyGithub Repository ya da yerel bir benzeri).
+    """
+    contents = repo.get_contents("", ref=branch)
+    zip_files = {c.name: c for c in contents if c.name.endswith(".zip") and c.name.startswith("Bolum")}
+    manifestler = []
+    for c in contents:
+        if not (c.name.startswith("Bolum") and c.name.endswith(MANIFEST_EKI)): continue
+        try:
+            manifestler.append(json.loads(base64.b64decode(repo.get_git_blob(c.sha).content)))
+        except Exception as e:
+            log_callback(f"⚠️ Manifest okunamadı ({c.name}): {str(e)}")
+    manifestten = manifest_uyeleri(manifestler)
+    eskiyenler = eskiyen_arsivler(manifestler, zip_files)
+    if eskiyenler: log_callback(f"🗑️ {len(eskiyenler)} eskimiş günlük parça atlandı (Kod'ları daha yeni)")
+    arsivler = []
+    for zip_file in (zip_files[ad] for ad in arsiv_sirasi(list(zip_files)) if ad not in eskiyenler):
+        if zip_file.name in manifestten:
+            uyeler, ipuclari = manifestten[zip_file.name]
+            arsivler.append(TembelArsiv(zip_file.name, uyeler, lambda sha=zip_file.sha: _blob_indir(repo, sha),
+                                        zip_file.size, ipuclari))
+            continue
+        uyeler = onbellek.arsiv_oku(zip_file.sha) if onbellek else None
+        if uyeler is not None:
+            arsivler.append(TembelArsiv(zip_file.name, uyeler, lambda sha=zip_file.sha: _blob_indir(repo, sha),
+                                        zip_file.size))
+            continue
+        log_callback(f"📂 Arşiv okunuyor: {zip_file.name}")
+        try:
+            z = zipfile.ZipFile(_blob_indir(repo, zip_file.sha))
+            if onbellek: onbellek.arsiv_yaz(zip_file.sha, z.infolist())
+            arsivler.append(z)
+        except Exception as e:
+            log_callback(f"⚠️ Hata ({zip_file.name}): {str(e)}")
+    return arsivler
+
+
+def atlanan_arsivler(arsivler):
+    """Hiç indirilmeden işlenen arşivleri döner."""
+    return [a for a in arsivler if isinstance(a, TembelArsiv) and not a.yuklendi]
+
+
+def _on_eleme(arsivler, url_map, haric_kodlar, sayac, ertelenenler, onbellek):
+    # Her üye için (ZipInfo, görev, hazır sonuç) verir; görev None ise sonuç önbellekten gelmiştir.
+    # Atlanan dosyalar ne tamamen açılır ne de ayrıştırılır. Daha önce sıraya alınmış bir
+    # Kod'un tekrarları ertelenir; ilk dosya fiyat vermezse ikinci turda denenir.
+    sirada = set()
+    for zi, z in enumerate(arsivler):
+        ipuclari = getattr(z, "ipuclari", {})
+        for info in z.infolist():
+            if not info.filename.endswith(('.html', '.htm')): continue
+            hazir = onbellek.oku(info) if onbellek else None
+            if hazir:
+                found_url = hazir[0] or None
+                if found_url is None or found_url not in url_map:
+                    sayac["eslesmeyen"] += 1;
+                    continue
+                if hazir[1] is None: hazir = None  # Önceden eşleşmiyordu, şimdi ayrıştırılmalı
+            elif ipuclari.get(info.filename) in url_map:
+                found_url = ipuclari[info.filename]
+                sayac["manifest"] += 1
+            else:
+                with z.open(info) as f:
+                    found_url = kanonik_url_kokla(f.read(KANONIK_TARAMA_BAYT))
+            if found_url is None:
+                sayac["tam_ayristirma"] += 1
+            elif found_url not in url_map:
+                if onbellek: onbellek.yaz(info, found_url, None, None)
+                sayac["eslesmeyen"] += 1;
+                continue
+            elif (kod := url_map[found_url][0]) in haric_kodlar:
+                sayac["manuel"] += 1;
+                continue
+            elif kod in sirada:
+                ertelenenler.append((zi, info, found_url));
+                continue
+            else:
+                sirada.add(kod)
+            if hazir:
+                sayac["onbellek"] += 1
+                yield info, None, hazir
+            else:
+                yield info, (z.read(info), found_url), None
+
+
+def _isci_parca_isle(gorevler):
+    return [_isci_uye_isle(g) for g in gorevler]
+
+
+def _paralel_sonuclar(ogeler, ex, pencere):
+    # Öğeler ISCI_PARCA_BOYUTU'luk parçalarla işçilere gönderilir; en fazla pencere parça aynı anda
+    # sırada/işlemde tutulur, sonuçlar gönderim sırasıyla verilir.
+    kuyruk = deque()
+
+    def bosalt():
+        parca, f = kuyruk.popleft()
+        hesaplanan = iter(f.result())
+        for info, gorev, hazir in parca:
+            yield info, hazir if gorev is None else next(hesaplanan)
+
+    parca = []
+    for oge in ogeler:
+        parca.append(oge)
+        if len(parca) < ISCI_PARCA_BOYUTU: continue
+        kuyruk.append((parca, ex.submit(_isci_parca_isle, [g for _, g, _ in parca if g is not None])))
+        parca = []
+        if len(kuyruk) >= pencere: yield from bosalt()
+    if parca: kuyruk.append((parca, ex.submit(_isci_parca_isle, [g for _, g, _ in parca if g is not None])))
+    while kuyruk:
+        yield from bosalt()
+
+
+def _birlestir(ogeler, url_map, haric_kodlar, bulunanlar, islenen_kodlar, onbellek):
+    for info, sonuc in ogeler:
+        if not sonuc: continue
+        found_url, fiyat, kaynak = sonuc
+        if onbellek: onbellek.yaz(info, found_url, fiyat, kaynak)
+        if fiyat is None: continue
+        kod = url_map[found_url][0]
+        if kod in islenen_kodlar or kod in haric_kodlar or not fiyat > 0: continue
+        bulunanlar.append((kod, fiyat, kaynak))
+        islenen_kodlar.add(kod)
+
+
+def arsivleri_isle(arsivler, url_map, isci_sayisi=None, ayristirici=None, haric_kodlar=(), sayac=None,
+                   onbellek=None):
+    """Arşivlerdeki tüm HTML'lerden fiyat çıkarır, [(Kod, Fiyat, Kaynak), ...] döner.
+
+    arsivler: ZIP baytları/dosya nesneleri, zipfile.ZipFile ya da TembelArsiv listesi.
+
+    isci_sayisi <= 1 ise tek süreçte çalışır. Sonuçlar işçi sayısından bağımsız olarak
+    arşiv/dosya sırasıyla birleştirilir: bir Kod için ilk pozitif fiyat geçerlidir.
+    haric_kodlar (ör. manuel fiyatlılar) hiç ayrıştırılmaz. sayac (Counter) verilirse
+    ön elemede atlanan dosya sayıları nedenine göre içine yazılır. onbellek
+    (AyristirmaOnbellegi) verilirse değişmemiş üyeler ayrıştırılmadan çözülür.
+    """
+    isci_sayisi = VARSAYILAN_ISCI_SAYISI if isci_sayisi is None else isci_sayisi
+    ayristirici = ayristirici or VARSAYILAN_AYRISTIRICI
+    if ayristirici not in AYRISTIRICILAR: raise ValueError(f"Bilinmeyen ayrıştırıcı: {ayristirici}")
+    if ayristirici == "lxml" and not CSSSelector: ayristirici = "bs4"
+    sayac = Counter() if sayac is None else sayac
+    haric_kodlar = set(haric_kodlar)
+    arsivler = [zipfile.ZipFile(BytesIO(a) if isinstance(a, (bytes, bytearray)) else a)
+                if not isinstance(a, (zipfile.ZipFile, TembelArsiv)) else a for a in arsivler]
+    ertelenenler = []
+    ogeler = _on_eleme(arsivler, url_map, haric_kodlar, sayac, ertelenenler, onbellek)
+    bulunanlar = [];
+    islenen_kodlar = set()
+    if isci_sayisi <= 1:
+        _isci_hazirla(url_map, ayristirici)
+        sonuclar = ((info, hazir if gorev is None else _isci_uye_isle(gorev)) for info, gorev, hazir in ogeler)
+        _birlestir(sonuclar, url_map, haric_kodlar, bulunanlar, islenen_kodlar, onbellek)
+    else:
+        # Arşivler akış halinde okunur: tüm üyelerin ham baytları aynı anda belleğe alınmaz
+        with ProcessPoolExecutor(max_workers=isci_sayisi, initializer=_isci_hazirla,
+                                 initargs=(url_map, ayristirici)) as ex:
+            _birlestir(_paralel_sonuclar(ogeler, ex, ISCI_PENCERESI * isci_sayisi), url_map, haric_kodlar,
+                       bulunanlar, islenen_kodlar, onbellek)
+
+    # İkinci tur: ilk dosyası fiyat vermeyen kodların ertelenen tekrarları (nadir, tek süreçte)
+    _isci_hazirla(url_map, ayristirici)
+    for zi, info, found_url in ertelenenler:
+        if url_map[found_url][0] in islenen_kodlar:
+            sayac["tekrar"] += 1;
+            continue
+        hazir = onbellek.oku(info) if onbellek else None
+        if not hazir or hazir[1] is None:
+            hazir = _isci_uye_isle((arsivler[zi].read(info), found_url))
+        _birlestir([(info, hazir)], url_map, haric_kodlar, bulunanlar, islenen_kodlar, onbellek)
+    if onbellek: onbellek.kaydet()
+    return bulunanlar
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from tembel_yukleme import modul
+
+# --- AYARLAR ---
+# Uzun zaman serileri tarayıcıya gönderilmeden önce LTTB ile HEDEF_NOKTA'ya indirgenir; gönderilen
+# nokta sayısı WEBGL_ESIGI'ni aşan izler SVG yerine WebGL (Scattergl) ile çizilir.
+# Plotly yalnızca iz kurulurken (grafik alt sistemi) yüklenir.
+HEDEF_NOKTA = 1000
+WEBGL_ESIGI = 500
+# Görünüm adı -> gösterilen son gün sayısı (None: tüm geçmiş)
+GORUNUMLER = {"Tüm geçmiş": None, "Son 1 yıl": 365, "Son 3 ay": 90}
+
+
+# --- İNDİRGEME ---
+def lttb(x, y, hedef):
+    """Largest-Triangle-Three-Buckets: eğrinin görsel biçimini koruyarak seçilen hedef noktanın indeksleri.
+
+    İlk ve son nokta her zaman seçilir; aradaki her kovadan, önceki seçilen nokta ve sonraki kovanın
+    ortalamasıyla en büyük üçgeni kuran nokta alınır. x artan sırada olmalıdır.
+    """
+    n = len(x)
+    if hedef is None or hedef >= n or hedef < 3: return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    sinirlar = np.linspace(1, n - 1, hedef - 1).astype(np.int64)  # hedef-2 kova: [sinirlar[i], sinirlar[i+1])
+    sinirlar = np.append(sinirlar, n)
+    secilen = np.empty(hedef, dtype=np.int64)
+    secilen[0], secilen[-1] = 0, n - 1
+    a = 0
+    for i in range(hedef - 2):
+        bas, bit, sonraki = sinirlar[i], sinirlar[i + 1], sinirlar[i + 2]
+        ort_x, ort_y = x[bit:sonraki].mean(), y[bit:sonraki].mean()
+        alan = np.abs((x[a] - ort_x) * (y[bas:bit] - y[a]) - (x[a] - x[bas:bit]) * (ort_y - y[a]))
+        a = bas + int(np.argmax(alan))
+        secilen[i + 1] = a
+    return secilen
+
+
+def gorunume_kirp(x, gorunum):
+    """GORUNUMLER'deki pencereye giren satırların maskesi (x tarih dizisi)."""
+    gun = GORUNUMLER.get(gorunum)
+    x = pd.to_datetime(pd.Series(x))
+    if gun is None or x.empty: return np.ones(len(x), dtype=bool)
+    return (x >= x.max() - pd.Timedelta(days=gun)).to_numpy()
+
+
+def _hazirla(x, *seriler, hedef):
+    x = pd.to_datetime(pd.Series(x)).to_numpy()
+    seriler = [np.asarray(s, dtype=np.float64) for s in seriler]
+    gecerli = ~np.isnan(seriler[0])
+    for s in seriler[1:]: gecerli &= ~np.isnan(s)
+    x, seriler = x[gecerli], [s[gecerli] for s in seriler]
+    sec = lttb(x.astype("datetime64[ns]").astype(np.int64), np.mean(seriler, axis=0), hedef)
+    return x[sec], [s[sec] for s in seriler]
+
+
+# --- İZLER ---
+def zaman_izi(x, y, hedef=HEDEF_NOKTA, webgl_esigi=WEBGL_ESIGI, **ozellikler):
+    """İndirgenmiş zaman serisi izi; çok noktalıysa Scattergl. ozellikler go.Scatter'a aynen geçer."""
+    go = modul("grafik", "plotly.graph_objects")
+    x, (y,) = _hazirla(x, y, hedef=hedef)
+    iz = go.Scattergl if len(x) > webgl_esigi else go.Scatter
+    return iz(x=x, y=y, **ozellikler)
+
+
+def bant_izi(x, alt, ust, hedef=HEDEF_NOKTA, webgl_esigi=WEBGL_ESIGI, **ozellikler):
+    """alt-ust arası dolgulu güven bandı (tek kapalı çokgen); liste birleştirmeden NumPy ile kurulur."""
+    go = modul("grafik", "plotly.graph_objects")
+    x, (alt, ust) = _hazirla(x, alt, ust, hedef=hedef)
+    iz = go.Scattergl if 2 * len(x) > webgl_esigi else go.Scatter
+    return iz(x=np.concatenate([x, x[::-1]]), y=np.concatenate([ust, alt[::-1]]), fill='toself', **ozellikler)
+
+
+def dagilim_modu(n, webgl_esigi=WEBGL_ESIGI):
+    """px.scatter için render_mode: nokta sayısı eşiği aşarsa 'webgl'."""
+    return "webgl" if n > webgl_esigi else "svg"
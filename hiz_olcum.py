@@ -0,0 +1,1405 @@
+import argparse
+import base64
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+import zipfile
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import requests
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml.cssselect import CSSSelector
+
+from disa_aktarim import BICIMLER, disa_aktar
+from endeks_motoru import fiyat_matrisi, kume_uyeligi, laspeyres_endeksleri
+from fiyat_deposu import YerelDepo, fiyatlari_yaz
+from grafik_katmani import GORUNUMLER, HEDEF_NOKTA, bant_izi, gorunume_kirp, lttb, zaman_izi
+from piyasa_verileri import PiyasaServisi, piyasa_kaynaklari
+from istatistik_motoru import PENCERE_GUN, durum_oku, istatistikler, istatistikleri_guncelle
+from veri_katmani import OnbellekliDepo
+from fiyat_cozucu import fiyatlari_tara, sinirli_metin, temizle_fiyat
+from sepet_katmani import kodlari_standartlastir, sepet_tablosu
+from tembel_yukleme import ALT_SISTEMLER, acilis_olcumu, modul
+from tahmin_motoru import MODEL_AYARLARI, TABLO_ONBELLEGI, TahminMotoru, _stan_baslangici, tahmin_fit_et, tahmin_tablosu
+import fiyat_motoru
+import tarama_motoru
+from fiyat_motoru import AyristirmaOnbellegi, arsivleri_hazirla, arsivleri_isle, atlanan_arsivler, arsiv_uyeleri, \
+    html_fiyat_cikar, sayfayi_kirp, kod_standartlastir, kanonik_url_bul, kanonik_url_kokla, fiyat_bul_siteye_gore, VARSAYILAN_ISCI_SAYISI, VARSAYILAN_AYRISTIRICI, AYRISTIRICILAR, KANONIK_TARAMA_BAYT
+
+# --- AYARLAR ---
+EXCEL_DOSYASI = "TUFE_Konfigurasyon.xlsx"
+SAYFA_ADI = "Madde_Sepeti"
+FIYAT_DOSYASI = "Fiyat_Veritabani.xlsx"
+ZIP_DESENI = "Bolum_*.zip"
+
+
+def yerel_url_map():
+    sepet = sepet_tablosu(pd.read_excel(EXCEL_DOSYASI, sheet_name=SAYFA_ADI, dtype=str))
+    return {u: (k, u) for u, k in sepet.url_kod.items()}
+
+
+def yerel_arsivler():
+    zip_yollari = sorted(glob.glob(ZIP_DESENI))
+    verileri = []
+    for yol in zip_yollari:
+        with open(yol, "rb") as f:
+            verileri.append(f.read())
+    return zip_yollari, verileri
+
+
+class YerelRepo:
+    """GitHub Repository yerine geçen yerel sahte: kök dizindeki dosyaları git blob SHA'larıyla sunar."""
+
+    def __init__(self, dizin=".", desen="*"):
+        self.dizin = dizin
+        self.desen = desen
+        self.indirilen_bayt = 0
+        self.indirilen_adlar = []
+
+    def get_contents(self, yol, ref=None):
+        icerik = []
+        for tam_yol in sorted(glob.glob(os.path.join(self.dizin, self.desen))):
+            ad = os.path.basename(tam_yol)
+            if not os.path.isfile(tam_yol): continue
+            with open(tam_yol, "rb") as f:
+                veri = f.read()
+            sha = hashlib.sha1(b"blob %d\0" % len(veri) + veri).hexdigest()
+            icerik.append(SimpleNamespace(name=ad, path=ad, sha=sha, size=len(veri)))
+        return icerik
+
+    def get_git_blob(self, sha):
+        for c in self.get_contents(""):
+            if c.sha == sha:
+                with open(os.path.join(self.dizin, c.name), "rb") as f:
+                    icerik = base64.b64encode(f.read()).decode("ascii")
+                self.indirilen_bayt += len(icerik)
+                self.indirilen_adlar.append(c.name)
+                return SimpleNamespace(sha=sha, content=icerik)
+        raise KeyError(sha)
+
+
+def sure_olc(fonk, tekrar):
+    en_iyi = None;
+    sonuc = None
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        sonuc = fonk()
+        gecen = time.perf_counter() - t0
+        en_iyi = gecen if en_iyi is None else min(en_iyi, gecen)
+    return en_iyi, sonuc
+
+
+# --- 1. HTML AYRIŞTIRMA: SERİ vs PARALEL ---
+def ayristirma_olcumu(args):
+    url_map = yerel_url_map()
+    zip_yollari, zip_verileri = yerel_arsivler()
+    print(f"Arşivler: {', '.join(os.path.basename(y) for y in zip_yollari)}")
+
+    atlanan = Counter()
+    t_seri, seri = sure_olc(lambda: arsivleri_isle(zip_verileri, url_map, 1, args.ayristirici, sayac=atlanan),
+                            args.tekrar)
+    print(f"Ön eleme  : {dict(atlanan)}")
+    print(f"Seri      : {t_seri:7.2f} sn  ({len(seri)} fiyat)")
+    t_par, paralel = sure_olc(lambda: arsivleri_isle(zip_verileri, url_map, args.isci, args.ayristirici),
+                              args.tekrar)
+    print(f"Paralel({args.isci}): {t_par:7.2f} sn  ({len(paralel)} fiyat)  hızlanma x{t_seri / t_par:.2f}")
+
+    if seri != paralel:
+        print("❌ HATA: Seri ve paralel sonuçlar farklı!")
+        return 1
+    print("✅ Seri ve paralel sonuçlar birebir aynı.")
+
+    if args.onbellek:
+        if os.path.exists(args.onbellek): os.remove(args.onbellek)
+        for tur in ("soğuk", "sıcak"):
+            onbellek = AyristirmaOnbellegi(args.onbellek)
+            t_ob, ob = sure_olc(lambda: arsivleri_isle(zip_verileri, url_map, 1, args.ayristirici,
+                                                       onbellek=onbellek), 1)
+            onbellek.kapat()
+            print(f"Önbellek ({tur}): {t_ob:7.2f} sn  ({len(ob)} fiyat)")
+            if ob != seri:
+                print("❌ HATA: Önbellekli sonuçlar farklı!")
+                return 1
+    return 0
+
+
+# --- 2. AYRIŞTIRICI FARK TESTİ: bs4 vs lxml, ön eleme vs tam ayrıştırma ---
+def ayristirici_karsilastir(args):
+    url_map = yerel_url_map()
+    zip_yollari, zip_verileri = yerel_arsivler()
+    sureler = {a: 0.0 for a in AYRISTIRICILAR}
+    dosya = 0;
+    farkli = 0
+    for yol, zip_data in zip(zip_yollari, zip_verileri):
+        for file_name, raw in arsiv_uyeleri(zip_data):
+            dosya += 1
+            sonuclar = {}
+            for a in AYRISTIRICILAR:
+                t0 = time.perf_counter()
+                sonuclar[a] = html_fiyat_cikar(raw, url_map, a)
+                sureler[a] += time.perf_counter() - t0
+            if len(set(sonuclar.values())) > 1:
+                farkli += 1
+                print(f"❌ {os.path.basename(yol)}/{file_name}: {sonuclar}")
+            koklanan = kanonik_url_kokla(raw[:KANONIK_TARAMA_BAYT])
+            if koklanan is not None:
+                tam = kanonik_url_bul(BeautifulSoup(raw.decode("utf-8", errors="ignore"), 'html.parser'))
+                if koklanan != tam:
+                    farkli += 1
+                    print(f"❌ {os.path.basename(yol)}/{file_name}: ön eleme {koklanan!r} != {tam!r}")
+    print(f"{dosya} HTML dosyası karşılaştırıldı, {farkli} farklı sonuç.")
+    print("  ".join(f"{a}: {s:.2f} sn" for a, s in sureler.items()))
+    return 1 if farkli else 0
+
+
+# --- 3. SHA TAKİBİ: DEĞİŞMEYEN ARŞİVLERİN ATLANMASI ---
+def arsiv_takibi_olcumu(args):
+    url_map = yerel_url_map()
+    repo = YerelRepo()
+    with tempfile.TemporaryDirectory() as gecici:
+        onbellek_yolu = os.path.join(gecici, "onbellek.sqlite")
+        sonuclar = []
+        for tur in ("ilk", "tekrar"):
+            repo.indirilen_bayt = 0
+            onbellek = AyristirmaOnbellegi(onbellek_yolu)
+            t0 = time.perf_counter()
+            arsivler = arsivleri_hazirla(repo, "main", onbellek, log_callback=lambda m: None)
+            sonuclar.append(arsivleri_isle(arsivler, url_map, 1, onbellek=onbellek))
+            gecen = time.perf_counter() - t0
+            onbellek.kapat()
+            atlanmis = atlanan_arsivler(arsivler)
+            print(f"{tur:7}: {gecen:6.2f} sn, {repo.indirilen_bayt / 1e6:5.1f} MB base64 indirildi, "
+                  f"{len(atlanmis)} arşiv ({sum(a.boyut for a in atlanmis) / 1e6:.1f} MB) atlandı, "
+                  f"{len(sonuclar[-1])} fiyat")
+    if sonuclar[0] != sonuclar[1]:
+        print("❌ HATA: Atlanan arşivlerden gelen fiyatlar farklı!")
+        return 1
+    print("✅ Fiyatlar birebir aynı.")
+    return 0
+
+
+# --- 4. BELLEK: TEPE RSS (ESKİ vs AKIŞLI ARŞİV OKUMA) ---
+def _tepe_rss_mb(kim="self"):
+    import resource
+    tepe = resource.getrusage(resource.RUSAGE_CHILDREN if kim == "cocuk" else resource.RUSAGE_SELF).ru_maxrss
+    return tepe / (1024 * 1024) if sys.platform == "darwin" else tepe / 1024
+
+
+def _eski_arsiv_isle(repo, url_map):
+    # Eski html_isleyici akışı: base64 metni + çözülmüş baytlar + BytesIO + HTML metni + soup aynı anda
+    bulunanlar = [];
+    islenen_kodlar = set()
+    for zip_file in repo.get_contents(""):
+        blob = repo.get_git_blob(zip_file.sha)
+        zip_data = base64.b64decode(blob.content)
+        with zipfile.ZipFile(BytesIO(zip_data)) as z:
+            for file_name in z.namelist():
+                if not file_name.endswith(('.html', '.htm')): continue
+                with z.open(file_name) as f:
+                    raw = f.read().decode("utf-8", errors="ignore")
+                    soup = BeautifulSoup(raw, 'html.parser')
+                    found_url = kanonik_url_bul(soup)
+                    if found_url in url_map:
+                        kod, url = url_map[found_url]
+                        if kod in islenen_kodlar: continue
+                        fiyat, kaynak = fiyat_bul_siteye_gore(soup, url)
+                        if fiyat > 0:
+                            bulunanlar.append((kod, fiyat, kaynak))
+                            islenen_kodlar.add(kod)
+    return bulunanlar
+
+
+def bellek_olcumu(args):
+    if not args.yontem:
+        # Tepe RSS süreç başına tutulduğu için her yöntem ayrı bir süreçte ölçülür.
+        # Yeni yöntem hem tek süreçte hem uygulamanın varsayılan işçi sayısıyla ölçülür.
+        for yontem, isci in dict.fromkeys([("eski", 1), ("yeni", 1), ("yeni", args.isci)]):
+            subprocess.run([sys.executable, os.path.abspath(__file__), "bellek", "--zip", args.zip,
+                            "--yontem", yontem, "--ayristirici", args.ayristirici, "--isci", str(isci)], check=True)
+        return 0
+    url_map = yerel_url_map()
+    repo = YerelRepo(desen=args.zip)
+    boyut = sum(c.size for c in repo.get_contents(""))
+    baslangic = _tepe_rss_mb()
+    if args.yontem == "eski":
+        sonuc = _eski_arsiv_isle(repo, url_map)
+    else:
+        arsivler = arsivleri_hazirla(repo, "main", log_callback=lambda m: None)
+        sonuc = arsivleri_isle(arsivler, url_map, args.isci, args.ayristirici)
+    tepe = _tepe_rss_mb()
+    isci = f", en büyük işçi {_tepe_rss_mb('cocuk'):.1f} MB" if args.yontem == "yeni" and args.isci > 1 else ""
+    print(f"{args.yontem:4} ({args.isci} işçi): tepe RSS {tepe:7.1f} MB (başlangıç {baslangic:.1f} MB, artış "
+          f"{tepe - baslangic:6.1f} MB{isci}, arşiv {boyut / 1e6:.1f} MB, {len(sonuc)} fiyat)")
+    return 0
+
+
+# --- 5. ENDEKS ÇEKİRDEĞİ: GÜN GÜN PANDAS vs MASKELİ MATRİS ---
+def _eski_endeks(df, gunler, baz, agirlik_col):
+    return [(df.dropna(subset=[g, baz])[agirlik_col] * (df[g] / df[baz])).sum() /
+            df.dropna(subset=[g, baz])[agirlik_col].sum() * 100 for g in gunler]
+
+
+def endeks_olcumu(args):
+    rng = np.random.default_rng(0)
+    # Rastgele yürüyüş fiyatlar, %5 eksik hücre, 12 COICOP grubu
+    fiyatlar = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (args.madde, args.gun)), axis=1))
+    fiyatlar[rng.random(fiyatlar.shape) < 0.05] = np.nan
+    agirliklar = rng.uniform(0.1, 5, args.madde)
+    gruplar = rng.integers(0, 12, args.madde)
+    uyelik = np.vstack([np.ones(args.madde, dtype=bool), kume_uyeligi(gruplar, 12)])
+    print(f"Matris: {args.madde} madde × {args.gun} gün, {len(uyelik)} küme (genel + 12 grup)")
+
+    t_yeni, yeni = sure_olc(lambda: laspeyres_endeksleri(fiyatlar, agirliklar, uyelik), args.tekrar)
+    print(f"NumPy (tüm kümeler): {t_yeni * 1000:9.1f} ms")
+
+    gunler = [f"g{i}" for i in range(args.gun)]
+    df = pd.DataFrame(fiyatlar, columns=gunler)
+    df['Agirlik'] = agirliklar
+    t_eski, eski = sure_olc(lambda: _eski_endeks(df, gunler, gunler[0], 'Agirlik'), 1)
+    print(f"Pandas (yalnız genel): {t_eski * 1000:9.1f} ms  hızlanma x{t_eski / t_yeni:.0f}")
+
+    if not np.allclose(yeni[0], eski, equal_nan=True):
+        print("❌ HATA: Genel endeks sonuçları farklı!")
+        return 1
+    print("✅ Genel endeks pandas sonucuyla aynı.")
+    return 0
+
+
+# --- 6. TARAMA: ARŞİVLENMİŞ HTML'İ SUNAN YEREL SUNUCUYA KARŞI ---
+class _ArsivSunucusu(ThreadingHTTPServer):
+    """/<kod>?alan=<alan> isteğine arşivdeki <kod>.html'i gecikmeyle döner; alan başına eşzamanlılığı ölçer."""
+    daemon_threads = True
+
+    def __init__(self, sayfalar, gecikme):
+        self.sayfalar, self.gecikme = sayfalar, gecikme
+        self.aktif, self.tepe, self.yanitlar = Counter(), Counter(), Counter()
+        self.kilit = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _ArsivIsleyici)
+
+
+class _ArsivIsleyici(BaseHTTPRequestHandler):
+    def do_GET(self):
+        s = self.server
+        parca = urlsplit(self.path)
+        alan = parse_qs(parca.query).get("alan", [""])[0]
+        with s.kilit:
+            s.aktif[alan] += 1
+            s.tepe[alan] = max(s.tepe[alan], s.aktif[alan])
+        try:
+            time.sleep(s.gecikme)
+            veri = s.sayfalar.get(parca.path.strip("/"))
+            etag = f'"{hashlib.sha1(veri).hexdigest()}"' if veri else None
+            if veri and self.headers.get("If-None-Match") == etag:
+                kod, veri = 304, b""
+            else:
+                kod = 200 if veri else 404
+            with s.kilit:
+                s.yanitlar[kod] += 1
+            gz = bool(veri) and "gzip" in self.headers.get("Accept-Encoding", "")
+            if gz: veri = gzip.compress(veri, 1)
+            self.send_response(kod)
+            # Sayfaların yarısı charset'siz: getirici ISO-8859-1 varsaymadan UTF-8 çözmeli
+            charset = "; charset=utf-8" if zlib.crc32(parca.path.encode()) % 2 else ""
+            self.send_header("Content-Type", "text/html" + charset)
+            if etag: self.send_header("ETag", etag)
+            if gz: self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(veri or b"")))
+            self.end_headers()
+            if veri: self.wfile.write(veri)
+        finally:
+            with s.kilit:
+                s.aktif[alan] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class _YerelGetirici(tarama_motoru.HttpGetirici):
+    """İşin gerçek ürün URL'sini yerel sunucudaki karşılığından getirir. Getiriciye (ve site kurallarına)
+    gerçek URL gider; 127.0.0.1 adresi kurallarda varsayılana düşüreceği için yalnızca istekte kullanılır."""
+
+    def __init__(self, yerel, onbellek=None):
+        super().__init__(onbellek)
+        self.yerel = yerel
+
+    def getir(self, url, ayar):
+        return super().getir(self.yerel[url], ayar)._replace(son_url=url)
+
+
+def tarama_olcumu(args):
+    sayfalar = {}
+    for veri in yerel_arsivler()[1]:
+        with zipfile.ZipFile(BytesIO(veri)) as z:
+            sayfalar.update({os.path.splitext(i.filename)[0]: z.read(i) for i in z.infolist()
+                             if i.filename.endswith(".html")})
+    # Testi kısaltmak için gerçek hız sınırları ölçeklenir; eşzamanlılık sınırları aynen kalır
+    for ayar in [*tarama_motoru.ALAN_AYARLARI.values(), tarama_motoru.VARSAYILAN_ALAN_AYARI]:
+        ayar['aralik'] *= args.aralik_carpani
+    sunucu = _ArsivSunucusu(sayfalar, args.gecikme)
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    adres = f"http://127.0.0.1:{sunucu.server_address[1]}"
+    isler, yerel = [], {}  # yerel: gerçek URL -> sunucudaki karşılığı
+    for i in tarama_motoru.tarama_isleri():
+        if i.kod not in sayfalar or i.url in yerel: continue  # Aynı URL'yi paylaşan Kod'lardan ilki alınır
+        isler.append(i)
+        yerel[i.url] = f"{adres}/{i.kod}?alan={i.alan}"
+    print(f"Yerel sunucu: {adres}, {len(isler)} sayfa, istek başına {args.gecikme * 1000:.0f} ms gecikme, "
+          f"alanlar: {dict(Counter(i.alan for i in isler))}")
+
+    url_map = yerel_url_map()
+    sonuclar = {}
+    for sekme in (1, args.sekme):
+        kaydedilen = {}
+        sunucu.tepe.clear()
+        t, sayac = sure_olc(lambda: tarama_motoru.taramayi_calistir(
+            isler, _YerelGetirici(yerel), lambda is_, sayfa: kaydedilen.__setitem__(is_.kod, sayfa.html), sekme,
+            ilerleme=None), 1)
+        print(f"{sekme:2} sekme: {t:6.2f} sn  {dict(sayac)}  alan başına tepe eşzamanlılık: {dict(sunucu.tepe)}")
+        for alan, tepe in sunucu.tepe.items():
+            if tepe > tarama_motoru.alan_ayari(alan)['eszamanli']:
+                print(f"❌ HATA: {alan} için eşzamanlılık sınırı aşıldı ({tepe})!")
+                return 1
+        sonuclar[sekme] = {k: html_fiyat_cikar(h.encode("utf-8"), url_map) for k, h in kaydedilen.items()}
+        if any(kaydedilen[k].encode("utf-8") != sayfalar[k] for k in kaydedilen) or len(kaydedilen) != len(isler):
+            print("❌ HATA: Kaydedilen sayfalar sunulanlarla aynı değil!")
+            return 1
+    if sonuclar[1] != sonuclar[args.sekme]:
+        print("❌ HATA: Seri ve paralel taramanın çıkardığı fiyatlar farklı!")
+        return 1
+    print(f"✅ Tüm sayfalar birebir kaydedildi; {sum(v is not None for v in sonuclar[1].values())} fiyat aynı.")
+
+    # Hızlı mod: hizli alanlar düz HTTP + koşullu istekle, diğerleri (ve fiyatı çıkmayanlar) "tarayıcı"yla.
+    # Yalnızca gerçek sitenin kuralıyla fiyatı çıkmayan hızlı alan sayfaları tarayıcıya düşmeli.
+    hizli = Counter(i.alan for i in isler if tarama_motoru.alan_ayari(i.alan)['hizli'])
+    cikan = Counter(i.alan for i in isler
+                    if i.alan in hizli and fiyat_motoru.sayfada_fiyat_var(sayfalar[i.kod], i.url))
+    print("HTTP'de fiyatı çıkan: " + ", ".join(f"{a} {cikan[a]}/{n}" for a, n in hizli.items()))
+    with tempfile.TemporaryDirectory() as gecici:
+        onbellek = tarama_motoru.KosulluOnbellek(os.path.join(gecici, "http.sqlite"))
+        tarayici = _YerelGetirici(yerel)
+        for tur in ("ilk", "tekrar"):
+            kaydedilen = {}
+            sunucu.yanitlar.clear()
+            karma = tarama_motoru.KarmaGetirici(_YerelGetirici(yerel, onbellek), lambda: tarayici)
+            t, sayac = sure_olc(lambda: tarama_motoru.taramayi_calistir(
+                isler, karma, lambda is_, sayfa: kaydedilen.__setitem__(is_.kod, sayfa.html), args.sekme,
+                ilerleme=None), 1)
+            print(f"Hızlı mod ({tur}): {t:6.2f} sn  {dict(sayac)}  yedeğe düşen: {karma.sayac['yedek']}  "
+                  f"sunucu yanıtları: {dict(sunucu.yanitlar)}")
+            if {k: html_fiyat_cikar(h.encode("utf-8"), url_map) for k, h in kaydedilen.items()} != sonuclar[1]:
+                print("❌ HATA: Hızlı modun çıkardığı fiyatlar farklı!")
+                return 1
+            if karma.sayac['yedek'] != sum(hizli.values()) - sum(cikan.values()):
+                print("❌ HATA: Fiyatı site kuralıyla çıkan sayfalar da tarayıcıya düştü!")
+                return 1
+        onbellek.kapat()
+    print("✅ Hızlı mod aynı fiyatları verdi.")
+    sunucu.shutdown()
+    return 0
+
+
+# --- 7. TARAMA GÜNLÜĞÜ: KALDIĞI YERDEN DEVAM ---
+class _AksakGetirici:
+    """Her n. URL'de hata veren (Cloudflare engeli benzeri) sahte getirici."""
+
+    def __init__(self, n):
+        self.n, self.istenen = n, []
+
+    def getir(self, url, ayar):
+        self.istenen.append(url)
+        if hash(url) % self.n == 0: raise RuntimeError("Cloudflare")
+        return tarama_motoru.Sayfa(f"<html>{url}</html>", "tamam", url)
+
+
+def gunluk_olcumu(args):
+    # Ağ yok; hız sınırları devre dışı
+    tarama_motoru.VARSAYILAN_ALAN_AYARI.update(eszamanli=4, aralik=0)
+    isler = [i._replace(alan="yerel") for i in tarama_motoru.tarama_isleri()]
+    with tempfile.TemporaryDirectory() as gecici:
+        gunluk = tarama_motoru.TaramaGunlugu(os.path.join(gecici, "gunluk.sqlite"))
+        getirici = _AksakGetirici(args.hata_orani)
+        sayac = tarama_motoru.taramayi_calistir(isler, getirici, lambda is_, sayfa: None, 4, None, gunluk)
+        hatalilar = {u for u in getirici.istenen if hash(u) % args.hata_orani == 0}
+        print(f"1. tur: {len(getirici.istenen)} istek, {dict(sayac)}")
+
+        bekleyen, atlanan = gunluk.bekleyenler(isler)
+        print(f"Hemen yeniden: {len(bekleyen)} iş, atlanan {dict(atlanan)}")
+        sonra = time.time() + tarama_motoru.GERI_CEKILME_SANIYE + 1
+        bekleyen, atlanan = gunluk.bekleyenler(isler, simdi=sonra)
+        print(f"Geri çekilme dolunca: {len(bekleyen)} iş, atlanan {dict(atlanan)}")
+        if bekleyen and {i.url for i in bekleyen} != hatalilar:
+            print("❌ HATA: Yalnızca başarısız URL'ler yeniden denenmeli!")
+            return 1
+        # Art arda hatalarda bekleme katlanır: 2. hatadan sonra ilk bekleme yetmez
+        tarama_motoru.taramayi_calistir(bekleyen, getirici, lambda is_, sayfa: None, 4, None, gunluk)
+        if gunluk.bekleyenler(isler, simdi=sonra)[0]:
+            print("❌ HATA: İkinci hatadan sonra bekleme süresi katlanmadı!")
+            return 1
+        tazelik_sonrasi = time.time() + tarama_motoru.TAZELIK_SAAT * 3600 + 1
+        print(f"Tazelik penceresi sonrası: {len(gunluk.bekleyenler(isler, simdi=tazelik_sonrasi)[0])} iş")
+        gunluk.kapat()
+    print("✅ Günlük yalnızca başarısızları üstel geri çekilmeyle yeniden deniyor.")
+    return 0
+
+
+# --- 8. GÜNLÜK ARŞİV: TARAYICIDAN DOĞRUDAN ZIP + MANIFEST ---
+def gunluk_arsiv_olcumu(args):
+    isler = {i.kod: i for i in tarama_motoru.tarama_isleri()}
+    url_map = yerel_url_map()
+    taban = arsivleri_isle(yerel_arsivler()[1], url_map, 1)
+    with tempfile.TemporaryDirectory() as gecici:
+        yazici = tarama_motoru.GunlukArsivYazici(gecici, "2000-01-01", int(args.parca_mb * 2 ** 20), args.kirp)
+        t0 = time.perf_counter();
+        yazilan = 0
+        for veri in yerel_arsivler()[1]:
+            with zipfile.ZipFile(BytesIO(veri)) as z:
+                for info in z.infolist():
+                    if (is_ := isler.get(os.path.splitext(info.filename)[0])) is None: continue
+                    yazici.yaz(is_, tarama_motoru.Sayfa(z.read(info).decode("utf-8"), "tamam", is_.url))
+                    yazilan += 1
+        parcalar = sorted(glob.glob(os.path.join(gecici, "*.zip")))
+        print(f"Yazım: {yazilan} sayfa ({yazici.sayac['kirpik']} kırpık), {time.perf_counter() - t0:.2f} sn, "
+              f"{len(parcalar)} parça ({sum(map(os.path.getsize, parcalar)) / 1e6:.1f} MB)")
+
+        repo = YerelRepo(gecici)
+        onbellek = AyristirmaOnbellegi(os.path.join(gecici, "onbellek.sqlite"))
+        for tur in ("ilk", "tekrar"):
+            repo.indirilen_bayt = 0;
+            sayac = Counter()
+            t0 = time.perf_counter()
+            arsivler = arsivleri_hazirla(repo, "main", onbellek, log_callback=lambda m: None)
+            sonuc = arsivleri_isle(arsivler, url_map, 1, sayac=sayac, onbellek=onbellek)
+            print(f"{tur:7}: {time.perf_counter() - t0:6.2f} sn, {repo.indirilen_bayt / 1e6:5.1f} MB base64 indirildi, "
+                  f"{len(atlanan_arsivler(arsivler))}/{len(arsivler)} parça açılmadı, "
+                  f"{sayac['manifest']} sayfa manifestten eşlendi, {len(sonuc)} fiyat")
+            # Kanonik etiketi olmayan/konfigürasyondan farklı sayfalar artık istenen URL'den eşlenir: ek fiyat olabilir
+            eksik = set(taban) - set(sonuc)
+            if eksik:
+                print("❌ HATA: Eski akışın bulduğu fiyatlar günlük arşivden farklı/eksik çıktı!")
+                for fark in sorted(eksik)[:10]: print("   ", fark)
+                return 1
+        kazanilan = sorted(set(sonuc) - set(taban))
+        print(f"✅ Eski Bolum_N.zip akışının {len(taban)} fiyatı birebir aynı; kanonik URL'si eşleşmeyen "
+              f"{len(kazanilan)} sayfa manifest sayesinde eşlendi: {[k for k, _, _ in kazanilan]}")
+        hata = _cok_gunlu_olcum(args, gecici, isler, url_map, {k: f for k, f, _ in sonuc}, onbellek)
+        onbellek.kapat()
+    return hata
+
+
+def _tr_fiyat(x):
+    return f"{x:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _fiyati_degistir(html, fiyat, yeni):
+    # Sayfadaki fiyat metnini (1.080,95 / 1080,95 / 1080.95) yenisiyle değiştirir
+    for eski_m, yeni_m in ((_tr_fiyat(fiyat), _tr_fiyat(yeni)), (f"{fiyat:.2f}", f"{yeni:.2f}"),
+                           (_tr_fiyat(fiyat).replace(".", ""), _tr_fiyat(yeni).replace(".", ""))):
+        html = html.replace(eski_m, yeni_m)
+    return html
+
+
+def _cok_gunlu_olcum(args, gecici, isler, url_map, beklenen, onbellek):
+    # İkinci gün: ilk günün 1. parçasındaki tüm Kod'lar ve her üç Kod'dan biri farklı fiyatla yeniden alınır;
+    # eski Bolum_N.zip'ler de kökte durur. Yeni günün fiyatı hem eski günü hem eski arşivleri ezmeli,
+    # tümüyle eskiyen parça hiç indirilmemeli.
+    with open(os.path.join(gecici, f"Bolum_2000-01-01{fiyat_motoru.MANIFEST_EKI}"), encoding="utf-8") as f:
+        eski_parca = {kod for kod, k in json.load(f)["kodlar"].items() if k["arsiv"] == "Bolum_2000-01-01_1.zip"}
+    yeniden = eski_parca | set(list(isler)[::3])
+    yazici = tarama_motoru.GunlukArsivYazici(gecici, "2000-01-02", int(args.parca_mb * 2 ** 20), args.kirp)
+    degisen = 0
+    for yol, veri in zip(*yerel_arsivler()):
+        with open(os.path.join(gecici, os.path.basename(yol)), "wb") as f:
+            f.write(veri)
+        with zipfile.ZipFile(BytesIO(veri)) as z:
+            for info in z.infolist():
+                if (is_ := isler.get(os.path.splitext(info.filename)[0])) is None or is_.kod not in yeniden: continue
+                html = z.read(info).decode("utf-8")
+                kod = url_map[is_.url][0] if is_.url in url_map else None
+                if kod in beklenen: html = _fiyati_degistir(html, beklenen[kod], round(beklenen[kod] * 3 + 0.07, 2))
+                yazici.yaz(is_, tarama_motoru.Sayfa(html, "tamam", is_.url))
+                yeni = kod and html_fiyat_cikar(html.encode("utf-8"), url_map, VARSAYILAN_AYRISTIRICI, is_.url)
+                if yeni and yeni[1] > 0:
+                    degisen += yeni[1] != beklenen.get(kod)
+                    beklenen[kod] = yeni[1]
+    print(f"İkinci gün: {len(yeniden)} sayfa yeniden alındı, {degisen} fiyat değişti; eski Bolum_N.zip'ler de kökte")
+
+    repo = YerelRepo(gecici)
+    for tur in ("ilk", "temizlik"):
+        if tur == "temizlik":
+            silinen = tarama_motoru.eskiyenleri_temizle(gecici)
+            print(f"eskiyenleri_temizle: {silinen}")
+            if silinen != ["Bolum_2000-01-01_1.zip"]:
+                print("❌ HATA: Yalnızca tümüyle eskiyen 1. parça silinmeliydi!")
+                return 1
+        repo.indirilen_adlar = []
+        sonuc = arsivleri_isle(arsivleri_hazirla(repo, "main", onbellek, log_callback=lambda m: None), url_map, 1,
+                               onbellek=onbellek)
+        print(f"{tur:8}: {len(sonuc)} fiyat, indirilen: {sorted(set(repo.indirilen_adlar) - {''})}")
+        farkli = [(k, f, beklenen.get(k)) for k, f, _ in sonuc if f != beklenen.get(k)]
+        if farkli or len(sonuc) != len(beklenen):
+            print("❌ HATA: Yeni günün fiyatı eski gün/eski arşivdekini ezmedi!")
+            for fark in farkli[:10]: print("   ", fark)
+            return 1
+        if "Bolum_2000-01-01_1.zip" in repo.indirilen_adlar:
+            print("❌ HATA: Tümüyle eskiyen parça indirildi!")
+            return 1
+    print(f"✅ Çok günlü: {degisen} değişen fiyatın hepsi yeni günden; eskiyen parça indirilmedi ve temizlendi")
+    return 0
+
+
+# --- 9. KIRPILMIŞ SAYFA: TAM SAYFAYLA AYNI FİYAT ---
+def kirpma_olcumu(args):
+    isler = {i.kod: i for i in tarama_motoru.tarama_isleri()}
+    url_map = yerel_url_map()
+    boyut, sureler, farkli, sayac = Counter(), Counter(), 0, Counter()
+    for yol in sorted(glob.glob(args.zip)):
+        with zipfile.ZipFile(yol) as z:
+            for info in z.infolist():
+                if (is_ := isler.get(os.path.splitext(info.filename)[0])) is None: continue
+                raw = z.read(info)
+                t0 = time.perf_counter()
+                kirpik = sayfayi_kirp(raw, is_.url)
+                sureler["kirpma"] += time.perf_counter() - t0
+                saklanan = kirpik or raw
+                boyut["tam"] += len(raw); boyut["tam_zip"] += len(zlib.compress(raw, 6))
+                boyut["kirpik"] += len(saklanan); boyut["kirpik_zip"] += len(zlib.compress(saklanan, 6))
+                sayac["kirpik" if kirpik else "tam"] += 1
+                if not kirpik: continue
+                boyut["kirpilan_tam"] += len(raw); boyut["kirpilan"] += len(kirpik)
+                # Kanonik URL yolu (eski arşivler) ve manifestteki istenen URL yolu, iki ayrıştırıcıyla
+                for a in AYRISTIRICILAR:
+                    for found_url in (None, is_.url if is_.url in url_map else None):
+                        t0 = time.perf_counter()
+                        tam = html_fiyat_cikar(raw, url_map, a, found_url)
+                        sureler[f"{a}_tam"] += time.perf_counter() - t0
+                        t0 = time.perf_counter()
+                        kisa = html_fiyat_cikar(kirpik, url_map, a, found_url)
+                        sureler[f"{a}_kirpik"] += time.perf_counter() - t0
+                        if tam != kisa:
+                            farkli += 1
+                            print(f"❌ {os.path.basename(yol)}/{info.filename} ({a}): tam {tam} != kırpık {kisa}")
+    print(f"{sayac['kirpik']} sayfa kırpıldı, {sayac['tam']} sayfa tam kaldı (fiyat çıkmıyor / regex yedeği)")
+    print(f"Kırpılan sayfalar: {boyut['kirpilan_tam'] / 1e6:7.2f} MB -> {boyut['kirpilan'] / 1e3:7.1f} KB "
+          f"(x{boyut['kirpilan_tam'] / max(boyut['kirpilan'], 1):.0f}, sayfa başı {boyut['kirpilan'] / max(sayac['kirpik'], 1) / 1e3:.1f} KB)")
+    print(f"Tüm arşiv (ham)  : {boyut['tam'] / 1e6:7.2f} MB -> {boyut['kirpik'] / 1e6:7.2f} MB (x{boyut['tam'] / boyut['kirpik']:.1f})")
+    print(f"Tüm arşiv (zip)  : {boyut['tam_zip'] / 1e6:7.2f} MB -> {boyut['kirpik_zip'] / 1e6:7.2f} MB "
+          f"(x{boyut['tam_zip'] / boyut['kirpik_zip']:.1f}); kırpma süresi {sureler['kirpma']:.2f} sn")
+    for a in AYRISTIRICILAR:
+        print(f"Ayrıştırma ({a:4}, kırpılan sayfalar): tam {sureler[f'{a}_tam']:6.2f} sn, "
+              f"kırpık {sureler[f'{a}_kirpik']:6.3f} sn (x{sureler[f'{a}_tam'] / max(sureler[f'{a}_kirpik'], 1e-9):.0f})")
+    if farkli:
+        print(f"❌ HATA: {farkli} karşılaştırmada kırpılmış sayfa farklı sonuç verdi!")
+        return 1
+    print("✅ Kırpılmış sayfalar her iki ayrıştırıcıda da tam sayfayla aynı fiyatı veriyor.")
+    return 0
+
+
+# --- 10. KURAL MOTORU: DERLENMİŞ vs HER ÇAĞRIDA YORUMLANAN KURALLAR ---
+class _AnlikSecici:
+    """Derlenmiş seçici yerine her çağrıda CSS metninden çalışan eşdeğeri (eski davranış)."""
+
+    def __init__(self, css):
+        self.css = css
+
+    def lx(self, kok):
+        return CSSSelector(self.css, translator="html")(kok)
+
+    def select(self, kok):
+        return kok.select(self.css)
+
+    def select_one(self, kok):
+        return kok.select_one(self.css)
+
+
+def _yorumlanan(kural):
+    def cevir(s):
+        a = _AnlikSecici(s.css)
+        return s._replace(sv=a, lx=a.lx)
+
+    # Çöp elemanları da eskisi gibi her sayfada tüm ağaç taranarak toplanır
+    return kural._replace(cop=kural.cop and cevir(kural.cop), cop_ata=None, adimlar=[
+        a._replace(kap=a.kap and cevir(a.kap), seciciler=[cevir(s) for s in a.seciciler]) for a in kural.adimlar])
+
+
+def kural_olcumu(args):
+    isler = {i.kod: i for i in tarama_motoru.tarama_isleri()}
+    sayfalar = []
+    for veri in yerel_arsivler()[1]:
+        with zipfile.ZipFile(BytesIO(veri)) as z:
+            sayfalar += [(z.read(i), isler[k].url) for i in z.infolist()
+                         if (k := os.path.splitext(i.filename)[0]) in isler]
+    derli = fiyat_motoru.KURALLAR
+    yorumlu = derli._replace(siteler={h: _yorumlanan(k) for h, k in derli.siteler.items()},
+                             varsayilan=_yorumlanan(derli.varsayilan))
+    print(f"{len(sayfalar)} sayfa, kurallı alanlar: {sorted(derli.siteler)}")
+    sonuclar = {}
+    try:
+        for ad, kurallar in (("yorumlanan", yorumlu), ("derlenmiş", derli)):
+            fiyat_motoru.KURALLAR = kurallar
+            docs = [(lxml.html.document_fromstring(r, parser=fiyat_motoru._UTF8_HTML), u) for r, u in sayfalar]
+            t_lxml, sonuc = sure_olc(lambda: [fiyat_motoru.fiyat_bul_lxml(d, u) for d, u in docs], args.tekrar)
+            # bs4 kuralı çöp alt ağaçlarını siler: her turda yeni ağaç, yalnızca kural süresi ölçülür
+            t_bs4 = 0.0
+            for r, u in sayfalar[:args.bs4_sayfa]:
+                soup = BeautifulSoup(r.decode("utf-8", errors="ignore"), 'html.parser')
+                t0 = time.perf_counter()
+                sonuc.append(fiyat_motoru.fiyat_bul_siteye_gore(soup, u))
+                t_bs4 += time.perf_counter() - t0
+            sonuclar[ad] = sonuc
+            print(f"{ad:10}: lxml {t_lxml * 1000:7.1f} ms, bs4 ({args.bs4_sayfa} sayfa) {t_bs4 * 1000:7.1f} ms")
+    finally:
+        fiyat_motoru.KURALLAR = derli
+    if sonuclar["yorumlanan"] != sonuclar["derlenmiş"]:
+        print("❌ HATA: Derlenmiş kurallar farklı sonuç verdi!")
+        return 1
+    print("✅ Sonuçlar aynı.")
+    return 0
+
+
+# --- 11. FİYAT ÇÖZÜCÜ: ÖZELLİK TABANLI DERLEM + MİKRO ÖLÇÜM ---
+def _eski_temizle_fiyat(t):
+    if not t: return None
+    t = str(t).replace('TL', '').replace('₺', '').strip()
+    t = t.replace('.', '').replace(',', '.') if ',' in t and '.' in t else t.replace(',', '.')
+    try:
+        return float(re.sub(r'[^\d.]', '', t))
+    except:
+        return None
+
+
+def _turkce_tutar(rng, x):
+    # x -> "1.234,56" / "1234,56" biçiminde, rastgele para birimi ve boşluklarla
+    tam, kurus = divmod(round(x * 100), 100)
+    tam_s = f"{tam:,}".replace(",", ".") if rng.random() < 0.5 else str(tam)
+    bosluk = rng.choice(["", " ", "\xa0", "  "])
+    sayi = f"{tam_s},{kurus:02d}"
+    return rng.choice([f"{sayi}{bosluk}TL", f"₺{bosluk}{sayi}", f"{sayi}{bosluk}₺", f" {sayi} ", sayi])
+
+
+def cozucu_olcumu(args):
+    rng = random.Random(args.tohum)
+    hata = 0
+    # 1. İyi biçimli tutarlar geri dönmeli
+    tutarlar = [round(rng.choice([rng.uniform(0, 100), rng.uniform(100, 1e6)]), 2) for _ in range(args.ornek)]
+    metinler = [_turkce_tutar(rng, x) for x in tutarlar]
+    for x, m in zip(tutarlar, metinler):
+        if temizle_fiyat(m) != x:
+            hata += 1
+            if hata <= 5: print(f"❌ {m!r}: {temizle_fiyat(m)} != {x}")
+    # 2. Rastgele (bozuk) metinlerde eski uygulamayla aynı sonuç
+    harfler = "0123456789.,., TL₺\xa0ab-/%٣"
+    bozuk = ["".join(rng.choice(harfler) for _ in range(rng.randint(0, 14))) for _ in range(args.ornek)]
+    for m in bozuk + metinler + [None, "", 0, 12.5, "TL", "1.2.3", "1,2,3"]:
+        if (yeni := temizle_fiyat(m)) != (eski := _eski_temizle_fiyat(m)):
+            hata += 1
+            if hata <= 10: print(f"❌ {m!r}: yeni {yeni} != eski {eski}")
+    # 3. Sınırlı metin = tüm metnin kesilmişi; tarama her fiyatı bulur
+    for _ in range(args.ornek // 10):
+        parcalar = [rng.choice(metinler) + " " + "x" * rng.randint(0, 3000) for _ in range(rng.randint(0, 8))]
+        sinir = rng.randint(0, 12000)
+        if sinirli_metin(iter(parcalar), sinir) != "".join(parcalar)[:sinir]:
+            hata += 1
+            print(f"❌ sinirli_metin farklı (sınır {sinir}, {len(parcalar)} parça)")
+    desen = fiyat_motoru.KURALLAR.desen
+    metin = " | ".join(f"{x:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".") + " TL" for x in tutarlar)
+    if fiyatlari_tara(desen, metin) != [x for x in tutarlar if x > 0]:
+        hata += 1
+        print("❌ fiyatlari_tara tüm tutarları bulamadı")
+    print(f"Derlem: {len(metinler)} biçimli + {len(bozuk)} bozuk metin, {hata} hata")
+
+    # Mikro ölçüm: tek sayı yerine tekrarların dağılımı; biçimli ve bozuk metinler ayrı
+    for derlem_adi, derlem in (("biçimli", metinler), ("bozuk", bozuk)):
+        for ad, fonk in (("eski", _eski_temizle_fiyat), ("yeni", temizle_fiyat)):
+            ns = [t / len(derlem) * 1e9
+                  for t in timeit.repeat(lambda: [fonk(m) for m in derlem], number=1, repeat=args.tekrar)]
+            print(f"temizle_fiyat {ad} ({derlem_adi:7}): en iyi {min(ns):5.0f}, ortanca {statistics.median(ns):5.0f}, "
+                  f"en kötü {max(ns):5.0f} ns/çağrı ({args.tekrar} tekrar)")
+    sayfalar = []
+    for veri in yerel_arsivler()[1]:
+        with zipfile.ZipFile(BytesIO(veri)) as z:
+            sayfalar += [BeautifulSoup(z.read(i).decode("utf-8", errors="ignore"), 'html.parser')
+                         for i in z.infolist()[:args.sayfa]]
+    t_eski, eski = sure_olc(lambda: [s.get_text()[:10000] for s in sayfalar], args.tekrar)
+    t_yeni, yeni = sure_olc(lambda: [sinirli_metin(s.strings, 10000) for s in sayfalar], args.tekrar)
+    print(f"Regex yedeği metni ({len(sayfalar)} sayfa): get_text()[:10000] {t_eski * 1000:.1f} ms, "
+          f"sinirli_metin {t_yeni * 1000:.1f} ms (x{t_eski / t_yeni:.1f})")
+    if eski != yeni:
+        hata += 1
+        print("❌ HATA: Sınırlı metin get_text() ile aynı değil!")
+    if hata:
+        return 1
+    print("✅ Çözücü tüm özellikleri sağlıyor.")
+    return 0
+
+
+# --- 12. SEPET KATMANI: SATIR SATIR apply/iterrows vs TİPLİ SEPET ---
+def _eski_sepet(df_conf):
+    """html_isleyici'nin eski satır satır hazırlığı: (işçi url_map, manuel fiyatlar)."""
+    df_conf = df_conf.copy()
+    df_conf.columns = df_conf.columns.str.strip()
+    df_conf['Kod'] = df_conf['Kod'].astype(str).apply(kod_standartlastir)
+    url_map = {str(row['URL']).strip(): row for _, row in df_conf.iterrows() if pd.notna(row['URL'])}
+    manuel = []
+    for _, row in df_conf.iterrows():
+        if pd.notna(row['Manuel_Fiyat']) and str(row['Manuel_Fiyat']).strip() != "":
+            try:
+                if (f := float(row['Manuel_Fiyat'])) > 0: manuel.append((row['Kod'], f))
+            except ValueError:
+                pass
+    return {u: (row['Kod'], row['URL']) for u, row in url_map.items()}, manuel
+
+
+def _yeni_sepet(df_conf):
+    sepet = sepet_tablosu(df_conf)
+    manuel = sepet.tablo[sepet.tablo['Manuel_Fiyat'] > 0]
+    return {u: (k, u) for u, k in sepet.url_kod.items()}, list(zip(manuel['Kod'], manuel['Manuel_Fiyat']))
+
+
+def sepet_olcumu(args):
+    df_conf = pd.read_excel(EXCEL_DOSYASI, sheet_name=SAYFA_ADI, dtype=str)
+    t_eski, eski = sure_olc(lambda: _eski_sepet(df_conf), args.tekrar)
+    t_yeni, yeni = sure_olc(lambda: _yeni_sepet(df_conf), args.tekrar)
+    print(f"Sepet hazırlığı ({len(df_conf)} satır): iterrows {t_eski * 1000:.1f} ms, tipli sepet "
+          f"{t_yeni * 1000:.1f} ms (x{t_eski / t_yeni:.1f})")
+    hata = 0
+    if eski != yeni:
+        hata += 1
+        print("❌ HATA: url_map ya da manuel fiyatlar farklı!")
+
+    kodlar = pd.concat([pd.read_excel(FIYAT_DOSYASI, dtype=str)['Kod']] * args.kat, ignore_index=True)
+    t_eski, eski = sure_olc(lambda: kodlar.astype(str).apply(kod_standartlastir), args.tekrar)
+    t_yeni, yeni = sure_olc(lambda: kodlari_standartlastir(kodlar), args.tekrar)
+    print(f"Kod standartlaştırma ({len(kodlar)} satır): apply {t_eski * 1000:.1f} ms, vektörel "
+          f"{t_yeni * 1000:.1f} ms (x{t_eski / t_yeni:.1f})")
+    if eski.tolist() != yeni.tolist():
+        hata += 1
+        print("❌ HATA: Standartlaştırılmış kodlar farklı!")
+    if hata:
+        return 1
+    print("✅ Tipli sepet eski satır satır hazırlıkla aynı.")
+    return 0
+
+
+# --- 13. AÇILIŞ: ÇEKİRDEK vs İSTEĞE BAĞLI ALT SİSTEMLERİN İÇE AKTARMA MALİYETİ ---
+def acilis_olcumu_yazdir(args):
+    sonuc = acilis_olcumu(args.tekrar)
+    toplam = 0.0
+    for ad, (sure, eksik) in sonuc.items():
+        not_ = f"  (kurulu değil: {', '.join(eksik)})" if eksik else ""
+        print(f"{ad:<14} {sure * 1000:8.0f} ms{not_}")
+        toplam += sure
+    cekirdek = sonuc["cekirdek"][0]
+    print(f"Açılış: eskiden hepsi {toplam * 1000:.0f} ms, şimdi yalnızca çekirdek {cekirdek * 1000:.0f} ms; "
+          f"{len(ALT_SISTEMLER)} alt sistem ilk kullanımında yüklenir.")
+    if any(eksik for _, eksik in sonuc.values()):
+        print("⚠️ Bazı modüller kurulu olmadığı için süreleri eksik ölçüldü.")
+    return 0
+
+
+# --- 14. TAHMİN: SOĞUK/ILIK FIT, ÖNBELLEK İSABETİ, PARALEL GRUP FIT'LERİ ---
+def _sentetik_endeks(rng, gun, n):
+    tarih = pd.date_range("2025-01-01", periods=gun)
+    return {ad: pd.DataFrame({"ds": tarih, "y": 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.003, gun)))})
+            for ad in ["TÜFE"] + [f"Grup_{i}" for i in range(n)]}
+
+
+def _tahmin_hata_denetimi(d):
+    # prophet gerekmez: sonsuz değerli seri her ortamda başarısız olur; işçi süreci dışarıdan öldürülür
+    motor = TahminMotoru(os.path.join(d, "hata.sqlite"), isci_sayisi=1, hata_bekleme=60)
+    bozuk = {"Bozuk": pd.DataFrame({"ds": pd.date_range("2025-01-01", periods=3), "y": [1.0, np.inf, 3.0]})}
+    motor.toplu_tahmin(bozuk)
+    motor.bekle()
+    tekrar = [motor.toplu_tahmin(bozuk)["Bozuk"] for _ in range(5)]
+    if any(t.bekliyor for t in tekrar) or not tekrar[-1].hata:
+        print("❌ HATA: Başarısız fit sonraki çağrılarda bekleme süresi dolmadan yeniden gönderildi!")
+        return 1
+    print(f"Başarısız fit: hata kaydedildi ({tekrar[-1].hata[:60]}), 5 çağrıda yeniden gönderilmedi")
+
+    seriler = _sentetik_endeks(np.random.default_rng(1), 60, 1)
+    motor.toplu_tahmin({"TÜFE": seriler["TÜFE"]})
+    havuz = motor._havuz
+    for p in list(havuz._processes.values()): p.kill()
+    motor.bekle()
+    son_an = time.monotonic() + 10
+    while not havuz._broken and time.monotonic() < son_an: time.sleep(0.01)  # Yönetici çöküşü fark etsin
+    ilk = motor.toplu_tahmin({"Grup_0": seriler["Grup_0"]})["Grup_0"]  # Çökmüş havuz burada bırakılır
+    sonraki = motor.toplu_tahmin({"Grup_0": seriler["Grup_0"]})["Grup_0"]
+    motor.bekle()
+    son = motor.toplu_tahmin({"Grup_0": seriler["Grup_0"]})["Grup_0"]
+    motor.kapat()
+    if ilk.bekliyor or not sonraki.bekliyor or motor._havuz is havuz or "terminated" in str(son.hata):
+        print("❌ HATA: İşçisi çöken süreç havuzu yeniden kurulmadı!")
+        return 1
+    print("Çöken işçi: havuz bir sonraki gönderimde yeniden kuruldu")
+
+    # Paylaşılan tablo önbelleği: oturumlar aynı anda okuyup taşırırken yanlış tablo ya da KeyError olmamalı
+    metinler = {f"o{i}": pd.DataFrame({"ds": pd.date_range("2025-01-01", periods=1), "yhat": [float(i)],
+                                       "yhat_lower": [0.0], "yhat_upper": [0.0]}).to_json(
+                                           orient="split", date_format="iso", index=False)
+                for i in range(3 * TABLO_ONBELLEGI)}
+
+    def oturum(kayma):
+        try:
+            return all(motor._tablo(f"o{i}", metinler[f"o{i}"])['yhat'].iloc[0] == i
+                       for _ in range(3) for i in np.roll(np.arange(len(metinler)), kayma))
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+    _, sonuclar = _es_zamanli([lambda k=k: oturum(k * 17) for k in range(8)])
+    if any(r is not True for r in sonuclar) or len(motor._tablolar) > TABLO_ONBELLEGI:
+        print(f"❌ HATA: Eşzamanlı tablo önbelleği yanlış tablo döndü ya da taştı: {set(map(str, sonuclar))}")
+        return 1
+    print(f"Tablo önbelleği: 8 eşzamanlı oturum doğru tabloları aldı, {len(motor._tablolar)} tablo tutuldu")
+    return 0
+
+
+def tahmin_olcumu(args):
+    with tempfile.TemporaryDirectory() as d:
+        if _tahmin_hata_denetimi(d): return 1
+    try:
+        modul("tahmin", "prophet")
+    except ImportError as e:
+        print(f"⚠️ prophet kurulu değil ({e}); tahmin ölçümü yapılamadı.")
+        return 0
+    seriler = _sentetik_endeks(np.random.default_rng(0), args.gun, args.grup)
+    seri = seriler["TÜFE"]
+    t_dun, (model_dun, _) = sure_olc(lambda: tahmin_fit_et(seri.iloc[:-1]), 1)
+    # Ilık başlangıç sessizce soğuk fit'e düşmemeli: tahmin_fit_et reddedilen başlangıcı yutar
+    try:
+        modul("tahmin", "prophet").Prophet(**MODEL_AYARLARI).fit(
+            seri, init=_stan_baslangici(modul("tahmin", "prophet.serialize").model_from_json(model_dun)))
+    except Exception as e:
+        print(f"❌ HATA: Prophet ılık başlangıcı kabul etmedi ({type(e).__name__}: {e})")
+        return 1
+    t_soguk, (_, soguk) = sure_olc(lambda: tahmin_fit_et(seri), args.tekrar)
+    t_ilik, (_, ilik) = sure_olc(lambda: tahmin_fit_et(seri, onceki_model=model_dun), args.tekrar)
+    fark = (tahmin_tablosu(soguk)['yhat'] - tahmin_tablosu(ilik)['yhat']).abs().max()
+    print(f"Fit ({args.gun} gün): soğuk {t_soguk * 1000:.0f} ms, dünkü modelden ılık {t_ilik * 1000:.0f} ms "
+          f"(x{t_soguk / t_ilik:.1f}); yhat en büyük farkı {fark:.4f}")
+
+    with tempfile.TemporaryDirectory() as d:
+        sureler = {}
+        for isci in sorted({1, args.isci}):
+            motor = TahminMotoru(os.path.join(d, f"tahmin_{isci}.sqlite"), isci_sayisi=isci)
+            t0 = time.perf_counter()
+            motor.toplu_tahmin(seriler)
+            t_kuyruk = time.perf_counter() - t0
+            motor.bekle()
+            sureler[isci] = time.perf_counter() - t0
+            t_isabet, sonuc = sure_olc(lambda: motor.toplu_tahmin(seriler), args.tekrar)
+            motor.kapat()
+            if not all(t.guncel for t in sonuc.values()):
+                print("❌ HATA: Arka plan fit'lerinden sonra güncel olmayan tahmin kaldı!")
+                return 1
+            print(f"{len(seriler)} seri, {isci} işçi: kuyruğa alma {t_kuyruk * 1000:.0f} ms, tüm fit'ler "
+                  f"{sureler[isci]:.1f} s, önbellekten okuma {t_isabet * 1000:.1f} ms")
+        if len(sureler) > 1:
+            print(f"Paralel grup fit'leri: x{sureler[1] / sureler[args.isci]:.1f}")
+    print("✅ Tahminler arka planda hesaplanıp özetleriyle önbellekten okundu.")
+    return 0
+
+
+# --- 15. İSTATİSTİK: GÜNLÜK WELFORD GÜNCELLEMESİ vs TÜM GEÇMİŞİN YENİDEN HESABI ---
+def _sentetik_fiyat_log(rng, madde, gun):
+    """Rastgele yürüyüş fiyatlar; %5 eksik hücre, maddelerin %10'u geç başlar."""
+    fiyatlar = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (madde, gun)), axis=1))
+    fiyatlar[rng.random(fiyatlar.shape) < 0.05] = np.nan
+    baslangic = np.where(rng.random(madde) < 0.1, rng.integers(1, gun, madde), 0)
+    fiyatlar[np.arange(gun)[None, :] < baslangic[:, None]] = np.nan
+    fiyatlar[:, 0][np.isnan(fiyatlar).all(axis=1)] = 100.0  # her madde en az bir gün görünsün
+    tarih = pd.date_range("2025-01-01", periods=gun).date
+    k, g = np.nonzero(~np.isnan(fiyatlar))
+    return pd.DataFrame({"Tarih": tarih[g], "Kod": [f"{i:07d}" for i in k], "Madde_Adi": None,
+                         "Fiyat": fiyatlar[k, g], "Kaynak": "Test", "URL": None, "Zaman": "12:00"})
+
+
+def istatistik_olcumu(args):
+    rng = np.random.default_rng(0)
+    df = _sentetik_fiyat_log(rng, args.madde, args.gun)
+    gunler = sorted(df['Tarih'].unique())
+    hata = 0
+    with tempfile.TemporaryDirectory() as d:
+        depo = YerelDepo(d)
+        sure = 0.0
+        for gun in gunler:
+            parca = df[df['Tarih'] == gun]
+            # Her gün iki senkronizasyonda gelir (aynı günün ikinci yazımı üzerine yazar)
+            for yari in (parca.iloc[: len(parca) // 2], parca.iloc[len(parca) // 2:]):
+                fiyatlari_yaz(depo, yari)
+                t0 = time.perf_counter()
+                istatistikleri_guncelle(depo, yari, args.pencere)
+                sure += time.perf_counter() - t0
+        print(f"Günlük güncelleme ({args.madde} madde, {len(gunler)} gün): ortalama "
+              f"{sure / (2 * len(gunler)) * 1000:.1f} ms/senkronizasyon (okuma + Welford + yazma)")
+
+        def tam_hesap():
+            pivot = fiyat_matrisi(df)
+            son_p = pivot[pivot.columns[-args.pencere:]]
+            return pd.DataFrame({"Fark": pivot.iloc[:, -1] / pivot.iloc[:, 0] - 1,
+                                 "Gunluk_Degisim": pivot.iloc[:, -1] / pivot.iloc[:, -2] - 1,
+                                 "Volatilite": pivot.std(axis=1) / pivot.mean(axis=1) * 100,
+                                 "Volatilite_Pencere": son_p.std(axis=1) / son_p.mean(axis=1) * 100})
+
+        durum = durum_oku(depo)
+        t_tam, beklenen = sure_olc(tam_hesap, args.tekrar)
+        t_oku, ist = sure_olc(lambda: istatistikler(durum), args.tekrar)
+        print(f"İstatistik okuma: tüm geçmişten {t_tam * 1000:.1f} ms, durumdan {t_oku * 1000:.2f} ms "
+              f"(x{t_tam / t_oku:.0f})")
+        for c in beklenen.columns:
+            if not np.allclose(ist.loc[beklenen.index, c], beklenen[c], rtol=1e-9, atol=1e-9, equal_nan=True):
+                hata += 1
+                print(f"❌ HATA: {c} tüm geçmişten hesaplananla aynı değil!")
+
+        # Geçmiş bir günün düzeltilmesi durumu baştan kurdurur
+        duzeltme = df[df['Tarih'] == gunler[len(gunler) // 2]].head(5).assign(Fiyat=lambda x: x['Fiyat'] * 1.5)
+        fiyatlari_yaz(depo, duzeltme)
+        df = pd.concat([df[~(df['Tarih'].isin(duzeltme['Tarih']) & df['Kod'].isin(duzeltme['Kod']))], duzeltme])
+        t_kur, _ = sure_olc(lambda: istatistikleri_guncelle(depo, duzeltme, args.pencere), 1)
+        ist = istatistikler(durum_oku(depo))
+        beklenen = tam_hesap()
+        print(f"Geçmiş gün düzeltmesi -> baştan kurma: {t_kur * 1000:.0f} ms")
+        if not np.allclose(ist.loc[beklenen.index, "Volatilite"], beklenen["Volatilite"], rtol=1e-9, equal_nan=True):
+            hata += 1
+            print("❌ HATA: Baştan kurulan durum tüm geçmişten hesaplananla aynı değil!")
+    if hata:
+        return 1
+    print(f"✅ Artımlı istatistikler (Fark, günlük değişim, volatilite, {args.pencere} günlük pencere) aynı.")
+    return 0
+
+
+# --- 16. GRAFİK: TÜM NOKTALAR vs LTTB İNDİRGEMESİ ---
+def _yuk_boyutu(x, y):
+    return len(json.dumps({"x": pd.DatetimeIndex(x).strftime("%Y-%m-%d").tolist(), "y": np.asarray(y).tolist()}))
+
+
+def grafik_olcumu(args):
+    rng = np.random.default_rng(0)
+    x = pd.date_range("2020-01-01", periods=args.gun)
+    y = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.003, args.gun)))
+    xi = x.to_numpy().astype("datetime64[ns]").astype(np.int64)
+    t, sec = sure_olc(lambda: lttb(xi, y, args.hedef), args.tekrar)
+    # Biçim hatası: indirgenmiş eğriden doğrusal aradeğerlenen değerin gerçek değerden en büyük sapması
+    hata = np.abs(np.interp(xi, xi[sec], y[sec]) - y).max() / (y.max() - y.min()) * 100
+    print(f"LTTB ({args.gun} gün -> {len(sec)} nokta): {t * 1000:.1f} ms, en büyük biçim sapması "
+          f"aralığın %{hata:.2f}'i")
+    for gorunum in GORUNUMLER:
+        m = gorunume_kirp(x, gorunum)
+        s = lttb(xi[m], y[m], args.hedef)
+        print(f"  {gorunum}: {m.sum()} -> {len(s)} nokta, yük {_yuk_boyutu(x[m], y[m]) / 1024:.0f} KB -> "
+              f"{_yuk_boyutu(x[m][s], y[m][s]) / 1024:.0f} KB")
+    if len(sec) != min(args.gun, args.hedef) or sec[0] != 0 or sec[-1] != args.gun - 1 or np.any(np.diff(sec) <= 0):
+        print("❌ HATA: LTTB indeksleri sıralı değil ya da uçları içermiyor!")
+        return 1
+
+    try:
+        go = __import__("plotly.graph_objects", fromlist=["Figure"])
+    except ImportError:
+        print("plotly kurulu değil; şekil JSON boyutları atlandı.")
+        return 0
+    ufuk = pd.date_range(x[-1] + pd.Timedelta(days=1), periods=90)
+    yhat = y[-1] * np.exp(np.cumsum(np.full(90, 0.0005)))
+    alt, ust = yhat * 0.98, yhat * 1.02
+
+    def eski():
+        fig = go.Figure([go.Scatter(x=x, y=y, mode='lines+markers'), go.Scatter(x=ufuk, y=yhat, mode='lines'),
+                         go.Scatter(x=ufuk.tolist() + ufuk.tolist()[::-1], y=ust.tolist() + alt.tolist()[::-1],
+                                    fill='toself')])
+        return fig.to_json()
+
+    def yeni():
+        fig = go.Figure([zaman_izi(x, y, hedef=args.hedef, mode='lines+markers'),
+                         zaman_izi(ufuk, yhat, hedef=args.hedef, mode='lines'),
+                         bant_izi(ufuk, alt, ust, hedef=args.hedef)])
+        return fig.to_json()
+
+    t_eski, j_eski = sure_olc(eski, args.tekrar)
+    t_yeni, j_yeni = sure_olc(yeni, args.tekrar)
+    print(f"Ana grafik JSON: tüm noktalar {len(j_eski) / 1024:.0f} KB / {t_eski * 1000:.0f} ms, indirgenmiş "
+          f"{len(j_yeni) / 1024:.0f} KB / {t_yeni * 1000:.0f} ms")
+    print("✅ Uzun seriler biçimi korunarak indirgendi.")
+    return 0
+
+
+# --- 17. DIŞA AKTARIM: openpyxl ExcelWriter vs AKIŞLI xlsxwriter / CSV / PARQUET ---
+def _tepe_bellek(fonk):
+    # Süre ayrı ölçülür: tracemalloc açıkken ayırma yoğun kod birkaç kat yavaşlar
+    t, sonuc = sure_olc(fonk, 1)
+    tracemalloc.start()
+    try:
+        fonk()
+        return t, tracemalloc.get_traced_memory()[1], sonuc
+    finally:
+        tracemalloc.stop()
+
+
+def disa_aktarim_olcumu(args):
+    rng = np.random.default_rng(0)
+    gunler = [str(g.date()) for g in pd.date_range("2025-01-01", periods=args.gun)]
+    df = pd.DataFrame({"Kod": [f"{i:08d}" for i in range(args.madde)],
+                       "Grup": rng.choice(["Gıda", "Giyim", "Ulaşım", "Konut"], args.madde),
+                       "Madde adı": [f"Ürün {i} şğüçöı" for i in range(args.madde)],
+                       **{g: np.round(100 * rng.lognormal(0, 0.3, args.madde), 2) for g in gunler},
+                       "Fark": rng.normal(0, 0.1, args.madde)})
+    df.loc[df.sample(frac=0.05, random_state=0).index, gunler[-1]] = np.nan
+
+    def eski():
+        out = BytesIO()
+        with pd.ExcelWriter(out, engine='openpyxl') as writer: df.to_excel(writer, index=False, sheet_name='Analiz')
+        return out.getvalue()
+
+    print(f"Tablo: {args.madde} satır × {df.shape[1]} sütun")
+    t, tepe, veri = _tepe_bellek(eski)
+    print(f"  openpyxl ExcelWriter: {t * 1000:.0f} ms, tepe bellek {tepe / 2 ** 20:.1f} MB, {len(veri) / 1024:.0f} KB")
+    hata = 0
+    for bicim in BICIMLER:
+        t, tepe, veri = _tepe_bellek(lambda: disa_aktar(df, bicim))
+        print(f"  {BICIMLER[bicim].ad}: {t * 1000:.0f} ms, tepe bellek {tepe / 2 ** 20:.1f} MB, "
+              f"{len(veri) / 1024:.0f} KB")
+        if bicim == "xlsx":
+            geri = pd.read_excel(BytesIO(veri), sheet_name="Analiz", dtype={"Kod": str})
+        elif bicim == "csv":
+            geri = pd.read_csv(BytesIO(veri), encoding="utf-8-sig", dtype={"Kod": str})
+        else:
+            geri = pd.read_parquet(BytesIO(veri))
+        try:
+            pd.testing.assert_frame_equal(geri, df, check_dtype=False, check_exact=False)
+        except AssertionError as e:
+            hata += 1
+            print(f"❌ HATA: {BICIMLER[bicim].ad} geri okununca tabloyla aynı değil: {e}")
+    if hata:
+        return 1
+    print("✅ Tüm biçimler geri okunduğunda aynı tabloyu veriyor.")
+    return 0
+
+
+# --- 18. PİYASA GÖSTERGELERİ: SIRALI İSTEKLER vs STALE-WHILE-REVALIDATE ---
+class _PiyasaSunucusu(ThreadingHTTPServer):
+    """TCMB (/kur), bigpara (/altin) ve EVDS (/evds) sahte uçları; yol başına gecikme ve hata ayarlanır."""
+    daemon_threads = True
+
+    def __init__(self, gecikme):
+        self.gecikme = {"kur": gecikme, "altin": gecikme, "evds": gecikme}
+        self.hatali, self.istekler = set(), Counter()
+        self.usd, self.eur, self.altin = 32.51, 35.07, 2456.75
+        self.kilit = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _PiyasaIsleyici)
+
+    def govde(self, yol):
+        if yol == "kur":
+            return (f'<?xml version="1.0" encoding="UTF-8"?><Tarih_Date>'
+                    f'<Currency CurrencyCode="USD"><BanknoteSelling>{self.usd}</BanknoteSelling></Currency>'
+                    f'<Currency CurrencyCode="EUR"><BanknoteSelling>{self.eur}</BanknoteSelling></Currency>'
+                    f'</Tarih_Date>').encode("utf-8")
+        if yol == "altin":
+            tutar = f"{self.altin:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            return f'<html><body><span class="value">{tutar}</span></body></html>'.encode("utf-8")
+        return json.dumps({"items": [{"Tarih": f"2025-{a}", "TP_FG_J0": str(2500 + 50 * a)}
+                                     for a in range(1, 13)]}).encode("utf-8")
+
+
+class _PiyasaIsleyici(BaseHTTPRequestHandler):
+    def do_GET(self):
+        s = self.server
+        yol = urlsplit(self.path).path.strip("/")
+        with s.kilit:
+            s.istekler[yol] += 1
+        time.sleep(s.gecikme.get(yol, 0))
+        kod, veri = (500, b"") if yol in s.hatali else (200, s.govde(yol))
+        try:
+            self.send_response(kod)
+            self.send_header("Content-Length", str(len(veri)))
+            self.end_headers()
+            self.wfile.write(veri)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # İstemci zaman aşımıyla bağlantıyı kapattı
+
+    def log_message(self, *args):
+        pass
+
+
+def piyasa_olcumu(args):
+    sunucu = _PiyasaSunucusu(args.gecikme)
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    adres = f"http://127.0.0.1:{sunucu.server_address[1]}"
+    kaynaklar = piyasa_kaynaklari("sahte", f"{adres}/kur", f"{adres}/altin",
+                                  f"{adres}/evds?startDate={{bas}}&endDate={{bit}}&key={{anahtar}}")
+    print(f"Yerel sunucu: {adres}, istek başına {args.gecikme * 1000:.0f} ms gecikme")
+
+    # Eski davranış: önbellek süresi dolunca ilk kullanıcı kaynakları sırayla bekler
+    t, _ = sure_olc(lambda: [requests.get(f"{adres}/{yol}", timeout=args.zaman_asimi)
+                             for yol in ("kur", "altin", "evds")], 1)
+    print(f"Sıralı istekler (eski): sayfa {t * 1000:.0f} ms bekler")
+
+    hata = []
+    beklenen = {"kur": {"USD": sunucu.usd, "EUR": sunucu.eur}, "altin": {"GA": sunucu.altin}}
+    with tempfile.TemporaryDirectory() as d:
+        dosya = os.path.join(d, "piyasa.sqlite")
+        servis = PiyasaServisi(kaynaklar, dosya, zaman_asimi=args.zaman_asimi)
+        t_soguk, g = sure_olc(servis.hepsi, 1)
+        t0 = time.perf_counter()
+        servis.bekle()
+        t_arka = time.perf_counter() - t0 + t_soguk
+        g = servis.hepsi()
+        print(f"Soğuk açılış: hepsi() {t_soguk * 1000:.1f} ms, {len(kaynaklar)} kaynak arka planda "
+              f"{t_arka * 1000:.0f} ms'de (eşzamanlı)")
+        if any(g[ad].deger != v for ad, v in beklenen.items()) or len(g["evds"].deger) != 12:
+            hata.append("Arka planda alınan değerler sunulanlarla aynı değil")
+
+        istek = sum(sunucu.istekler.values())
+        t_taze, _ = sure_olc(servis.hepsi, args.tekrar)
+        servis.kapat()
+        servis = PiyasaServisi(kaynaklar, dosya, zaman_asimi=args.zaman_asimi)
+        t_yeniden, g = sure_olc(servis.hepsi, 1)
+        print(f"Taze değer: hepsi() {t_taze * 1000:.2f} ms; yeniden başlatma: {t_yeniden * 1000:.1f} ms, "
+              f"yaş {servis.yas('kur'):.1f} sn")
+        if sum(sunucu.istekler.values()) != istek or g["kur"].deger != beklenen["kur"]:
+            hata.append("Taze ya da diskteki değer için yeniden istek yapıldı")
+
+        # Kaynak hata verirken ya da zaman aşımına uğrarken son iyi değer sunulmaya devam eder
+        sunucu.hatali.add("kur")
+        sunucu.gecikme["altin"] = args.zaman_asimi * 2
+        servis.yenile(zorla=True)
+        t_bayat, g = sure_olc(servis.hepsi, 1)
+        servis.bekle()
+        g = servis.hepsi()
+        print(f"Kaynaklar düşükken: hepsi() {t_bayat * 1000:.1f} ms; kur hatası: {g['kur'].hata}; "
+              f"altın hatası: {(g['altin'].hata or '')[:40]}")
+        if any(g[ad].deger != v or not g[ad].hata for ad, v in beklenen.items()):
+            hata.append("Hata/zaman aşımında son iyi değer korunmadı")
+        if servis.yenile():
+            hata.append("Başarısız kaynak HATA_BEKLEME dolmadan yeniden istendi")
+
+        # Kaynak düzelince yeni değer gelir, hata temizlenir
+        sunucu.hatali.clear()
+        sunucu.gecikme["altin"] = args.gecikme
+        sunucu.usd += 0.25
+        servis.yenile(zorla=True)
+        servis.bekle()
+        g = servis.hepsi()
+        if g["kur"].deger["USD"] != sunucu.usd or g["kur"].hata or g["altin"].hata:
+            hata.append("Kaynak düzeldikten sonra değer yenilenmedi")
+        servis.kapat()
+    sunucu.shutdown()
+    for h in hata:
+        print(f"❌ HATA: {h}!")
+    if hata:
+        return 1
+    print("✅ Göstergeler beklemeden sunuldu; son iyi değer hata, zaman aşımı ve yeniden başlatmada korundu.")
+    return 0
+
+
+# --- 19. VERİ KATMANI: EŞZAMANLI OTURUMLAR, ANAHTAR BAŞINA TEK HESAP ---
+class _GecikmeliRepo:
+    """GitHub isteklerine gecikme ekleyen bellek içi sahte repo (dal başı, ağaç, blob)."""
+
+    def __init__(self, dosyalar, gecikme):
+        self.dosyalar, self.gecikme, self.istekler = dosyalar, gecikme, Counter()
+        self.kilit = threading.Lock()
+
+    def _bekle(self, tur):
+        with self.kilit:
+            self.istekler[tur] += 1
+        time.sleep(self.gecikme)
+
+    def get_branch(self, dal):
+        self._bekle("dal")
+        return SimpleNamespace(commit=SimpleNamespace(sha="bas"))
+
+    def get_git_tree(self, sha, recursive=False):
+        self._bekle("agac")
+        return SimpleNamespace(tree=[SimpleNamespace(path=y, sha=hashlib.sha1(v).hexdigest(), type="blob")
+                                     for y, v in self.dosyalar.items()])
+
+    def get_git_blob(self, sha):
+        self._bekle("blob")
+        veri = next(v for v in self.dosyalar.values() if hashlib.sha1(v).hexdigest() == sha)
+        return SimpleNamespace(content=base64.b64encode(veri).decode("ascii"))
+
+
+def _es_zamanli(fonklar):
+    sonuclar = [None] * len(fonklar)
+    isler = [threading.Thread(target=lambda i=i, f=f: sonuclar.__setitem__(i, f())) for i, f in enumerate(fonklar)]
+    t0 = time.perf_counter()
+    for t in isler: t.start()
+    for t in isler: t.join()
+    return time.perf_counter() - t0, sonuclar
+
+
+def katman_olcumu(args):
+    repo = _GecikmeliRepo({f"Dizin/d{i}.bin": os.urandom(64) for i in range(args.oturum)}, args.gecikme)
+    katman = OnbellekliDepo(repo, "main", yenileme_saniye=3600)
+    hata = []
+
+    t, _ = _es_zamanli([lambda: katman.oku("Dizin/d0.bin")] * args.oturum)
+    print(f"{args.oturum} oturum aynı dosyayı soğuk okudu: {t * 1000:.0f} ms, istekler {dict(repo.istekler)}")
+    if repo.istekler["dal"] != 1 or repo.istekler["agac"] != 1 or repo.istekler["blob"] != 1:
+        hata.append("Aynı dal/ağaç/blob birden çok kez istendi")
+
+    hesaplar = Counter()
+
+    def yavas(anahtar):
+        hesaplar[anahtar] += 1
+        time.sleep(args.hesap)
+        return anahtar
+
+    t, _ = _es_zamanli([lambda i=i: katman.turet(("farkli", i), 1, lambda: yavas(i)) for i in range(args.oturum)])
+    print(f"{args.oturum} farklı anahtar eşzamanlı türetildi: {t * 1000:.0f} ms "
+          f"(tek hesap {args.hesap * 1000:.0f} ms; ortak kilitte {args.oturum * args.hesap * 1000:.0f} ms olurdu)")
+    if t > args.hesap * max(2, args.oturum / 2):
+        hata.append("Farklı anahtarların hesapları birbirini bekledi")
+
+    t, sonuc = _es_zamanli([lambda: katman.turet(("ayni",), 1, lambda: yavas("ayni"))] * args.oturum)
+    print(f"{args.oturum} oturum aynı anahtarı istedi: {t * 1000:.0f} ms, hesap sayısı {hesaplar['ayni']}")
+    if hesaplar["ayni"] != 1 or set(sonuc) != {"ayni"}:
+        hata.append("Aynı anahtar birden çok kez hesaplandı")
+
+    # Uzun bir hesap sürerken önbellekteki değerler beklemeden okunur
+    arka = threading.Thread(target=lambda: katman.turet(("uzun",), 1, lambda: yavas("uzun")))
+    arka.start()
+    time.sleep(args.hesap / 10)
+    t, _ = sure_olc(lambda: (katman.turet(("ayni",), 1, lambda: yavas("ayni")), katman.oku("Dizin/d0.bin")), 1)
+    arka.join()
+    print(f"Uzun hesap sürerken önbellek okuması: {t * 1000:.2f} ms")
+    if t > args.hesap / 2:
+        hata.append("Önbellek okuması süren bir hesabı bekledi")
+
+    for h in hata:
+        print(f"❌ HATA: {h}!")
+    if hata:
+        return 1
+    print("✅ Hesaplar ve ağ çağrıları ortak kilidin dışında, anahtar başına bir kez çalıştı.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enflasyon Monitörü performans ölçümleri")
+    alt = parser.add_subparsers(dest="olcum", required=True)
+
+    p = alt.add_parser("ayristirma", help="Bolum_*.zip arşivlerinde seri/paralel HTML ayrıştırma süresi")
+    p.add_argument("--isci", type=int, default=VARSAYILAN_ISCI_SAYISI)
+    p.add_argument("--tekrar", type=int, default=1)
+    p.add_argument("--ayristirici", choices=AYRISTIRICILAR, default=VARSAYILAN_AYRISTIRICI)
+    p.add_argument("--onbellek", help="Soğuk/sıcak önbellek ölçümü için SQLite dosya yolu (silinir)")
+    p.set_defaults(fonk=ayristirma_olcumu)
+
+    p = alt.add_parser("karsilastir", help="bs4 ve lxml ayrıştırıcılarının her HTML için aynı sonucu verdiğini doğrular")
+    p.set_defaults(fonk=ayristirici_karsilastir)
+
+    p = alt.add_parser("arsiv", help="Değişmeyen arşivlerin (aynı git SHA) indirilmeden işlendiğini gösterir")
+    p.set_defaults(fonk=arsiv_takibi_olcumu)
+
+    p = alt.add_parser("bellek", help="Eski ve akışlı arşiv okumanın tepe bellek (RSS) kullanımı")
+    p.add_argument("--zip", default="Bolum_9.zip")
+    p.add_argument("--yontem", choices=("eski", "yeni"))
+    p.add_argument("--isci", type=int, default=VARSAYILAN_ISCI_SAYISI)
+    p.add_argument("--ayristirici", choices=AYRISTIRICILAR, default=VARSAYILAN_AYRISTIRICI)
+    p.set_defaults(fonk=bellek_olcumu)
+
+    p = alt.add_parser("endeks", help="Gün gün pandas ile maskeli NumPy endeks hesabının süresi")
+    p.add_argument("--madde", type=int, default=1000)
+    p.add_argument("--gun", type=int, default=1000)
+    p.add_argument("--tekrar", type=int, default=5)
+    p.set_defaults(fonk=endeks_olcumu)
+
+    p = alt.add_parser("tarama", help="Eşzamanlı tarayıcıyı arşiv HTML'lerini sunan yerel HTTP sunucusuna karşı dener")
+    p.add_argument("--sekme", type=int, default=tarama_motoru.VARSAYILAN_SEKME)
+    p.add_argument("--gecikme", type=float, default=0.2, help="Sunucunun istek başına yapay gecikmesi (sn)")
+    p.add_argument("--aralik-carpani", type=float, default=0.02, help="Alan hız sınırlarının ölçeği")
+    p.set_defaults(fonk=tarama_olcumu)
+
+    p = alt.add_parser("gunluk", help="Tarama günlüğünün devam/geri çekilme davranışını sahte getiriciyle dener")
+    p.add_argument("--hata-orani", type=int, default=7, help="Her kaç URL'den birinin hata vereceği (yaklaşık)")
+    p.set_defaults(fonk=gunluk_olcumu)
+
+    p = alt.add_parser("gunluk-arsiv", help="Günlük arşiv yazıcısı + manifestle içe alımın eski akışla aynı olduğunu dener")
+    p.add_argument("--parca-mb", type=float, default=2.0, help="Küçük parça boyutu (birden çok parça denensin diye)")
+    p.add_argument("--kirp", action="store_true", help="Sayfaları kırpılmış olarak yazar")
+    p.set_defaults(fonk=gunluk_arsiv_olcumu)
+
+    p = alt.add_parser("kirpma", help="Kırpılmış sayfaların tam sayfayla aynı fiyatı verdiğini doğrular; boyut/süre kazancı")
+    p.add_argument("--zip", default=ZIP_DESENI, help="Tam sayfa içeren arşivler (glob)")
+    p.set_defaults(fonk=kirpma_olcumu)
+
+    p = alt.add_parser("kurallar", help="Derlenmiş site kurallarının değerlendirme süresi (ayrıştırma hariç)")
+    p.add_argument("--tekrar", type=int, default=5)
+    p.add_argument("--bs4-sayfa", type=int, default=60, help="bs4 ölçümünde kullanılacak sayfa sayısı")
+    p.set_defaults(fonk=kural_olcumu)
+
+    p = alt.add_parser("cozucu", help="Fiyat çözücüsünün rastgele derlemle doğrulanması ve mikro ölçümü")
+    p.add_argument("--ornek", type=int, default=20000)
+    p.add_argument("--tohum", type=int, default=0)
+    p.add_argument("--tekrar", type=int, default=15)
+    p.add_argument("--sayfa", type=int, default=10, help="Arşiv başına metin ölçümünde kullanılacak sayfa")
+    p.set_defaults(fonk=cozucu_olcumu)
+
+    p = alt.add_parser("sepet", help="Tipli sepet katmanı ile eski satır satır sepet hazırlığının süresi ve eşitliği")
+    p.add_argument("--tekrar", type=int, default=5)
+    p.add_argument("--kat", type=int, default=20, help="Fiyat geçmişinin kaç kez çoğaltılacağı")
+    p.set_defaults(fonk=sepet_olcumu)
+
+    p = alt.add_parser("acilis", help="Uygulama çekirdeğinin ve her isteğe bağlı alt sistemin soğuk içe aktarma süresi")
+    p.add_argument("--tekrar", type=int, default=3, help="Her ölçüm kaç ayrı süreçte tekrarlanacak (en iyisi alınır)")
+    p.set_defaults(fonk=acilis_olcumu_yazdir)
+
+    p = alt.add_parser("tahmin", help="Prophet soğuk/ılık fit süresi, önbellek isabeti ve paralel grup fit'leri")
+    p.add_argument("--gun", type=int, default=120)
+    p.add_argument("--grup", type=int, default=12)
+    p.add_argument("--isci", type=int, default=VARSAYILAN_ISCI_SAYISI)
+    p.add_argument("--tekrar", type=int, default=3)
+    p.set_defaults(fonk=tahmin_olcumu)
+
+    p = alt.add_parser("istatistik", help="Madde istatistiklerinin günlük artımlı güncellemesi ile tam hesabın eşitliği")
+    p.add_argument("--madde", type=int, default=500)
+    p.add_argument("--gun", type=int, default=120)
+    p.add_argument("--pencere", type=int, default=PENCERE_GUN)
+    p.add_argument("--tekrar", type=int, default=3)
+    p.set_defaults(fonk=istatistik_olcumu)
+
+    p = alt.add_parser("grafik", help="Uzun zaman serilerinde LTTB indirgemesinin yük boyutu ve biçim sapması")
+    p.add_argument("--gun", type=int, default=5 * 365)
+    p.add_argument("--hedef", type=int, default=HEDEF_NOKTA)
+    p.add_argument("--tekrar", type=int, default=3)
+    p.set_defaults(fonk=grafik_olcumu)
+
+    p = alt.add_parser("disa_aktarim", help="LİSTE raporunun Excel/CSV/Parquet üretim süresi, tepe belleği ve doğruluğu")
+    p.add_argument("--madde", type=int, default=20_000)
+    p.add_argument("--gun", type=int, default=30)
+    p.set_defaults(fonk=disa_aktarim_olcumu)
+
+    p = alt.add_parser("piyasa", help="Piyasa göstergelerinin sahte TCMB/bigpara/EVDS uçlarına karşı SWR davranışı")
+    p.add_argument("--gecikme", type=float, default=0.5)
+    p.add_argument("--zaman-asimi", type=float, default=1.0)
+    p.add_argument("--tekrar", type=int, default=5)
+    p.set_defaults(fonk=piyasa_olcumu)
+
+    p = alt.add_parser("katman", help="Veri katmanında eşzamanlı oturumların birbirini beklemediğini doğrular")
+    p.add_argument("--oturum", type=int, default=8)
+    p.add_argument("--gecikme", type=float, default=0.1)
+    p.add_argument("--hesap", type=float, default=0.3)
+    p.set_defaults(fonk=katman_olcumu)
+
+    args = parser.parse_args()
+    return args.fonk(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,26 +1,16 @@
 import os
-import time
 import math
-import random
-from DrissionPage import ChromiumPage, ChromiumOptions
+import argparse
+from tarama_motoru import TarayiciGetirici, HttpGetirici, KarmaGetirici, KosulluOnbellek, TaramaGunlugu, \
+    GunlukArsivYazici, eskiyenleri_temizle, tarama_isleri, taramayi_calistir, VARSAYILAN_SEKME, TAZELIK_SAAT, \
+    ARSIV_DIZINI, PARCA_BAYT, TAM_ORNEK_ORANI
 
 # --- AYARLAR ---
+# Sayfalar varsayılan olarak doğrudan Ziplenmis_Dosyalar/ altındaki günlük arşivlere (Bolum_<gün>_<n>.zip
+# + manifest) yazılır; zipyap.py adımı gerekmez. --klasor ile eski düz HTML klasörleri kullanılır.
 ana_klasor = "html_dosyalari"
 BOLUM_SAYISI = 10
 
-# --- AÇIK CHROME'A BAĞLANMA ---
-co = ChromiumOptions()
-co.set_address('127.0.0.1:9222')
-
-try:
-    # Tarayıcı nesnesi (Bu ana yönetici)
-    browser = ChromiumPage(co)
-    print("✅ Açık olan Chrome'a bağlandım!")
-except Exception as e:
-    print("❌ HATA: Chrome portu bulunamadı.")
-    print("Lütfen önce siyah ekranı kapatıp 'chrome_ac.py' dosyasını yeniden çalıştırın.")
-    exit()
-
 
 def klasorleri_hazirla():
     if not os.path.exists(ana_klasor):
@@ -31,115 +21,104 @@ def klasorleri_hazirla():
             os.makedirs(yol)
 
 
-def islem_yap():
+def islem_yap(sekme_sayisi=VARSAYILAN_SEKME, yalniz_tarayici=False, tazelik_saat=TAZELIK_SAAT, sifirla=False,
+              klasor_modu=False, parca_bayt=PARCA_BAYT, kirp=False, tam_ornek_orani=TAM_ORNEK_ORANI):
     if not os.path.exists("urller.txt"):
         print("urller.txt yok!")
         return
 
-    with open("urller.txt", "r", encoding="utf-8") as f:
-        lines = [l.strip() for l in f.readlines() if l.strip()]
-
-    toplam_link = len(lines)
+    isler = tarama_isleri("urller.txt")
+    toplam_link = len(isler)
     bolum_limiti = math.ceil(toplam_link / BOLUM_SAYISI)
 
-    print(f"Toplam {toplam_link} link var.")
-    print(f"Sistem: YENİ SEKME TAKTİĞİ (Cloudflare'i Kandırma Modu)")
-    print("-" * 50)
-
-    klasorleri_hazirla()
-
-    for index, line in enumerate(lines):
-        parts = line.split()
-        if len(parts) < 2: continue
+    def yol_bul(is_):
+        # Klasör Hesabı
+        mevcut_bolum = min(is_.sira // bolum_limiti + 1, BOLUM_SAYISI)
+        return os.path.join(ana_klasor, f"Bolum_{mevcut_bolum}", f"{is_.kod}.html")
+
+    # --- KALDIĞI YERDEN DEVAM ---
+    gunluk = TaramaGunlugu()
+    if sifirla: gunluk.sifirla()
+    if klasor_modu and (taninan := gunluk.diskten_tani(isler, yol_bul)):
+        print(f"📂 Diskte zaten bulunan {taninan} sayfa günlüğe işlendi.")
+    isler, atlanan = gunluk.bekleyenler(isler, tazelik_saat)
+    if atlanan:
+        print(f"⏭️ Atlanan: {atlanan['taze']} taze (son {tazelik_saat} saat), "
+              f"{atlanan['geri_cekilme']} geri çekilmede, {atlanan['vazgecildi']} çok kez başarısız.")
+    if not isler:
+        print("✅ Yapılacak iş yok.")
+        gunluk.kapat()
+        return
 
-        kod = parts[0]
-        url = parts[-1]
+    # --- AÇIK CHROME'A BAĞLANMA ---
+    # Hızlı modda (varsayılan) statik sayfalar tarayıcısız alınır; Chrome yoksa yalnızca onlar indirilir.
+    try:
+        tarayici = TarayiciGetirici()
+        print("✅ Açık olan Chrome'a bağlandım!")
+    except Exception as e:
+        print("❌ HATA: Chrome portu bulunamadı.")
+        print("Lütfen önce siyah ekranı kapatıp 'chrome_ac.py' dosyasını yeniden çalıştırın.")
+        if yalniz_tarayici: gunluk.kapat(); return
+        tarayici = None
+    onbellek = None
+    if yalniz_tarayici:
+        getirici = tarayici
+    else:
+        onbellek = KosulluOnbellek()
+
+        def tarayici_kur():
+            if tarayici is None: raise RuntimeError("Chrome bağlı değil")
+            return tarayici
+
+        getirici = KarmaGetirici(HttpGetirici(onbellek), tarayici_kur)
+
+    print(f"Toplam {toplam_link} link var, {len(isler)} tanesi indirilecek.")
+    print(f"Sistem: YENİ SEKME TAKTİĞİ, {sekme_sayisi} paralel sekme (alan başına sınırlı)")
+    print("-" * 50)
 
-        # Klasör Hesabı
-        mevcut_bolum = (index // bolum_limiti) + 1
-        if mevcut_bolum > BOLUM_SAYISI: mevcut_bolum = BOLUM_SAYISI
-        hedef_klasor = os.path.join(ana_klasor, f"Bolum_{mevcut_bolum}")
-        klasor_adi = f"Bölüm {mevcut_bolum}"
-
-        cimri_modu = "cimri" in url
-
-        try:
-            if cimri_modu:
-                print(f"[{index + 1}/{toplam_link}] [{klasor_adi}] 🛡️ [CİMRİ] {kod}")
-            else:
-                print(f"[{index + 1}/{toplam_link}] [{klasor_adi}] 🚀 [HIZLI] {kod}")
-
-            # --- KRİTİK DEĞİŞİKLİK: YENİ SEKME AÇ ---
-            # Mevcut sayfayı değiştirmek yerine yeni sekme açıyoruz.
-            # Bu, Cloudflare'in "Navigasyon geçmişi" takibini bozar.
-            tab = browser.new_tab(url)
-
-            page_loaded = False
-
-            # --- SENARYO 1: CİMRİ ---
-            if cimri_modu:
-                start_wait = time.time()
-                timeout = 40
-
-                while time.time() - start_wait < timeout:
-                    # Cloudflare varsa
-                    if "Just a moment" in tab.title or "Cloudflare" in tab.title:
-                        print(f"\r      ⚠️ Cloudflare ekranı! (Otomatik geçmezse elle tıklayın)", end="")
-                        time.sleep(1)
-                        continue
-
-                    # Fiyat kutusu geldi mi?
-                    if tab.ele(".rTdMX") or tab.ele(".offer-price") or tab.ele(".fe-product-price"):
-                        print("\n      ✅ Fiyat bulundu.")
-                        page_loaded = True
-                        break
-
-                    # HTML dolu mu?
-                    if len(tab.html) > 20000 and "Just a moment" not in tab.title:
-                        print("\n      ✅ Sayfa yüklendi.")
-                        page_loaded = True
-                        break
-                    time.sleep(1)
-
-                if page_loaded:
-                    # Cimri'de insan gibi biraz rastgele bekle
-                    tab.scroll.to_bottom()
-                    time.sleep(random.uniform(1.5, 2.5))
-
-                    # --- SENARYO 2: HIZLI MOD ---
-            else:
-                tab.scroll.to_bottom()
-                time.sleep(1)
-                page_loaded = True
-
-            # --- KAYDET ---
-            if page_loaded:
-                save_path = os.path.join(hedef_klasor, f"{kod}.html")
-                with open(save_path, "w", encoding="utf-8") as f:
-                    f.write(tab.html)
-                print(f"      💾 KAYDEDİLDİ")
-            else:
-                if cimri_modu:
-                    save_path = os.path.join(hedef_klasor, f"{kod}.html")
-                    with open(save_path, "w", encoding="utf-8") as f:
-                        f.write(tab.html)
-                    print(f"      ⚠️ Zaman aşımı (Mevcut hali alındı)")
-                else:
-                    print(f"      ❌ HATA: Yüklenemedi")
-
-            # --- İŞ BİTİNCE SEKMEYİ KAPAT (RAM TEMİZLİĞİ) ---
-            tab.close()
-
-        except Exception as e:
-            print(f"      ❌ HATA: {e}")
-            # Hata durumunda da sekmeyi kapatmaya çalış
-            try:
-                tab.close()
-            except:
-                pass
-
-    print("\n🏁 İşlem tamamlandı.")
+    if klasor_modu:
+        klasorleri_hazirla()
+
+        def kaydet(is_, sayfa):
+            with open(yol_bul(is_), "w", encoding="utf-8") as f:
+                f.write(sayfa.html)
+    else:
+        yazici = GunlukArsivYazici(ARSIV_DIZINI, parca_bayt=parca_bayt, kirp=kirp, tam_ornek_orani=tam_ornek_orani)
+        kaydet = yazici.yaz
+        print(f"🗜️ Sayfalar {ARSIV_DIZINI}/Bolum_{yazici.gun}_*.zip arşivlerine yazılıyor"
+              f"{' (yalnızca fiyat parçaları)' if kirp else ''}.")
+
+    try:
+        sonuc = taramayi_calistir(isler, getirici, kaydet, sekme_sayisi, gunluk=gunluk)
+    finally:
+        if onbellek: onbellek.kapat()
+        gunluk.kapat()
+    print(f"\n🏁 İşlem tamamlandı. 💾 {sonuc['tamam'] + sonuc['hizli']} kaydedildi ({sonuc['hizli']} tarayıcısız), "
+          f"⚠️ {sonuc['zaman_asimi']} zaman aşımı (mevcut hali alındı), ❌ {sonuc['hata']} hata.")
+    if not klasor_modu and (silinen := eskiyenleri_temizle(ARSIV_DIZINI)):
+        print(f"🗑️ Kod'ları bugün yeniden alınan {len(silinen)} eski günlük dosya silindi.")
+    if kirp and not klasor_modu:
+        print(f"✂️ {yazici.sayac['kirpik']} sayfa kırpıldı, {yazici.sayac['tam']} sayfa tam saklandı "
+              f"(fiyat çıkmayan ya da örneklenen).")
+    if not yalniz_tarayici:
+        print(f"⚡ Hızlı mod: {getirici.http.sayac['degismedi']} sayfa değişmemiş (304), "
+              f"{getirici.sayac['yedek']} sayfa tarayıcıya düştü.")
 
 
 if __name__ == "__main__":
-    islem_yap()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="urller.txt sayfalarını açık Chrome ile indirir")
+    parser.add_argument("--sekme", type=int, default=VARSAYILAN_SEKME, help="Aynı anda açık sekme sayısı")
+    parser.add_argument("--yalniz-tarayici", action="store_true", help="Hızlı (tarayıcısız) modu kapatır")
+    parser.add_argument("--tazelik-saat", type=float, default=TAZELIK_SAAT,
+                        help="Bu kadar saat içinde alınmış sayfalar atlanır (0: hepsini yeniden al)")
+    parser.add_argument("--sifirla", action="store_true", help="Tarama günlüğünü temizleyip baştan başlar")
+    parser.add_argument("--klasor", action="store_true",
+                        help=f"Günlük arşiv yerine {ana_klasor}/Bolum_N/ altına düz HTML yazar (zipyap.py ile)")
+    parser.add_argument("--parca-mb", type=float, default=PARCA_BAYT / 2 ** 20, help="Arşiv parçası boyutu (MB)")
+    parser.add_argument("--kirp", action="store_true",
+                        help="Sayfaların yalnızca kanonik etiketlerini ve fiyat alanlarını saklar")
+    parser.add_argument("--tam-ornek", type=int, default=TAM_ORNEK_ORANI,
+                        help="Kırpma modunda kaç günde bir tam sayfa da saklansın (0: hiç)")
+    args = parser.parse_args()
+    islem_yap(args.sekme, args.yalniz_tarayici, args.tazelik_saat, args.sifirla, args.klasor,
+              int(args.parca_mb * 2 ** 20), args.kirp, args.tam_ornek)
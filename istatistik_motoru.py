@@ -0,0 +1,160 @@
+import json
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fiyat_deposu import FIYAT_DIZINI, fiyatlari_oku
+from sepet_katmani import kodlari_standartlastir
+
+# --- AYARLAR ---
+# Madde (Kod) bazlı fiyat istatistikleri her gün yalnızca o günün fiyatlarıyla güncellenir; geçmişin
+# tamamı yeniden taranmaz. Durum fiyat deposunun yanında (Fiyat_Log/istatistik.parquet) saklanır.
+# Eksik günler önceki fiyatla, yeni maddenin geçmiş günleri ilk fiyatıyla doldurulmuş sayılır
+# (endeks_motoru.fiyat_matrisi'nin ffill/bfill tanımıyla aynı).
+ISTATISTIK_DOSYASI = f"{FIYAT_DIZINI}/istatistik.parquet"
+PENCERE_GUN = 30  # Kayan volatilite penceresi
+META_ANAHTARI = b"istatistik_meta"
+ISTATISTIK_SUTUNLARI = ["Fark", "Fark_Yuzde", "Gunluk_Degisim", "Volatilite", "Volatilite_Pencere"]
+
+# kodlar: (madde,) Kod, n/ortalama/m2: son gün HARİÇ Welford momentleri, ilk: baz gün fiyatı,
+# pencere: (madde × PENCERE_GUN) son günlerin fiyatları (son sütun = son gün), baz/son: gün (YYYY-AA-GG),
+# gun_sayisi: toplam gün
+IstatistikDurumu = namedtuple("IstatistikDurumu", "kodlar n ortalama m2 ilk pencere baz son gun_sayisi")
+
+
+class GecmisGunHatasi(ValueError):
+    """Son günden önceki bir gün güncellendi; durum baştan kurulmalı."""
+
+
+def bos_durum(pencere_gun=PENCERE_GUN):
+    bos = np.empty(0)
+    return IstatistikDurumu(np.empty(0, dtype=object), np.empty(0, dtype=np.int64), bos, bos, bos,
+                            np.empty((0, pencere_gun)), None, None, 0)
+
+
+def _welford(n, ortalama, m2, x):
+    n = n + 1
+    fark = x - ortalama
+    ortalama = ortalama + fark / n
+    return n, ortalama, m2 + fark * (x - ortalama)
+
+
+# --- GÜNCELLEME ---
+def gun_ekle(durum, gun, kodlar, fiyatlar):
+    """Bir günün (Kod, Fiyat) çiftlerini duruma ekler -> yeni durum. Maliyet madde sayısıyla orantılıdır.
+
+    Aynı gün tekrar verilirse fiyatlar o günün üzerine yazılır (aynı gün ikinci senkronizasyon).
+    Son günden eski bir gün GecmisGunHatasi yükseltir.
+    """
+    if durum.son is not None and gun < durum.son: raise GecmisGunHatasi(gun)
+    mevcut, n, ortalama, m2, ilk, pencere = (durum.kodlar, durum.n, durum.ortalama, durum.m2, durum.ilk,
+                                             durum.pencere)
+    gun_sayisi = durum.gun_sayisi
+    if durum.son is None or gun > durum.son:
+        if gun_sayisi:
+            # Önceki son gün momentlere katılır; yeni gün önceki fiyatla başlar (ffill)
+            n, ortalama, m2 = _welford(n, ortalama, m2, pencere[:, -1])
+            pencere = np.concatenate([pencere[:, 1:], pencere[:, -1:]], axis=1)
+        gun_sayisi += 1
+
+    gunluk = pd.Series(np.asarray(fiyatlar, dtype=np.float64), index=np.asarray(kodlar, dtype=object))
+    gunluk = gunluk[gunluk > 0]
+    gunluk = gunluk[~gunluk.index.duplicated(keep='last')]
+    sira = pd.Index(mevcut).get_indexer(gunluk.index)
+    eski = sira >= 0
+    pencere = pencere.copy()
+    pencere[sira[eski], -1] = gunluk.to_numpy()[eski]
+    if (~eski).any():
+        # Yeni madde: geçmiş günleri ilk fiyatıyla doldurulmuş sayılır (bfill)
+        p = gunluk.to_numpy()[~eski]
+        yeni_pencere = np.full((len(p), pencere.shape[1]), np.nan)
+        yeni_pencere[:, pencere.shape[1] - min(gun_sayisi, pencere.shape[1]):] = p[:, None]
+        mevcut = np.concatenate([mevcut, gunluk.index.to_numpy(dtype=object)[~eski]])
+        n = np.concatenate([n, np.full(len(p), gun_sayisi - 1, dtype=np.int64)])
+        ortalama = np.concatenate([ortalama, p])
+        m2 = np.concatenate([m2, np.zeros(len(p))])
+        ilk = np.concatenate([ilk, p])
+        pencere = np.concatenate([pencere, yeni_pencere])
+    return IstatistikDurumu(mevcut, n, ortalama, m2, ilk, pencere, durum.baz or gun, gun, gun_sayisi)
+
+
+def gunluk_fiyatlar(df):
+    """Fiyat tablosu -> [(gün, Kod dizisi, Fiyat dizisi)] gün sırasıyla; geçersiz satırlar atılır."""
+    df = pd.DataFrame({"Tarih": pd.to_datetime(df['Tarih'], errors='coerce'), "Kod": kodlari_standartlastir(df['Kod']),
+                       "Fiyat": pd.to_numeric(df['Fiyat'], errors='coerce')}).dropna(subset=['Tarih'])
+    df = df[df['Fiyat'] > 0].sort_values('Tarih', kind='stable')
+    return [(g, p['Kod'].to_numpy(dtype=object), p['Fiyat'].to_numpy())
+            for g, p in df.groupby(df['Tarih'].dt.strftime('%Y-%m-%d'), sort=True)]
+
+
+def durum_kur(df_f, pencere_gun=PENCERE_GUN):
+    """Tüm fiyat geçmişinden durumu baştan kurar (yalnızca geçmiş bir gün değiştiğinde gerekir)."""
+    durum = bos_durum(pencere_gun)
+    for gun, kodlar, fiyatlar in gunluk_fiyatlar(df_f):
+        durum = gun_ekle(durum, gun, kodlar, fiyatlar)
+    return durum
+
+
+# --- OKUMA ---
+def istatistikler(durum):
+    """Kod indeksli ISTATISTIK_SUTUNLARI tablosu; maliyet madde sayısıyla orantılıdır (gün sayısından bağımsız)."""
+    son = durum.pencere[:, -1] if len(durum.kodlar) else np.empty(0)
+    n, ortalama, m2 = _welford(durum.n, durum.ortalama, durum.m2, son)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fark = son / durum.ilk - 1
+        gunluk = son / durum.pencere[:, -2] - 1 if durum.gun_sayisi >= 2 else np.zeros(len(son))
+        volatilite = np.sqrt(m2 / (n - 1)) / ortalama * 100
+        sayi = (~np.isnan(durum.pencere)).sum(axis=1)
+        p_ort = np.nanmean(durum.pencere, axis=1) if len(son) else np.empty(0)
+        p_var = np.nansum((durum.pencere - p_ort[:, None]) ** 2, axis=1) / (sayi - 1)
+        volatilite_p = np.sqrt(p_var) / p_ort * 100
+    return pd.DataFrame({"Fark": fark, "Fark_Yuzde": fark * 100, "Gunluk_Degisim": gunluk,
+                         "Volatilite": volatilite, "Volatilite_Pencere": volatilite_p},
+                        index=pd.Index(durum.kodlar, name="Kod"))
+
+
+# --- KALICILIK ---
+def durum_yaz(depo, durum, mesaj="Stats Update"):
+    pencere = {f"p{i}": durum.pencere[:, i] for i in range(durum.pencere.shape[1])}
+    tablo = pa.Table.from_pandas(pd.DataFrame({"Kod": pd.Series(durum.kodlar, dtype=object), "n": durum.n,
+                                               "ortalama": durum.ortalama, "m2": durum.m2, "ilk": durum.ilk,
+                                               **pencere}), preserve_index=False)
+    meta = {"baz": durum.baz, "son": durum.son, "gun_sayisi": durum.gun_sayisi, "pencere": durum.pencere.shape[1]}
+    tablo = tablo.replace_schema_metadata({**(tablo.schema.metadata or {}),
+                                           META_ANAHTARI: json.dumps(meta).encode("utf-8")})
+    out = BytesIO()
+    pq.write_table(tablo, out, compression="zstd")
+    depo.yaz(ISTATISTIK_DOSYASI, out.getvalue(), mesaj)
+
+
+def durum_oku(depo):
+    """Kaydedilmiş durum ya da (henüz yoksa) None."""
+    if ISTATISTIK_DOSYASI.rsplit("/", 1)[1] not in depo.listele(FIYAT_DIZINI): return None
+    tablo = pq.read_table(BytesIO(depo.oku(ISTATISTIK_DOSYASI)))
+    meta = json.loads(tablo.schema.metadata[META_ANAHTARI].decode("utf-8"))
+    df = tablo.to_pandas()
+    pencere = df[[f"p{i}" for i in range(meta['pencere'])]].to_numpy(dtype=np.float64).reshape(len(df), -1)
+    return IstatistikDurumu(df['Kod'].to_numpy(dtype=object), df['n'].to_numpy(dtype=np.int64),
+                            df['ortalama'].to_numpy(), df['m2'].to_numpy(), df['ilk'].to_numpy(), pencere,
+                            meta['baz'], meta['son'], meta['gun_sayisi'])
+
+
+def istatistikleri_guncelle(depo, df_yeni, pencere_gun=PENCERE_GUN):
+    """Yeni fiyatları kaydedilmiş duruma ekleyip yazar -> durum.
+
+    Durum yoksa, pencere değiştiyse ya da geçmiş bir gün güncellendiyse fiyat deposundan baştan kurulur.
+    fiyatlari_yaz'dan sonra çağrılmalıdır.
+    """
+    durum = durum_oku(depo)
+    try:
+        if durum is None or durum.pencere.shape[1] != pencere_gun: raise GecmisGunHatasi("durum yok")
+        for gun, kodlar, fiyatlar in gunluk_fiyatlar(df_yeni):
+            durum = gun_ekle(durum, gun, kodlar, fiyatlar)
+    except GecmisGunHatasi:
+        durum = durum_kur(fiyatlari_oku(depo, sutunlar=["Tarih", "Kod", "Fiyat"]), pencere_gun)
+    durum_yaz(depo, durum)
+    return durum
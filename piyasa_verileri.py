@@ -0,0 +1,221 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+# --- AYARLAR ---
+# Piyasa göstergeleri (TCMB kurları, gram altın, EVDS resmi TÜFE) sayfa çizilirken beklenmez: servis son
+# başarılı değeri yaşıyla hemen döner, eskiyen kaynakları arka planda eşzamanlı yeniler. Değerler SQLite'a
+# yazılır; yeniden başlatmada soğuk istek gerekmez. Streamlit'ten bağımsızdır.
+PIYASA_DOSYASI = "piyasa_onbellegi.sqlite"
+ZAMAN_ASIMI = 5  # Kaynak başına istek zaman aşımı (sn)
+HATA_BEKLEME = 60  # Başarısız kaynak bu kadar saniye yeniden denenmez (bu sürede son iyi değer sunulur)
+ZAMANLAYICI_SANIYE = 60  # Arka plan zamanlayıcısının eskimiş kaynak kontrol aralığı
+TCMB_ADRESI = "https://www.tcmb.gov.tr/kurlar/today.xml"
+ALTIN_ADRESI = "https://bigpara.hurriyet.com.tr/altin/gram-altin-fiyati/"
+EVDS_ADRESI = ("https://evds2.tcmb.gov.tr/service/evds/series=TP.FG.J0&startDate={bas}&endDate={bit}"
+               "&type=json&key={anahtar}")
+KULLANICI_AJANI = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/91.0.4472.124 Safari/537.36")
+
+# adres: URL ya da her istekte URL üreten fonksiyon, ayristir: yanıt gövdesi (bayt) -> JSON'a yazılabilir
+# değer, yenileme: değerin taze sayıldığı süre (sn)
+Kaynak = namedtuple("Kaynak", "adres ayristir yenileme")
+# deger: son başarılı değer (yoksa None), zaman: o değerin alındığı an (epoch), hata: son denemenin hatası
+# (başarılıysa None), guncelleniyor: arka planda istek var mı
+Gosterge = namedtuple("Gosterge", "deger zaman hata guncelleniyor")
+
+
+# --- AYRIŞTIRICILAR ---
+def tcmb_kurlari(icerik):
+    soup = BeautifulSoup(icerik, 'xml')
+    return {k: float(soup.find(attrs={"CurrencyCode": k}).BanknoteSelling.text) for k in ("USD", "EUR")}
+
+
+def gram_altin(icerik):
+    fiyat_text = BeautifulSoup(icerik, 'html.parser').select_one("span.value").text
+    return {"GA": float(fiyat_text.replace(".", "").replace(",", ".").strip())}
+
+
+def evds_serisi(icerik):
+    data = json.loads(icerik)
+    if "items" not in data: raise ValueError("Veri Yapısı Hatası")
+    return [[i['Tarih'], i.get('TP_FG_J0')] for i in data["items"]]
+
+
+def resmi_enflasyon_tablosu(kayitlar):
+    df_evds = pd.DataFrame(kayitlar, columns=['Tarih', 'Resmi_TUFE'])
+    df_evds['Tarih'] = pd.to_datetime(df_evds['Tarih'] + "-01", format="%Y-%m-%d")
+    df_evds['Resmi_TUFE'] = pd.to_numeric(df_evds['Resmi_TUFE'], errors='coerce')
+    return df_evds
+
+
+def evds_adresi(anahtar, sablon=EVDS_ADRESI):
+    """Son 365 günü isteyen EVDS adresini istek anında üreten fonksiyon."""
+    def adres():
+        bugun = datetime.now()
+        return sablon.format(bas=(bugun - timedelta(days=365)).strftime("%d-%m-%Y"),
+                             bit=bugun.strftime("%d-%m-%Y"), anahtar=anahtar)
+    return adres
+
+
+def piyasa_kaynaklari(evds_anahtari=None, tcmb=TCMB_ADRESI, altin=ALTIN_ADRESI, evds=EVDS_ADRESI):
+    """Uygulamanın kaynakları; adresler yerel sahte sunuculara yönlendirilebilir. EVDS anahtarsız eklenmez."""
+    kaynaklar = {"kur": Kaynak(tcmb, tcmb_kurlari, 1800), "altin": Kaynak(altin, gram_altin, 1800)}
+    if evds_anahtari: kaynaklar["evds"] = Kaynak(evds_adresi(evds_anahtari, evds), evds_serisi, 6 * 3600)
+    return kaynaklar
+
+
+def yas_metni(saniye):
+    if saniye is None: return "henüz alınmadı"
+    if saniye < 60: return "az önce"
+    if saniye < 3600: return f"{saniye // 60:.0f} dk önce"
+    if saniye < 86400: return f"{saniye // 3600:.0f} sa önce"
+    return f"{saniye // 86400:.0f} gün önce"
+
+
+# --- KALICI DEPO ---
+class PiyasaDeposu:
+    """Kaynak başına son başarılı değer (JSON) ve son denemenin sonucu."""
+
+    def __init__(self, dosya=PIYASA_DOSYASI):
+        self.db = sqlite3.connect(dosya, timeout=30, check_same_thread=False)
+        self._kilit = threading.Lock()
+        self.db.execute("""CREATE TABLE IF NOT EXISTS gosterge (
+            ad TEXT PRIMARY KEY, deger TEXT, zaman REAL, hata TEXT, deneme REAL)""")
+        self.db.commit()
+
+    def hepsi(self):
+        """{ad: (deger, zaman, hata, deneme)}"""
+        with self._kilit:
+            satirlar = self.db.execute("SELECT ad, deger, zaman, hata, deneme FROM gosterge").fetchall()
+        return {ad: (deger if deger is None else json.loads(deger), zaman, hata, deneme)
+                for ad, deger, zaman, hata, deneme in satirlar}
+
+    def basarili(self, ad, deger, zaman):
+        with self._kilit:
+            self.db.execute("INSERT OR REPLACE INTO gosterge VALUES (?, ?, ?, NULL, ?)",
+                            (ad, json.dumps(deger), zaman, zaman))
+            self.db.commit()
+
+    def basarisiz(self, ad, hata, zaman):
+        # Son iyi değer korunur
+        with self._kilit:
+            self.db.execute("""INSERT INTO gosterge VALUES (?, NULL, NULL, ?, ?)
+                ON CONFLICT(ad) DO UPDATE SET hata = excluded.hata, deneme = excluded.deneme""", (ad, hata, zaman))
+            self.db.commit()
+
+    def kapat(self):
+        self.db.close()
+
+
+# --- SERVİS ---
+class PiyasaServisi:
+    """Son iyi değerleri beklemeden sunar (stale-while-revalidate); eskiyenleri eşzamanlı yeniler.
+
+    oku()/hepsi() hiçbir zaman ağ beklemez: değer eskimişse (yenileme süresi dolmuş, son hata HATA_BEKLEME'den
+    eski) kaynak arka plan havuzuna gönderilir, o an eldeki değer yaşıyla döner. baslat() ile ayrıca
+    ZAMANLAYICI_SANIYE'de bir kendiliğinden yenilenir; sayfayı kimse açmasa da değerler taze kalır.
+    """
+
+    def __init__(self, kaynaklar, dosya=PIYASA_DOSYASI, zaman_asimi=ZAMAN_ASIMI, hata_bekleme=HATA_BEKLEME):
+        self.kaynaklar = kaynaklar
+        self.zaman_asimi = zaman_asimi
+        self.hata_bekleme = hata_bekleme
+        self.depo = PiyasaDeposu(dosya)
+        self._kilit = threading.Lock()
+        self._havuz = ThreadPoolExecutor(max_workers=max(len(kaynaklar), 1), thread_name_prefix="piyasa")
+        self._bekleyenler = {}  # ad -> Future
+        # ad -> (deger, zaman, hata, deneme); yeniden başlatmada son değerler diskten gelir
+        self._durum = {ad: k for ad, k in self.depo.hepsi().items() if ad in kaynaklar}
+        self._dur = threading.Event()
+
+    def _eskimis(self, ad, simdi):
+        deger, zaman, hata, deneme = self._durum.get(ad, (None, None, None, None))
+        if hata and deneme is not None and simdi - deneme < self.hata_bekleme: return False
+        return zaman is None or simdi - zaman >= self.kaynaklar[ad].yenileme
+
+    def _getir(self, ad):
+        kaynak = self.kaynaklar[ad]
+        adres = kaynak.adres() if callable(kaynak.adres) else kaynak.adres
+        try:
+            res = requests.get(adres, headers={"User-Agent": KULLANICI_AJANI}, timeout=self.zaman_asimi)
+            res.raise_for_status()
+            deger = kaynak.ayristir(res.content)
+        except Exception as e:
+            simdi, hata = time.time(), f"{type(e).__name__}: {e}"
+            self.depo.basarisiz(ad, hata, simdi)
+            with self._kilit:
+                eski = self._durum.get(ad, (None, None, None, None))
+                self._durum[ad] = (eski[0], eski[1], hata, simdi)
+            raise
+        simdi = time.time()
+        self.depo.basarili(ad, deger, simdi)
+        with self._kilit:
+            self._durum[ad] = (deger, simdi, None, simdi)
+        return deger
+
+    def _bitti(self, ad):
+        with self._kilit:
+            self._bekleyenler.pop(ad, None)
+
+    def yenile(self, adlar=None, zorla=False):
+        """Eskimiş (zorla ise tüm) kaynakları arka planda ister; beklemez -> gönderilen adlar."""
+        simdi = time.time()
+        gonderilen = []
+        with self._kilit:
+            for ad in adlar or self.kaynaklar:
+                if ad in self._bekleyenler or not (zorla or self._eskimis(ad, simdi)): continue
+                f = self._havuz.submit(self._getir, ad)
+                self._bekleyenler[ad] = f
+                gonderilen.append((ad, f))
+        for ad, f in gonderilen:
+            f.add_done_callback(lambda f, ad=ad: self._bitti(ad))
+        return [ad for ad, _ in gonderilen]
+
+    def oku(self, ad):
+        return self.hepsi([ad])[ad]
+
+    def hepsi(self, adlar=None):
+        """{ad: Gosterge}; eskimiş kaynakların yenilenmesini tetikler ama beklemez."""
+        adlar = list(adlar or self.kaynaklar)
+        self.yenile(adlar)
+        with self._kilit:
+            return {ad: Gosterge(*self._durum.get(ad, (None, None, None, None))[:3], ad in self._bekleyenler)
+                    for ad in adlar}
+
+    def yas(self, ad, simdi=None):
+        """Son iyi değerin yaşı (sn) ya da None."""
+        zaman = self._durum.get(ad, (None, None))[1]
+        return None if zaman is None else (simdi or time.time()) - zaman
+
+    def bekle(self, zaman_asimi=None):
+        """Süren isteklerin bitmesini bekler (ölçüm/komut satırı için)."""
+        with self._kilit:
+            bekleyenler = list(self._bekleyenler.values())
+        for f in bekleyenler:
+            try:
+                f.result(zaman_asimi)
+            except Exception:
+                pass
+
+    def baslat(self, aralik=ZAMANLAYICI_SANIYE):
+        """Eskimiş kaynakları aralik saniyede bir yenileyen arka plan zamanlayıcısı (daemon)."""
+        def dongu():
+            self.yenile()
+            while not self._dur.wait(aralik):
+                self.yenile()
+        threading.Thread(target=dongu, daemon=True, name="piyasa-zamanlayici").start()
+        return self
+
+    def kapat(self):
+        self._dur.set()
+        self._havuz.shutdown(wait=False, cancel_futures=True)
+        self.depo.kapat()
@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from fiyat_motoru import kod_standartlastir
+
+# --- AYARLAR ---
+# Madde_Sepeti (TUFE_Konfigurasyon.xlsx) bir kez okunup tipli tabloya çevrilir; hem html_isleyici
+# hem endeks hesabı bunu kullanır. Streamlit'ten bağımsızdır.
+GRUP_MAP = {"01": "Gıda", "02": "Alkol", "03": "Giyim", "04": "Konut", "05": "Ev", "06": "Sağlık",
+            "07": "Ulaşım", "08": "İletişim", "09": "Eğlence", "10": "Eğitim", "11": "Lokanta",
+            "12": "Çeşitli"}
+SUTUNLAR = ["Kod", "URL", "Madde_Adi", "Agirlik", "Grup", "Manuel_Fiyat"]
+
+# tablo: SUTUNLAR tipli tablosu, url_kod: {URL: Kod} dizini, ad_col/agirlik_col: kaynak sütun adları
+Sepet = namedtuple("Sepet", "tablo url_kod ad_col agirlik_col")
+
+
+# --- KOD ---
+def kodlari_standartlastir(seri):
+    """kod_standartlastir'ın vektörel karşılığı: her farklı değer yalnızca bir kez çevrilir."""
+    seri = pd.Series(seri)
+    etiketler, tekiller = pd.factorize(seri.astype(str), use_na_sentinel=False)
+    return pd.Series(np.array([kod_standartlastir(k) for k in tekiller], dtype=object)[etiketler], index=seri.index)
+
+
+# --- SÜTUNLAR ---
+def sepet_sutunlari(df):
+    """Serbest adlı Excel sütunlarını bulur: {'kod', 'url', 'ad', 'agirlik', 'manuel'} (yoksa None/varsayılan)."""
+    return {"kod": next((c for c in df.columns if c.lower() == 'kod'), None),
+            "url": next((c for c in df.columns if c.lower() == 'url'), None),
+            "ad": next((c for c in df.columns if 'ad' in c.lower()), 'Madde adı'),
+            "agirlik": next((c for c in df.columns if 'agirlik' in c.lower().replace('ğ', 'g').replace('ı', 'i')),
+                            'Agirlik_2025'),
+            "manuel": next((c for c in df.columns if 'manuel' in c.lower()), None)}
+
+
+def sepeti_hazirla(df_s):
+    """(df_s, ad_col, agirlik_col) -> Kod standartlaştırılmış, Grup sütunu eklenmiş sepet."""
+    df_s = df_s.copy()
+    df_s.columns = df_s.columns.str.strip()
+    s = sepet_sutunlari(df_s)
+    df_s['Kod'] = kodlari_standartlastir(df_s[s['kod'] or 'Kod'])
+    if 'Grup' not in df_s.columns:
+        df_s['Grup'] = df_s['Kod'].str[:2].map(GRUP_MAP).fillna("Diğer")
+    return df_s, s['ad'], s['agirlik']
+
+
+# --- TİPLİ SEPET ---
+def sepet_tablosu(df_conf):
+    """Ham Madde_Sepeti -> Sepet; Kod ya da URL sütunu yoksa None."""
+    df_conf = df_conf.copy()
+    df_conf.columns = df_conf.columns.str.strip()
+    s = sepet_sutunlari(df_conf)
+    if not s['kod'] or not s['url']: return None
+    df, ad_col, agirlik_col = sepeti_hazirla(df_conf)
+    url = df[s['url']]
+    tablo = pd.DataFrame({
+        "Kod": df['Kod'],
+        "URL": url.where(url.isna(), url.astype(str).str.strip()),
+        "Madde_Adi": df[ad_col] if ad_col in df.columns else None,
+        "Agirlik": pd.to_numeric(df[agirlik_col], errors='coerce').fillna(1) if agirlik_col in df.columns else 1.0,
+        "Grup": df['Grup'],
+        "Manuel_Fiyat": pd.to_numeric(df[s['manuel']], errors='coerce') if s['manuel'] else float("nan")},
+        columns=SUTUNLAR)
+    bagli = tablo[tablo['URL'].notna()]
+    return Sepet(tablo.reset_index(drop=True), dict(zip(bagli['URL'], bagli['Kod'])), ad_col, agirlik_col)
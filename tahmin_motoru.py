@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from tembel_yukleme import modul
+
+# --- AYARLAR ---
+# Streamlit'ten bağımsızdır: tahminler arka plandaki işçi süreçlerinde hesaplanır ve SQLite'a yazılır.
+# Kayıt anahtarı serinin (ds, y) ve model ayarlarının özetidir; seri değişmedikçe yeniden fit edilmez.
+TAHMIN_DOSYASI = "tahmin_onbellegi.sqlite"
+UFUK_GUN = 90
+MODEL_AYARLARI = {"daily_seasonality": True, "yearly_seasonality": False}
+TAHMIN_SUTUNLARI = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+SAKLANAN_SURUM = 3  # Seri (anahtar) başına tutulan en yeni model sayısı
+TABLO_ONBELLEGI = 64  # Bellekte çözülmüş tutulan tahmin tablosu sayısı (en az kullanılan atılır)
+HATA_BEKLEME = 300  # Fit'i başarısız olan seri özeti bu kadar saniye yeniden gönderilmez
+VARSAYILAN_ISCI_SAYISI = os.cpu_count() or 1
+
+# tablo: TAHMIN_SUTUNLARI (yoksa boş), ozet: tablonun ait olduğu seri özeti (yoksa None),
+# guncel: tablo verilen seriye mi ait, bekliyor: arka planda fit var mı, hata: son arka plan fit'inin hatası
+Tahmin = namedtuple("Tahmin", "tablo ozet guncel bekliyor hata")
+
+
+def seri_ozeti(seri, ufuk=UFUK_GUN):
+    """(ds, y) serisinin ve model ayarlarının özeti; tek gün eklense de değişir."""
+    h = hashlib.sha1(json.dumps([MODEL_AYARLARI, ufuk], sort_keys=True).encode("utf-8"))
+    h.update(pd.to_datetime(seri['ds']).to_numpy(dtype="datetime64[D]").astype("int64").tobytes())
+    h.update(pd.to_numeric(seri['y']).to_numpy(dtype="float64").tobytes())
+    return h.hexdigest()
+
+
+# --- KALICI MODEL DEPOSU ---
+class TahminDeposu:
+    """Fit edilmiş Prophet modellerini (JSON) ve tahmin tablolarını seri özetiyle saklayan SQLite deposu.
+
+    Her anahtar (ör. "TÜFE", "Grup_Gıda") için son SAKLANAN_SURUM kayıt tutulur; en yenisi hem bayat
+    tahmin olarak gösterilir hem de sonraki fit'in ılık başlangıcı olur.
+    """
+
+    def __init__(self, dosya=TAHMIN_DOSYASI):
+        self.db = sqlite3.connect(dosya, timeout=30)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS model (
+            ozet TEXT PRIMARY KEY, anahtar TEXT, model TEXT, tahmin TEXT, zaman REAL)""")
+        self.db.commit()
+
+    def oku(self, ozet):
+        return self.db.execute("SELECT model, tahmin FROM model WHERE ozet = ?", (ozet,)).fetchone()
+
+    def son(self, anahtar):
+        """Anahtarın en yeni (ozet, model, tahmin) kaydı ya da None."""
+        return self.db.execute("SELECT ozet, model, tahmin FROM model WHERE anahtar = ? ORDER BY zaman DESC LIMIT 1",
+                               (anahtar,)).fetchone()
+
+    def yaz(self, anahtar, ozet, model, tahmin):
+        self.db.execute("INSERT OR REPLACE INTO model VALUES (?, ?, ?, ?, ?)",
+                        (ozet, anahtar, model, tahmin, time.time()))
+        self.db.execute("""DELETE FROM model WHERE anahtar = ? AND ozet NOT IN
+            (SELECT ozet FROM model WHERE anahtar = ? ORDER BY zaman DESC LIMIT ?)""",
+                        (anahtar, anahtar, SAKLANAN_SURUM))
+        self.db.commit()
+
+    def kapat(self):
+        self.db.close()
+
+
+def tahmin_tablosu(metin):
+    df = pd.read_json(StringIO(metin), orient="split")
+    df['ds'] = pd.to_datetime(df['ds'])
+    return df
+
+
+# --- FIT (İŞÇİ SÜRECİ) ---
+def _stan_baslangici(m):
+    """Fit edilmiş modelin parametreleri; aynı yapıdaki yeni modelin optimizasyonunu buradan başlatır.
+
+    delta/beta dizi olmalı: Prophet şekillerini karşılaştırır (liste verilirse fit AttributeError ile düşer).
+    Şekli tutmayan parametre için Prophet kendi varsayılan başlangıcını kullanır.
+    """
+    return {**{p: float(m.params[p][0][0]) for p in ("k", "m", "sigma_obs")},
+            **{p: np.asarray(m.params[p][0], dtype=float) for p in ("delta", "beta")}}
+
+
+def tahmin_fit_et(seri, ufuk=UFUK_GUN, onceki_model=None):
+    """(model JSON, tahmin JSON). onceki_model (JSON) verilirse ılık başlangıç denenir.
+
+    Seri uzadıkça değişim noktası/mevsimsellik sayısı değişebilir; parametreler uymazsa soğuk fit yapılır.
+    """
+    Prophet = modul("tahmin", "prophet").Prophet
+    serilestir = modul("tahmin", "prophet.serialize")
+    m = Prophet(**MODEL_AYARLARI)
+    try:
+        if onceki_model is None: raise ValueError("önceki model yok")
+        m.fit(seri, init=_stan_baslangici(serilestir.model_from_json(onceki_model)))
+    except Exception:
+        m = Prophet(**MODEL_AYARLARI)
+        m.fit(seri)
+    tahmin = m.predict(m.make_future_dataframe(periods=ufuk))[TAHMIN_SUTUNLARI]
+    return serilestir.model_to_json(m), tahmin.to_json(orient="split", date_format="iso", index=False)
+
+
+def _arka_plan_fit(dosya, anahtar, ozet, seri, ufuk):
+    depo = TahminDeposu(dosya)
+    try:
+        onceki = depo.son(anahtar)
+        model, tahmin = tahmin_fit_et(seri, ufuk, onceki[1] if onceki else None)
+        depo.yaz(anahtar, ozet, model, tahmin)
+    finally:
+        depo.kapat()
+    return ozet
+
+
+# --- ARKA PLAN TAHMİN MOTORU ---
+class TahminMotoru:
+    """Son kaydedilmiş tahmini hemen döner; seri değiştiyse yeni fit'i işçi sürecine gönderir.
+
+    Aynı seri için ikinci bir fit başlatılmaz; fit'i başarısız olan seri HATA_BEKLEME dolana kadar yeniden
+    gönderilmez. Birden çok seri (ör. gruplar) toplu_tahmin ile verilirse fit'ler isci_sayisi çekirdeğe
+    paralel dağılır. Süreç havuzu ilk fit'te kurulur; bir işçi çökerse sonraki gönderimde yeniden kurulur.
+    """
+
+    def __init__(self, dosya=TAHMIN_DOSYASI, isci_sayisi=None, ufuk=UFUK_GUN, hata_bekleme=HATA_BEKLEME):
+        self.dosya = dosya
+        self.isci_sayisi = isci_sayisi or VARSAYILAN_ISCI_SAYISI
+        self.ufuk = ufuk
+        self.hata_bekleme = hata_bekleme
+        self._kilit = threading.Lock()
+        self._havuz = None
+        self._bekleyenler = {}  # ozet -> Future
+        self._hatalar = {}  # anahtar -> son hata metni
+        self._basarisiz = {}  # ozet -> son başarısız fit'in bittiği an (monotonic)
+        self._tablolar = OrderedDict()  # ozet -> çözülmüş tahmin tablosu (LRU)
+        TahminDeposu(dosya).kapat()  # Tablo işçilerden önce oluşsun
+
+    def _tablo(self, ozet, metin):
+        # Motor tüm oturumlarca paylaşılır: önbellek yalnızca kilitle okunup yazılır, JSON kilit dışında çözülür
+        with self._kilit:
+            tablo = self._tablolar.get(ozet)
+            if tablo is not None:
+                self._tablolar.move_to_end(ozet)
+                return tablo
+        tablo = tahmin_tablosu(metin)
+        with self._kilit:
+            tablo = self._tablolar.setdefault(ozet, tablo)
+            self._tablolar.move_to_end(ozet)
+            while len(self._tablolar) > TABLO_ONBELLEGI: self._tablolar.popitem(last=False)
+        return tablo
+
+    def _bitti(self, anahtar, ozet, f):
+        with self._kilit:
+            if self._bekleyenler.get(ozet) is f: del self._bekleyenler[ozet]
+            if f.cancelled(): return
+            if f.exception() is not None:
+                self._hatalar[anahtar] = str(f.exception()) or type(f.exception()).__name__
+                self._basarisiz[ozet] = time.monotonic()
+            else:
+                self._hatalar.pop(anahtar, None)
+                self._basarisiz.pop(ozet, None)
+
+    def _gonder(self, anahtar, ozet, seri):
+        with self._kilit:
+            if ozet in self._bekleyenler: return
+            zaman = self._basarisiz.get(ozet)
+            if zaman is not None and time.monotonic() - zaman < self.hata_bekleme: return
+            if self._havuz is None: self._havuz = ProcessPoolExecutor(max_workers=self.isci_sayisi)
+            try:
+                f = self._havuz.submit(_arka_plan_fit, self.dosya, anahtar, ozet, seri, self.ufuk)
+            except BrokenProcessPool:
+                # Bir işçi çökmüş (OOM, cmdstan): havuz bırakılır, sonraki gönderim yenisini kurar
+                self._havuz.shutdown(wait=False, cancel_futures=True)
+                self._havuz = None
+                self._bekleyenler.clear()
+                return
+            self._bekleyenler[ozet] = f
+        f.add_done_callback(lambda f: self._bitti(anahtar, ozet, f))
+
+    def toplu_tahmin(self, seriler):
+        """{anahtar: (ds, y) DataFrame} -> {anahtar: Tahmin}; eksik fit'ler birlikte kuyruğa girer."""
+        seriler = {a: s[['ds', 'y']].dropna().reset_index(drop=True) for a, s in seriler.items()}
+        ozetler = {a: seri_ozeti(s, self.ufuk) for a, s in seriler.items()}
+        sonuc = {}
+        depo = TahminDeposu(self.dosya)
+        try:
+            for anahtar, ozet in ozetler.items():
+                if kayit := depo.oku(ozet):
+                    sonuc[anahtar] = Tahmin(self._tablo(ozet, kayit[1]), ozet, True, False, None)
+                    continue
+                if len(seriler[anahtar]) >= 2: self._gonder(anahtar, ozet, seriler[anahtar])
+                son = depo.son(anahtar)
+                tablo = self._tablo(son[0], son[2]) if son else pd.DataFrame(columns=TAHMIN_SUTUNLARI)
+                with self._kilit:
+                    sonuc[anahtar] = Tahmin(tablo, son and son[0], False, ozet in self._bekleyenler,
+                                            self._hatalar.get(anahtar))
+        finally:
+            depo.kapat()
+        return sonuc
+
+    def tahmin(self, anahtar, seri):
+        return self.toplu_tahmin({anahtar: seri})[anahtar]
+
+    def bekle(self, zaman_asimi=None):
+        """Kuyruktaki tüm fit'lerin bitmesini bekler (ölçüm/komut satırı için)."""
+        with self._kilit:
+            bekleyenler = list(self._bekleyenler.values())
+        for f in bekleyenler:
+            try:
+                f.result(zaman_asimi)
+            except Exception:
+                pass
+
+    def kapat(self):
+        if self._havuz: self._havuz.shutdown(wait=False, cancel_futures=True)
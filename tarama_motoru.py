@@ -0,0 +1,469 @@
+import glob
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+import zlib
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fiyat_motoru import GUNLUK_ARSIV, MANIFEST_EKI, eskiyen_arsivler, manifest_uyeleri, sayfada_fiyat_var, \
+    sayfayi_kirp, site_kurali
+
+# --- AYARLAR ---
+# Streamlit'ten ve DrissionPage'den bağımsızdır; tarayıcı yalnızca TarayiciGetirici kurulunca import edilir.
+VARSAYILAN_SEKME = 4  # Aynı anda açık tutulacak en fazla sekme (işçi) sayısı
+CHROME_ADRESI = "127.0.0.1:9222"  # chrome_ac.py'nin açtığı hata ayıklama portu
+HTTP_ONBELLEK_DOSYASI = "http_onbellegi.sqlite"  # ETag/Last-Modified ve son gövde (koşullu istekler için)
+GUNLUK_DOSYASI = "tarama_gunlugu.sqlite"  # URL başına iş durumu; yarıda kalan tarama buradan sürer
+TAZELIK_SAAT = 18  # Bu süre içinde başarıyla alınmış URL'ler yeniden istenmez
+GERI_CEKILME_SANIYE = 300  # İlk hatadan sonra bekleme; her denemede iki katına çıkar
+GERI_CEKILME_TAVAN = 6 * 3600
+ARSIV_DIZINI = "Ziplenmis_Dosyalar"  # Günlük arşiv parçaları ve manifest (repo köküne gönderilir)
+PARCA_BAYT = 8 * 1024 * 1024  # Bir arşiv parçası bu boyutu geçince yenisine başlanır
+# Kırpma modunda her Kod için ortalama bu kadar günde bir (Kod + gün özetine göre) tam sayfa da saklanır;
+# sayfa yapısı değişince kırpılmış ve tam sonuçlar karşılaştırılabilsin diye.
+TAM_ORNEK_ORANI = 20
+AZAMI_DENEME = 6  # Bu kadar üst üste hatadan sonra URL, başarıyla alınana ya da günlük sıfırlanana dek atlanır
+# Alan başına sınırlar. eszamanli: aynı anda açık sekme, aralik: iki istek başlangıcı arası en az
+# saniye (sapma oranında rastgele uzatılır), bekle: sayfa "hazır" sayılmadan önce DOM'da görülmesi
+# beklenen fiyat seçicisi (verilmezse site_kurallari.json'daki 'bekle'), kaydir: bulununca sayfa sonuna
+# kaydırılır, hizli: sayfa önce tarayıcısız düz HTTP ile istenir; fiyat çıkmazsa tarayıcıya düşülür.
+ALAN_AYARLARI = {
+    "cimri.com": {"eszamanli": 1, "aralik": 3.0, "sapma": 0.5, "zaman_asimi": 40, "kaydir": True},
+    "migros.com.tr": {"eszamanli": 4, "aralik": 0.25, "zaman_asimi": 15, "hizli": True},
+}
+VARSAYILAN_ALAN_AYARI = {"eszamanli": 2, "aralik": 1.0, "sapma": 0.0, "zaman_asimi": 20, "kaydir": False,
+                         "bekle": None, "hizli": False}
+KULLANICI_AJANI = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/120.0.0.0 Safari/537.36")
+
+TaramaIsi = namedtuple("TaramaIsi", "sira kod url alan")
+Sayfa = namedtuple("Sayfa", "html durum son_url")  # son_url: yönlendirmelerden sonra varılan adres
+TaramaIlerlemesi = namedtuple("TaramaIlerlemesi", "tamamlanan toplam is_ durum sure gecen")
+
+
+def alan_adi(url):
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def alan_ayari(alan):
+    ayar = {**VARSAYILAN_ALAN_AYARI, "bekle": site_kurali(f"https://{alan}/").bekle or None}
+    for sonek, ozel in ALAN_AYARLARI.items():
+        if alan == sonek or alan.endswith("." + sonek):
+            return {**ayar, **ozel}
+    return ayar
+
+
+def tarama_isleri(dosya="urller.txt"):
+    """urller.txt satırlarını (kod ... url) TaramaIsi listesine çevirir."""
+    with open(dosya, "r", encoding="utf-8") as f:
+        satirlar = [l.split() for l in f if l.strip()]
+    return [TaramaIsi(i, p[0], p[-1], alan_adi(p[-1])) for i, p in enumerate(satirlar) if len(p) >= 2]
+
+
+# --- ZAMANLAYICI ---
+class Zamanlayici:
+    """İşleri alan kuyruklarından, alanın eşzamanlılık ve hız sınırına uyarak sırayla dağıtır.
+
+    Sınırı dolan alanın işi bekletilirken diğer alanların işleri verilir; boşta bekleme
+    sabit uyku yerine bir sonraki uygun ana kadar (ya da bir iş bitene dek) yapılır.
+    """
+
+    def __init__(self, isler):
+        self._kuyruklar = OrderedDict()
+        for is_ in isler:
+            self._kuyruklar.setdefault(is_.alan, deque()).append(is_)
+        self._aktif = Counter()
+        self._sonraki = {}
+        self._kosul = threading.Condition()
+
+    def al(self):
+        with self._kosul:
+            while True:
+                simdi = time.monotonic()
+                bekle = None
+                for alan, kuyruk in self._kuyruklar.items():
+                    if not kuyruk: continue
+                    ayar = alan_ayari(alan)
+                    if self._aktif[alan] >= ayar['eszamanli']: continue
+                    kalan = self._sonraki.get(alan, 0) - simdi
+                    if kalan > 0:
+                        bekle = kalan if bekle is None else min(bekle, kalan)
+                        continue
+                    self._aktif[alan] += 1
+                    self._sonraki[alan] = simdi + ayar['aralik'] * random.uniform(1, 1 + ayar['sapma'])
+                    self._kuyruklar.move_to_end(alan)  # Alanlar arasında sırayla
+                    return kuyruk.popleft()
+                if not any(self._kuyruklar.values()): return None
+                self._kosul.wait(bekle)
+
+    def birak(self, alan):
+        with self._kosul:
+            self._aktif[alan] -= 1
+            self._kosul.notify_all()
+
+
+# --- GÜNLÜK ARŞİV ---
+class GunlukArsivYazici:
+    """Taranan sayfaları doğrudan günün sıkıştırılmış ZIP parçalarına ekler (Bolum_<gün>_<n>.zip).
+
+    Her sayfa eklendiğinde parça kapanır (merkezi dizin diske yazılır) ve manifest
+    (Bolum_<gün>.manifest.json: kod -> arşiv, üye, url, crc, boyut) güncellenir; tarama yarıda kesilse de
+    arşivler okunabilir kalır. Aynı gün tekrar çalıştırılınca kalınan parçadan devam edilir.
+    kirp=True ise sayfalar sayfayi_kirp ile yalnızca fiyat parçalarına indirilir; fiyat çıkmayan
+    sayfalar ve tam_ornek_orani'na göre örneklenenler tam saklanır.
+    """
+
+    def __init__(self, dizin=ARSIV_DIZINI, gun=None, parca_bayt=PARCA_BAYT, kirp=False,
+                 tam_ornek_orani=TAM_ORNEK_ORANI):
+        self.dizin = dizin
+        self.gun = gun or date.today().isoformat()
+        self.parca_bayt = parca_bayt
+        self.kirp = kirp
+        self.tam_ornek_orani = tam_ornek_orani
+        self.sayac = Counter()
+        self._kilit = threading.Lock()
+        os.makedirs(dizin, exist_ok=True)
+        self.manifest_yolu = os.path.join(dizin, f"Bolum_{self.gun}{MANIFEST_EKI}")
+        self.manifest = {"gun": self.gun, "kodlar": {}}
+        if os.path.exists(self.manifest_yolu):
+            with open(self.manifest_yolu, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self._parca = 1
+        while os.path.exists(self._arsiv_yolu(self._parca + 1)): self._parca += 1
+
+    def _arsiv_yolu(self, n):
+        return os.path.join(self.dizin, f"Bolum_{self.gun}_{n}.zip")
+
+    def _manifest_yaz(self):
+        gecici = self.manifest_yolu + ".tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(gecici, self.manifest_yolu)
+
+    def tam_ornek_mi(self, kod):
+        return self.tam_ornek_orani > 0 and zlib.crc32(f"{kod}|{self.gun}".encode()) % self.tam_ornek_orani == 0
+
+    def yaz(self, is_, sayfa):
+        veri = sayfa.html.encode("utf-8")
+        tam_boyut, kirpik = len(veri), None
+        if self.kirp and not self.tam_ornek_mi(is_.kod):
+            try:
+                kirpik = sayfayi_kirp(veri, is_.url)
+            except Exception:
+                kirpik = None
+        self.sayac['kirpik' if kirpik else 'tam'] += 1
+        veri = kirpik or veri
+        with self._kilit:
+            yol = self._arsiv_yolu(self._parca)
+            if os.path.exists(yol) and os.path.getsize(yol) >= self.parca_bayt:
+                self._parca += 1
+                yol = self._arsiv_yolu(self._parca)
+            with zipfile.ZipFile(yol, "a", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as z:
+                # Aynı gün yeniden alınan sayfa yeni adla eklenir; manifest en yenisini gösterir
+                uye, n = f"{is_.kod}.html", 1
+                while uye in z.NameToInfo:
+                    n += 1
+                    uye = f"{is_.kod}~{n}.html"
+                z.writestr(uye, veri)
+                info = z.getinfo(uye)
+            self.manifest["kodlar"][is_.kod] = {
+                "arsiv": os.path.basename(yol), "uye": uye, "url": is_.url, "son_url": sayfa.son_url,
+                "crc": info.CRC, "boyut": info.file_size, "tam_boyut": tam_boyut, "kirpik": bool(kirpik),
+                "zaman": time.time()}
+            self._manifest_yaz()
+
+
+def eskiyenleri_temizle(dizin=ARSIV_DIZINI):
+    """Bütün Kod'ları daha yeni bir günde yeniden alınmış günlük parçaları ve parçası kalmayan günlerin
+    manifestlerini siler -> silinen dosya adları. Repo kökü bu dizinle eşitlenince eskiler birikmez."""
+    manifestler = {}
+    for yol in glob.glob(os.path.join(dizin, f"Bolum_*{MANIFEST_EKI}")):
+        with open(yol, encoding="utf-8") as f:
+            manifestler[yol] = json.load(f)
+    adlar = [os.path.basename(y) for y in glob.glob(os.path.join(dizin, "Bolum_*.zip"))]
+    silinen = sorted(eskiyen_arsivler(list(manifestler.values()), adlar))
+    for ad in silinen: os.remove(os.path.join(dizin, ad))
+    kalan_gunler = {g.group(1) for a in manifest_uyeleri(manifestler.values()) if (g := GUNLUK_ARSIV.match(a))}
+    for yol, m in manifestler.items():
+        if m.get("kodlar") and m.get("gun") not in kalan_gunler:
+            os.remove(yol)
+            silinen.append(os.path.basename(yol))
+    return silinen
+
+
+# --- KOŞULLU İSTEK ÖNBELLEĞİ ---
+class KosulluOnbellek:
+    """URL başına ETag / Last-Modified ve son gövdeyi (zlib) saklar; 304 yanıtında gövde buradan gelir."""
+
+    def __init__(self, dosya=HTTP_ONBELLEK_DOSYASI):
+        self._kilit = threading.Lock()
+        self.db = sqlite3.connect(dosya, timeout=30, check_same_thread=False)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS sayfa (
+            url TEXT PRIMARY KEY, etag TEXT, son_degisiklik TEXT, govde BLOB, zaman REAL)""")
+        self.db.commit()
+
+    def oku(self, url):
+        with self._kilit:
+            satir = self.db.execute("SELECT etag, son_degisiklik, govde FROM sayfa WHERE url = ?", (url,)).fetchone()
+        return (satir[0], satir[1], zlib.decompress(satir[2]).decode("utf-8")) if satir else None
+
+    def yaz(self, url, etag, son_degisiklik, govde):
+        with self._kilit:
+            self.db.execute("INSERT OR REPLACE INTO sayfa VALUES (?, ?, ?, ?, ?)",
+                            (url, etag, son_degisiklik, zlib.compress(govde.encode("utf-8")), time.time()))
+            self.db.commit()
+
+    def kapat(self):
+        self.db.close()
+
+
+# --- TARAMA GÜNLÜĞÜ ---
+class TaramaGunlugu:
+    """(kod, url) başına durum, deneme sayısı, son başarı ve bayt tutan SQLite iş günlüğü.
+
+    Her sonuç anında yazılır; çöken ya da Cloudflare'e takılan tarama yeniden başlatıldığında
+    taze sonuçlar atlanır, hatalılar üstel geri çekilme süresi dolduysa yeniden denenir.
+    """
+
+    def __init__(self, dosya=GUNLUK_DOSYASI):
+        self._kilit = threading.Lock()
+        self.db = sqlite3.connect(dosya, timeout=30, check_same_thread=False)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS is_durumu (
+            kod TEXT, url TEXT, durum TEXT, deneme INTEGER, son_deneme REAL, son_basari REAL, bayt INTEGER,
+            sonraki REAL, hata TEXT, PRIMARY KEY (kod, url))""")
+        self.db.commit()
+
+    def _kayitlar(self):
+        with self._kilit:
+            return {(r[0], r[1]): r[2:] for r in self.db.execute(
+                "SELECT kod, url, durum, deneme, son_basari, sonraki FROM is_durumu")}
+
+    def bekleyenler(self, isler, tazelik_saat=TAZELIK_SAAT, simdi=None):
+        """(yapılacak işler, atlanma nedenleri sayacı)."""
+        simdi = simdi or time.time()
+        kayitlar = self._kayitlar()
+        bekleyen, atlanan = [], Counter()
+        for is_ in isler:
+            k = kayitlar.get((is_.kod, is_.url))
+            if k:
+                durum, deneme, son_basari, sonraki = k
+                if durum == "tamam" and son_basari and simdi - son_basari < tazelik_saat * 3600:
+                    atlanan['taze'] += 1; continue
+                if durum != "tamam" and deneme >= AZAMI_DENEME:
+                    atlanan['vazgecildi'] += 1; continue
+                if durum != "tamam" and sonraki and sonraki > simdi:
+                    atlanan['geri_cekilme'] += 1; continue
+            bekleyen.append(is_)
+        return bekleyen, atlanan
+
+    def diskten_tani(self, isler, yol_bul):
+        """Günlükte kaydı olmayan ama diskte dosyası bulunan işleri dosya zamanıyla başarılı sayar."""
+        kayitlar = self._kayitlar()
+        eklenen = 0
+        with self._kilit:
+            for is_ in isler:
+                yol = yol_bul(is_)
+                if (is_.kod, is_.url) in kayitlar or not os.path.exists(yol): continue
+                st = os.stat(yol)
+                self.db.execute("INSERT INTO is_durumu VALUES (?, ?, 'tamam', 0, ?, ?, ?, NULL, NULL)",
+                                (is_.kod, is_.url, st.st_mtime, st.st_mtime, st.st_size))
+                eklenen += 1
+            self.db.commit()
+        return eklenen
+
+    def basarili(self, is_, bayt):
+        simdi = time.time()
+        with self._kilit:
+            self.db.execute("INSERT OR REPLACE INTO is_durumu VALUES (?, ?, 'tamam', 0, ?, ?, ?, NULL, NULL)",
+                            (is_.kod, is_.url, simdi, simdi, bayt))
+            self.db.commit()
+
+    def basarisiz(self, is_, hata, bayt=0):
+        simdi = time.time()
+        with self._kilit:
+            satir = self.db.execute("SELECT durum, deneme, son_basari FROM is_durumu WHERE kod = ? AND url = ?",
+                                    (is_.kod, is_.url)).fetchone()
+            deneme = (satir[1] if satir and satir[0] != "tamam" else 0) + 1
+            sonraki = simdi + min(GERI_CEKILME_SANIYE * 2 ** (deneme - 1), GERI_CEKILME_TAVAN)
+            self.db.execute("INSERT OR REPLACE INTO is_durumu VALUES (?, ?, 'hata', ?, ?, ?, ?, ?, ?)",
+                            (is_.kod, is_.url, deneme, simdi, satir[2] if satir else None, bayt, sonraki,
+                             str(hata)[:500]))
+            self.db.commit()
+
+    def sifirla(self):
+        with self._kilit:
+            self.db.execute("DELETE FROM is_durumu")
+            self.db.commit()
+
+    def kapat(self):
+        self.db.close()
+
+
+# --- SAYFA GETİRİCİLER ---
+# getir(url, ayar) -> Sayfa; durum: "tamam", "hizli" (tarayıcısız) ya da "zaman_asimi"
+# (sayfanın o anki hali döner)
+class TarayiciGetirici:
+    """Açık Chrome'a bağlanır ve her iş için yeni sekme açar (Cloudflare navigasyon takibini bozar)."""
+
+    def __init__(self, adres=CHROME_ADRESI):
+        from DrissionPage import ChromiumPage, ChromiumOptions
+        co = ChromiumOptions()
+        co.set_address(adres)
+        self.tarayici = ChromiumPage(co)
+
+    def getir(self, url, ayar):
+        tab = self.tarayici.new_tab(url)
+        try:
+            durum = "tamam"
+            if ayar['bekle']:
+                # Sabit uyku yerine fiyat kutusu DOM'a düştüğü anda devam edilir;
+                # Cloudflare ekranı geçilene kadar da aynı bekleme sürer.
+                if tab.ele(f"css:{ayar['bekle']}", timeout=ayar['zaman_asimi']):
+                    if ayar['kaydir']: tab.scroll.to_bottom()
+                else:
+                    durum = "zaman_asimi"
+            return Sayfa(tab.html, durum, tab.url)
+        finally:
+            tab.close()
+
+
+_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+
+def yanit_metni(r):
+    """Yanıt gövdesi metni: Content-Type'ta charset varsa ona göre, yoksa (arşiv yolundaki gibi) UTF-8.
+
+    r.text kullanılmaz: requests charset'siz text/html'i ISO-8859-1 sayar ve Türkçe karakterler bozulur.
+    """
+    m = _CHARSET.search(r.headers.get("Content-Type", ""))
+    try:
+        return r.content.decode(m.group(1) if m else "utf-8", errors="ignore")
+    except LookupError:  # Bilinmeyen charset adı
+        return r.content.decode("utf-8", errors="ignore")
+
+
+class HttpGetirici:
+    """Tarayıcısız düz HTTP getirici: iş parçacığı başına kalıcı (keep-alive) oturum, sıkıştırma ve
+    onbellek verilirse ETag / If-Modified-Since ile koşullu istek."""
+
+    def __init__(self, onbellek=None):
+        self.onbellek = onbellek
+        self.sayac = Counter()
+        self._yerel = threading.local()
+
+    def _oturum(self):
+        if not hasattr(self._yerel, "oturum"):
+            oturum = requests.Session()
+            oturum.headers.update({"User-Agent": KULLANICI_AJANI, "Accept-Encoding": "gzip, deflate",
+                                   "Accept-Language": "tr-TR,tr;q=0.9"})
+            adaptor = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+            oturum.mount("http://", adaptor)
+            oturum.mount("https://", adaptor)
+            self._yerel.oturum = oturum
+        return self._yerel.oturum
+
+    def getir(self, url, ayar):
+        onceki = self.onbellek.oku(url) if self.onbellek else None
+        basliklar = {}
+        if onceki:
+            if onceki[0]: basliklar["If-None-Match"] = onceki[0]
+            if onceki[1]: basliklar["If-Modified-Since"] = onceki[1]
+        r = self._oturum().get(url, headers=basliklar, timeout=ayar['zaman_asimi'])
+        self.sayac['istek'] += 1
+        if r.status_code == 304 and onceki:
+            self.sayac['degismedi'] += 1
+            return Sayfa(onceki[2], "tamam", url)
+        r.raise_for_status()
+        etag, son_degisiklik = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        metin = yanit_metni(r)
+        if self.onbellek and (etag or son_degisiklik):
+            self.onbellek.yaz(url, etag, son_degisiklik, metin)
+        return Sayfa(metin, "tamam", r.url)
+
+
+class KarmaGetirici:
+    """hizli alanlarda sayfayı önce HTTP ile ister, fiyat çıkmazsa tarayıcıya düşer.
+
+    Tarayıcı (tarayici_kur()) yalnızca ilk ihtiyaçta kurulur; sepetin çoğu hızlı moddaysa hiç açılmaz.
+    """
+
+    def __init__(self, http, tarayici_kur=TarayiciGetirici):
+        self.http = http
+        self.sayac = Counter()
+        self._tarayici_kur = tarayici_kur
+        self._tarayici = None
+        self._kilit = threading.Lock()
+
+    def tarayici(self):
+        with self._kilit:
+            if self._tarayici is None: self._tarayici = self._tarayici_kur()
+            return self._tarayici
+
+    def getir(self, url, ayar):
+        if ayar['hizli']:
+            try:
+                sayfa = self.http.getir(url, ayar)
+                if sayfada_fiyat_var(sayfa.html.encode("utf-8"), url): return sayfa._replace(durum="hizli")
+            except Exception:
+                pass
+            self.sayac['yedek'] += 1
+        return self.tarayici().getir(url, ayar)
+
+
+# --- ÇALIŞTIRICI ---
+def ilerleme_yaz(b):
+    kalan = b.gecen / b.tamamlanan * (b.toplam - b.tamamlanan)
+    simge = "🛡️" if "cimri" in b.is_.alan else "🚀"
+    print(f"[{b.tamamlanan}/{b.toplam}] {simge} {b.is_.kod} {b.is_.alan}: {b.durum} ({b.sure:.1f} sn) "
+          f"| geçen {b.gecen / 60:.1f} dk, kalan ~{kalan / 60:.1f} dk")
+
+
+def taramayi_calistir(isler, getirici, kaydet, sekme_sayisi=VARSAYILAN_SEKME, ilerleme=ilerleme_yaz, gunluk=None):
+    """İşleri en fazla sekme_sayisi eşzamanlı işçiyle getirir; her sayfa için kaydet(is_, sayfa) çağrılır.
+    gunluk (TaramaGunlugu) verilirse her sonuç anında işlenir; zaman aşımları hata sayılır.
+
+    Dönüş: durum sayaçları (tamam / hizli / zaman_asimi / hata).
+    """
+    zamanlayici = Zamanlayici(isler)
+    sayac = Counter()
+    kilit = threading.Lock()
+    t0 = time.monotonic()
+
+    def isci():
+        while (is_ := zamanlayici.al()) is not None:
+            bas = time.monotonic()
+            html = None
+            try:
+                sayfa = getirici.getir(is_.url, alan_ayari(is_.alan))
+                html, durum = sayfa.html, sayfa.durum
+                kaydet(is_, sayfa)
+            except Exception as e:
+                durum = f"hata: {e}"
+            finally:
+                zamanlayici.birak(is_.alan)
+            if gunluk:
+                bayt = len(html.encode("utf-8")) if html else 0
+                if durum in ("tamam", "hizli"): gunluk.basarili(is_, bayt)
+                else: gunluk.basarisiz(is_, durum, bayt)
+            with kilit:
+                sayac[durum.split(":")[0]] += 1
+                b = TaramaIlerlemesi(sum(sayac.values()), len(isler), is_, durum, time.monotonic() - bas,
+                                     time.monotonic() - t0)
+                if ilerleme: ilerleme(b)
+
+    with ThreadPoolExecutor(max_workers=sekme_sayisi) as havuz:
+        for f in [havuz.submit(isci) for _ in range(sekme_sayisi)]:
+            f.result()
+    return sayac
@@ -0,0 +1,84 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# --- AYARLAR ---
+# Uygulamanın isteğe bağlı alt sistemleri ve gerektirdikleri ağır modüller. Açılışta hiçbiri yüklenmez;
+# ilgili sekme eylemi ilk kez çalıştığında modul() ile içe aktarılır (sonraki çağrılar sys.modules'tan gelir).
+ALT_SISTEMLER = {
+    "grafik": ("plotly.express", "plotly.graph_objects"),
+    "github": ("github",),
+    "tahmin": ("prophet", "prophet.serialize"),
+    "llm": ("google.generativeai",),
+    "haber": ("feedparser",),
+    "pdf": ("fpdf",),
+    "piyasa_tarama": ("selenium.webdriver", "selenium.webdriver.chrome.service", "selenium.webdriver.chrome.options",
+                      "selenium.webdriver.common.by", "selenium.webdriver.support.ui"),
+}
+# Açılışta her durumda yüklenen çekirdek (alt sistem ölçümleri bunun üzerine eklenen maliyettir)
+CEKIRDEK = ("streamlit", "pandas", "requests", "bs4", "fiyat_motoru", "fiyat_deposu", "endeks_motoru",
+            "veri_katmani", "sepet_katmani")
+
+_kilit = threading.Lock()
+yukleme_sureleri = {}  # alt sistem -> bu süreçte ilk yüklemelerin toplam süresi (sn)
+
+
+def modul(alt_sistem, ad):
+    """alt_sistem'e ait ad modülünü ilk kullanımda içe aktarır; ilk yükleme süresi kaydedilir."""
+    if ad not in ALT_SISTEMLER[alt_sistem]: raise KeyError(f"{ad} {alt_sistem} alt sisteminde tanımlı değil")
+    if ad in sys.modules: return importlib.import_module(ad)
+    t0 = time.perf_counter()
+    m = importlib.import_module(ad)
+    with _kilit:
+        yukleme_sureleri[alt_sistem] = yukleme_sureleri.get(alt_sistem, 0.0) + time.perf_counter() - t0
+    return m
+
+
+# --- AÇILIŞ ÖLÇÜMÜ ---
+_OLCUM_BETIGI = """
+import importlib, json, sys, time
+def yukle(adlar):
+    sure, eksik = 0.0, []
+    for ad in adlar:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(ad)
+        except ImportError:
+            eksik.append(ad)
+        sure += time.perf_counter() - t0
+    return sure, eksik
+on, adlar = json.loads(sys.argv[1])
+yukle(on)
+print(json.dumps(yukle(adlar)))
+"""
+
+
+def ithalat_suresi(adlar, on=()):
+    """Temiz bir yorumlayıcıda önce on, sonra adlar modüllerini yükler -> (adların süresi sn, kurulu olmayanlar).
+
+    on modüllerinden kurulu olmayanlar sessizce atlanır.
+    """
+    cikti = subprocess.run([sys.executable, "-c", _OLCUM_BETIGI, json.dumps([list(on), list(adlar)])],
+                           capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    sure, eksik = json.loads(cikti)
+    return sure, eksik
+
+
+def acilis_olcumu(tekrar=1):
+    """{'cekirdek': (sn, eksikler), <alt sistem>: (sn, eksikler), ...}.
+
+    Alt sistem süreleri çekirdeğe eklenen soğuk maliyettir. Her ölçüm ayrı süreçte yapılır ki modüller
+    önceki ölçümden önbellekte kalmasın; tekrar>1 ise en kısa süre alınır.
+    """
+    def en_iyi(adlar, on=()):
+        return min((ithalat_suresi(adlar, on) for _ in range(tekrar)), key=lambda x: x[0])
+
+    sonuc = {"cekirdek": en_iyi(CEKIRDEK)}
+    for ad, moduller in ALT_SISTEMLER.items():
+        sonuc[ad] = en_iyi(moduller, CEKIRDEK)
+    return sonuc
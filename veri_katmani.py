@@ -0,0 +1,141 @@
+import base64
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from fiyat_deposu import GithubDepo
+
+# --- AYARLAR ---
+YENILEME_SANIYE = 30  # Dal başı (head) en fazla bu aralıkla sorgulanır
+
+
+class OnbellekliDepo:
+    """Süreç genelinde paylaşılan, git SHA'larıyla doğrulanan GitHub okuma katmanı.
+
+    Dal başı en fazla yenileme_saniye'de bir sorgulanır; değiştiyse tek çağrıyla tüm ağaç
+    (yol -> blob SHA) alınır. İçerik blob SHA'sıyla tutulduğu için değişmeyen dosyalar yeniden
+    indirilmez. Yazma/silme bu katmandan geçer ve ağacı bayat işaretler (diğer önbellekler etkilenmez).
+    fiyat_deposu'ndaki depo arayüzünü (listele/oku/yaz/sil) sağlar.
+
+    Ortak kilit yalnızca önbellek kayıtlarını okuyup yayınlarken tutulur; ağ çağrıları ve turet()
+    hesapları kilit dışında, anahtar başına tek seferde çalışır (aynı anahtarı isteyenler sonucu bekler,
+    diğer anahtarlar beklemez).
+    """
+
+    def __init__(self, repo, branch, yenileme_saniye=YENILEME_SANIYE):
+        self.repo = repo
+        self.branch = branch
+        self.yenileme_saniye = yenileme_saniye
+        self.sayac = Counter()
+        self._yazici = GithubDepo(repo, branch)
+        self._kilit = threading.Lock()
+        self._tazeleme_kilidi = threading.Lock()  # Dal başı/ağaç sorgusu aynı anda bir kez yapılır
+        self._suren = {}  # anahtar -> Future (süren indirme/hesap)
+        self._bas = None
+        self._kontrol = 0.0
+        self._nesil = 0  # gecersiz_kil sayacı; süren tazeleme bayatlatmayı ezmesin
+        self._agac = {}
+        self._bloblar = {}
+        self._turetilmis = {}
+
+    def _tek_seferde(self, anahtar, fonk):
+        """Anahtar başına aynı anda tek fonk(); eşzamanlı isteyenler onun sonucunu (ya da hatasını) bekler."""
+        with self._kilit:
+            f = self._suren.get(anahtar)
+            sahip = f is None
+            if sahip: f = self._suren[anahtar] = Future()
+        if sahip:
+            try:
+                f.set_result(fonk())
+            except BaseException as e:
+                f.set_exception(e)
+            finally:
+                with self._kilit:
+                    self._suren.pop(anahtar, None)
+        return f.result()
+
+    def _tazele(self):
+        if time.monotonic() - self._kontrol < self.yenileme_saniye: return
+        with self._tazeleme_kilidi:
+            # Beklerken başka iş parçacığı tazelemiş olabilir
+            if time.monotonic() - self._kontrol < self.yenileme_saniye: return
+            nesil = self._nesil
+            bas = self.repo.get_branch(self.branch).commit.sha
+            agac = None
+            if bas != self._bas:
+                agac = {e.path: e.sha for e in self.repo.get_git_tree(bas, recursive=True).tree if e.type == "blob"}
+            with self._kilit:
+                self.sayac['dal'] += 1
+                if agac is not None:
+                    self.sayac['agac'] += 1
+                    canli = set(agac.values())
+                    self._bloblar = {sha: v for sha, v in self._bloblar.items() if sha in canli}
+                    self._agac, self._bas = agac, bas
+                # Sorgu sürerken yazım olduysa ağaç bayat kalır, sonraki okuma yeniden sorgular
+                if nesil == self._nesil: self._kontrol = time.monotonic()
+
+    def gecersiz_kil(self):
+        with self._kilit:
+            self._nesil += 1
+            self._kontrol = 0.0
+
+    # --- OKUMA ---
+    def sha(self, yol):
+        self._tazele()
+        return self._agac.get(yol)
+
+    def surum(self, *yollar):
+        """Verilen dosya/dizinlerin (yol, sha) demeti; içerik değişmedikçe aynı kalır."""
+        self._tazele()
+        onekler = tuple(y.rstrip("/") + "/" for y in yollar)
+        return tuple(sorted((p, s) for p, s in self._agac.items() if p in yollar or p.startswith(onekler)))
+
+    def listele(self, dizin):
+        self._tazele()
+        onek = dizin.rstrip("/") + "/"
+        return sorted(p[len(onek):] for p in self._agac if p.startswith(onek) and "/" not in p[len(onek):])
+
+    def oku(self, yol):
+        sha = self.sha(yol)
+        if sha is None: raise FileNotFoundError(yol)
+        with self._kilit:
+            if sha in self._bloblar:
+                self.sayac['isabet'] += 1
+                return self._bloblar[sha]
+
+        def indir():
+            veri = base64.b64decode(self.repo.get_git_blob(sha).content)
+            with self._kilit:
+                self._bloblar[sha] = veri
+                self.sayac['indirme'] += 1
+            return veri
+
+        return self._tek_seferde(("blob", sha), indir)
+
+    def turet(self, anahtar, surum, fonk):
+        """surum değişmedikçe fonk() sonucunu (ör. ayrıştırılmış tablo) tüm oturumlarla paylaşır."""
+        with self._kilit:
+            kayit = self._turetilmis.get(anahtar)
+            if kayit and kayit[0] == surum: return kayit[1]
+
+        def hesapla():
+            deger = fonk()
+            with self._kilit:
+                self._turetilmis[anahtar] = (surum, deger)
+            return deger
+
+        return self._tek_seferde(("turet", anahtar, surum), hesapla)
+
+    # --- YAZMA ---
+    def yaz(self, yol, veri, mesaj="Data Update"):
+        try:
+            self._yazici.yaz(yol, veri, mesaj)
+        finally:
+            self.gecersiz_kil()
+
+    def sil(self, yol, mesaj="Data Compaction"):
+        try:
+            self._yazici.sil(yol, mesaj)
+        finally:
+            self.gecersiz_kil()